@@ -1,8 +1,21 @@
 """This is the module that contains functions related to authenticating to GitHub with a personal access token."""
 
+import math
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from urllib.parse import urlparse
+
 import github3
 import requests
 
+# Installation tokens are refreshed this long before they expire
+TOKEN_REFRESH_MARGIN = timedelta(minutes=5)
+# Delay before creating an installation token again after a failed attempt
+TOKEN_REFRESH_RETRY_DELAY = timedelta(seconds=30)
+# Requests that can be sent with any token of a TokenPool
+READ_METHODS = ("GET", "HEAD")
+
 
 def auth_to_github(
     token: str,
@@ -68,6 +81,33 @@ def get_github_app_installation_token(
     Returns:
         str: the GitHub App token
     """
+    access = request_github_app_installation_access(
+        ghe, gh_app_id, gh_app_private_key_bytes, gh_app_installation_id
+    )
+    if access is None:
+        return None
+    return access.get("token")
+
+
+def request_github_app_installation_access(
+    ghe: str,
+    gh_app_id: str,
+    gh_app_private_key_bytes: bytes,
+    gh_app_installation_id: str,
+) -> dict | None:
+    """
+    Create a GitHub App Installation access token.
+    API: https://docs.github.com/en/rest/apps/apps?apiVersion=2022-11-28#create-an-installation-access-token-for-an-app
+
+    Args:
+        ghe (str): the GitHub Enterprise endpoint
+        gh_app_id (str): the GitHub App ID
+        gh_app_private_key_bytes (bytes): the GitHub App Private Key
+        gh_app_installation_id (str): the GitHub App Installation ID
+
+    Returns:
+        dict | None: the access token response with the token and its expires_at, or None if the request failed
+    """
     jwt_headers = github3.apps.create_jwt_headers(gh_app_private_key_bytes, gh_app_id)
     api_endpoint = f"{ghe}/api/v3" if ghe else "https://api.github.com"
     url = f"{api_endpoint}/app/installations/{gh_app_installation_id}/access_tokens"
@@ -78,4 +118,181 @@ def get_github_app_installation_token(
     except requests.exceptions.RequestException as e:
         print(f"Request failed: {e}")
         return None
-    return response.json().get("token")
+    return response.json()
+
+
+class InstallationTokenProvider(requests.auth.AuthBase):
+    """
+    Cache a GitHub App Installation token and refresh it before it expires,
+    so runs longer than the one hour lifetime of a token keep working.
+
+    The provider is a requests authentication handler for the github3 session,
+    and converts to the current token string for the raw API helpers
+    (ie. f"Bearer {token}"). It is safe to share between threads.
+    """
+
+    def __init__(
+        self,
+        ghe: str,
+        gh_app_id: str,
+        gh_app_private_key_bytes: bytes,
+        gh_app_installation_id: str,
+        refresh_margin: timedelta = TOKEN_REFRESH_MARGIN,
+        retry_delay: timedelta = TOKEN_REFRESH_RETRY_DELAY,
+    ):
+        self.credentials = (
+            ghe,
+            gh_app_id,
+            gh_app_private_key_bytes,
+            gh_app_installation_id,
+        )
+        self.refresh_margin = refresh_margin
+        self.retry_delay = retry_delay
+        self._token: str | None = None
+        self._expires_at: datetime | None = None
+        self._retry_at: datetime | None = None
+        self._lock = threading.Lock()
+
+    def get_token(self) -> str:
+        """
+        Get the current installation token, creating a new one if it expires within the refresh margin.
+        After a failed attempt, no new token is requested before the retry delay.
+
+        Returns:
+            str: the installation token
+
+        Raises:
+            ValueError: if there is no valid token and none could be created
+        """
+        with self._lock:
+            now = datetime.now(timezone.utc)
+            if (
+                self._expires_at is None
+                or now >= self._expires_at - self.refresh_margin
+            ) and (self._retry_at is None or now >= self._retry_at):
+                self._refresh(now)
+            if (
+                self._token is None
+                or self._expires_at is None
+                or now >= self._expires_at
+            ):
+                raise ValueError(
+                    "Unable to create a GitHub App installation token, check GH_APP_ID, "
+                    "GH_APP_INSTALLATION_ID and GH_APP_PRIVATE_KEY"
+                )
+            return self._token
+
+    def _refresh(self, now):
+        access = request_github_app_installation_access(*self.credentials)
+        # Keep the current token if the refresh failed, it may still be valid
+        if not access or not access.get("token"):
+            self._retry_at = now + self.retry_delay
+            return
+        self._token = access["token"]
+        self._expires_at = datetime.fromisoformat(
+            access["expires_at"].replace("Z", "+00:00")
+        )
+        self._retry_at = None
+
+    def __call__(self, request):
+        request.headers["Authorization"] = f"token {self.get_token()}"
+        return request
+
+    def __str__(self):
+        return self.get_token()
+
+
+class TokenPool(requests.auth.AuthBase):
+    """
+    Spread the read requests of the github3 session over several tokens to multiply
+    the rate limit budget. Every read request uses the token with the most remaining
+    budget according to the X-RateLimit headers of its previous responses.
+    Writes always use the primary token so issues, commits and pull requests keep
+    the same author. Installation token providers are accepted for any token and
+    are asked for their current token on every request, so GitHub App tokens are
+    refreshed before they expire. It is safe to share between threads.
+    """
+
+    def __init__(self, primary_token, read_tokens):
+        """
+        Args:
+            primary_token (str | InstallationTokenProvider): the token used for writes and reads
+            read_tokens (list[str | InstallationTokenProvider]): the additional tokens used for reads only
+        """
+        self.tokens = [primary_token, *read_tokens]
+        # Remaining budget and reset time by (token index, rate limit resource)
+        self._remaining = {}
+        self._reset_at = {}
+        self._lock = threading.Lock()
+
+    def _budget(self, key, now) -> float:
+        # A token without rate limit information yet, or past its reset, has its full budget
+        remaining = self._remaining.get(key)
+        if remaining is None or now >= self._reset_at[key]:
+            return math.inf
+        return remaining
+
+    def pick_read_token(self, resource="core") -> int:
+        """
+        Pick the token with the most remaining budget and count the request against it
+
+        Args:
+            resource (str): the rate limit resource of the request, ie. core or search
+
+        Returns:
+            int: the index of the token in tokens
+        """
+        with self._lock:
+            now = time.time()
+            index = max(
+                range(len(self.tokens)),
+                key=lambda index: self._budget((index, resource), now),
+            )
+            key = (index, resource)
+            remaining = self._remaining.get(key)
+            if remaining is not None and now < self._reset_at[key]:
+                self._remaining[key] = remaining - 1
+            return index
+
+    def record_rate_limit(self, index, response, resource="core"):
+        """
+        Record the remaining budget of a token from the rate limit headers of a response.
+        Every rate limit resource, ie. core, search or graphql, has its own budget.
+        """
+        remaining = response.headers.get("X-RateLimit-Remaining")
+        reset_at = response.headers.get("X-RateLimit-Reset")
+        if remaining is None or reset_at is None:
+            return
+        key = (index, response.headers.get("X-RateLimit-Resource") or resource)
+        with self._lock:
+            self._remaining[key] = int(remaining)
+            self._reset_at[key] = float(reset_at)
+
+    def __call__(self, request):
+        index = 0
+        resource = get_rate_limit_resource(request.url)
+        if request.method in READ_METHODS:
+            index = self.pick_read_token(resource)
+        token = self.tokens[index]
+        if isinstance(token, InstallationTokenProvider):
+            token = token.get_token()
+        request.headers["Authorization"] = f"token {token}"
+        request.register_hook(
+            "response",
+            lambda response, **kwargs: self.record_rate_limit(
+                index, response, resource
+            ),
+        )
+        return request
+
+
+def get_rate_limit_resource(url) -> str:
+    """Get the rate limit resource a request to the url counts against"""
+    path = urlparse(url).path
+    if path.endswith("/graphql"):
+        return "graphql"
+    if "/search/code" in path:
+        return "code_search"
+    if "/search/" in path:
+        return "search"
+    return "core"
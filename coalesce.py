@@ -0,0 +1,110 @@
+"""This is the module that contains the HTTP adapter sharing identical GET requests between concurrent workers."""
+
+import copy
+import hashlib
+import re
+import threading
+import time
+from concurrent.futures import Future
+from urllib.parse import urlparse
+
+from requests.adapters import HTTPAdapter
+
+# Resources that do not change during a run and are kept for MEMO_TTL seconds
+MEMO_PATTERNS = (
+    r"/orgs/[^/]+$",
+    r"/orgs/[^/]+/teams/[^/]+$",
+    r"/users/[^/]+$",
+)
+MEMO_TTL = 300
+
+
+class CoalescingAdapter(HTTPAdapter):
+    """
+    HTTP adapter that sends identical concurrent GET requests only once and shares the
+    response with every caller (singleflight). Successful responses of the resources
+    matching memo_patterns are also kept for memo_ttl seconds. Requests sent with
+    different credentials are never shared, the tokens may not see the same data.
+    """
+
+    def __init__(self, memo_patterns=MEMO_PATTERNS, memo_ttl=MEMO_TTL, **kwargs):
+        super().__init__(**kwargs)
+        self.memo_patterns = [re.compile(pattern) for pattern in memo_patterns]
+        self.memo_ttl = memo_ttl
+        self._lock = threading.Lock()
+        self._in_flight = {}
+        self._memo = {}
+
+    def is_memoized(self, url) -> bool:
+        """Check if the resource of the url does not change during a run"""
+        path = urlparse(url).path
+        return any(pattern.search(path) for pattern in self.memo_patterns)
+
+    def send(self, request, *args, **kwargs):  # pylint: disable=arguments-differ
+        if request.method != "GET" or kwargs.get("stream"):
+            return super().send(request, *args, **kwargs)
+
+        key = (
+            request.url,
+            request.headers.get("Accept"),
+            request.headers.get("If-None-Match"),
+            hash_credentials(request.headers.get("Authorization")),
+        )
+        with self._lock:
+            memo = self._memo.get(key)
+            if memo and memo[0] > time.monotonic():
+                # The rate limit headers of a replay are stale, keep them from the response hooks
+                request.hooks["response"] = []
+                return share_response(memo[1], request)
+            future = self._in_flight.get(key)
+            leader = future is None
+            if leader:
+                future = Future()
+                self._in_flight[key] = future
+        if not leader:
+            return share_response(future.result(), request)
+
+        try:
+            response = super().send(request, *args, **kwargs)
+            # Read the body so the response can be shared
+            _ = response.content
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                del self._in_flight[key]
+        if response.status_code == 200 and self.is_memoized(request.url):
+            with self._lock:
+                self._memo[key] = (time.monotonic() + self.memo_ttl, response)
+        future.set_result(response)
+        return response
+
+
+def hash_credentials(authorization) -> str | None:
+    """Hash the Authorization header of a request so the tokens are not kept in the keys"""
+    if authorization is None:
+        return None
+    if isinstance(authorization, str):
+        authorization = authorization.encode("utf-8")
+    return hashlib.sha256(authorization).hexdigest()
+
+
+def share_response(response, request):
+    """Copy a response sent for another identical request"""
+    shared = copy.copy(response)
+    shared.request = request
+    return shared
+
+
+def mount_coalescing_adapter(session, pool_maxsize):
+    """
+    Share identical concurrent GET requests of the session
+
+    Args:
+        session (requests.Session): the session of the GitHub connection
+        pool_maxsize (int): the number of connections kept per host
+    """
+    adapter = CoalescingAdapter(pool_maxsize=pool_maxsize)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
@@ -1,22 +1,342 @@
+# pylint: disable=too-many-lines
 """This module contains the function to build the dependabot.yml file for a repo"""
 
 import base64
 import copy
+import functools
 import io
+import itertools
+import json
+import multiprocessing
+import os
+import posixpath
+import re
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from types import MappingProxyType
 
 import github3
 import ruamel.yaml
 from exceptions import OptionalFileNotFoundError, check_optional_file
 from ruamel.yaml.scalarstring import SingleQuotedScalarString
 
-# Define data structure for dependabot.yaml
-data = {
-    "version": 2,
-    "updates": [],
-}
+# Maximum number of rendered new dependabot.yml files kept in memory
+RENDER_CACHE_SIZE = 256
 
-yaml = ruamel.yaml.YAML()
-stream = io.StringIO()
+render_cache: OrderedDict = OrderedDict()
+render_cache_lock = threading.Lock()
+
+# Maximum number of parsed existing dependabot.yml files kept in memory
+EXISTING_CONFIG_CACHE_SIZE = 256
+
+# Parsed existing dependabot.yml files and their (package ecosystem, directory) pairs by git blob SHA
+existing_config_cache: OrderedDict = OrderedDict()
+existing_ecosystems_cache: dict = {}
+existing_config_cache_lock = threading.Lock()
+
+# Rest of the line of a top level key followed by a block, ie. "updates:  # comment"
+TOP_LEVEL_BLOCK_PATTERN = re.compile(r"[ ]*(#.*)?")
+
+# Directory of the new entries, the manifests are looked up at the root of the repo
+ROOT_DIRECTORY = "/"
+
+# Longest scalar the fast emitter writes, longer ones could be folded by ruamel
+FAST_SCALAR_MAX_LENGTH = 50
+
+
+def new_dependabot_config() -> dict:
+    """Create the data structure of a new dependabot.yaml"""
+    return {
+        "version": 2,
+        "updates": [],
+    }
+
+
+def load_dependabot_config(content):
+    """
+    Load an existing dependabot.yml preserving its quotes. Every call uses its own
+    YAML instance so configurations can be loaded on several threads at once.
+
+    Args:
+        content (bytes | IO): the content of the dependabot.yml file
+
+    Returns:
+        the dependabot configuration
+    """
+    loader = ruamel.yaml.YAML()
+    loader.preserve_quotes = True
+    return loader.load(content)
+
+
+def parse_existing_dependabot_config(existing_config):
+    """Parse the content of an existing dependabot.yml file fetched from GitHub"""
+    try:
+        return load_dependabot_config(base64.b64decode(existing_config.content))
+    except ruamel.yaml.YAMLError as e:
+        print(f"YAML indentation error: {e}")
+        raise
+
+
+def get_blob_sha(existing_config):
+    """Get the git blob SHA of an existing dependabot.yml file, None if unknown"""
+    sha = getattr(existing_config, "sha", None)
+    if isinstance(sha, str) and sha:
+        return sha
+    return None
+
+
+def get_cached_dependabot_config(existing_config):
+    """
+    Get the parsed existing dependabot.yml, parsing every git blob only once. The
+    returned configuration is shared and must not be modified.
+
+    Args:
+        existing_config: the existing dependabot configuration file
+
+    Returns:
+        the dependabot configuration
+    """
+    return cache_dependabot_config(
+        get_blob_sha(existing_config),
+        lambda: parse_existing_dependabot_config(existing_config),
+    )
+
+
+def cache_dependabot_config(sha, parse):
+    """
+    Get the parsed dependabot.yml of a git blob from the cache, parsing and caching it
+    when it is missing. The returned configuration is shared and must not be modified.
+
+    Args:
+        sha (str | None): the git blob SHA of the file, None to parse it without caching
+        parse (Callable[[], Any]): parses the file
+
+    Returns:
+        the dependabot configuration
+    """
+    if sha is None:
+        return parse()
+
+    with existing_config_cache_lock:
+        dependabot_config = existing_config_cache.get(sha)
+        if dependabot_config is not None:
+            existing_config_cache.move_to_end(sha)
+            return dependabot_config
+
+    dependabot_config = parse()
+    existing_ecosystems = index_existing_ecosystems(dependabot_config)
+    with existing_config_cache_lock:
+        existing_config_cache[sha] = dependabot_config
+        while len(existing_config_cache) > EXISTING_CONFIG_CACHE_SIZE:
+            existing_config_cache.popitem(last=False)
+        existing_ecosystems_cache[sha] = existing_ecosystems
+    return dependabot_config
+
+
+def load_existing_dependabot_config(existing_config):
+    """
+    Load an existing dependabot.yml, parsing identical files of several repos only once
+
+    Args:
+        existing_config: the existing dependabot configuration file
+
+    Returns:
+        a copy of the dependabot configuration the caller can modify
+    """
+    return copy.deepcopy(get_cached_dependabot_config(existing_config))
+
+
+def get_existing_ecosystems(
+    existing_config, parse_pool=None
+) -> frozenset[tuple[str, str]]:
+    """
+    Get the (package ecosystem, directory) pairs of an existing dependabot.yml, parsing
+    every git blob only once across the repos and, with a cache file, across the runs
+
+    Args:
+        existing_config: the existing dependabot configuration file
+        parse_pool (ParsePool | None): the pool parsing the existing files
+
+    Returns:
+        frozenset[tuple[str, str]]: the index of the existing configuration
+    """
+    sha = get_blob_sha(existing_config)
+    with existing_config_cache_lock:
+        existing_ecosystems = existing_ecosystems_cache.get(sha)
+    if existing_ecosystems is not None:
+        return existing_ecosystems
+
+    if not parse_pool:
+        return index_existing_ecosystems(get_cached_dependabot_config(existing_config))
+
+    try:
+        existing_ecosystems = parse_pool.submit(
+            sha,
+            read_existing_ecosystems,
+            base64.b64decode(existing_config.content),
+            sha,
+        ).result()
+    except ruamel.yaml.YAMLError as e:
+        print(f"YAML indentation error: {e}")
+        raise
+    if sha is not None:
+        with existing_config_cache_lock:
+            existing_ecosystems_cache[sha] = existing_ecosystems
+    return existing_ecosystems
+
+
+class ParsePool:
+    """
+    Process pool parsing and merging the existing dependabot.yml files. The work on a
+    git blob always runs on the same worker, so merging new entries into a file
+    reuses the parse of the worker that read its ecosystems.
+    The workers are spawned from a fresh interpreter: forking the process that already
+    runs the I/O and writer threads could copy a lock one of them holds and deadlock.
+    """
+
+    def __init__(self, workers):
+        context = multiprocessing.get_context("spawn")
+        self._executors = [
+            ProcessPoolExecutor(max_workers=1, mp_context=context)
+            for _ in range(workers)
+        ]
+        # Work without a git blob SHA is spread over the workers in turn
+        self._next_worker = itertools.count()
+
+    def submit(self, sha, fn, *args):
+        """
+        Run fn(*args) on the worker of the git blob
+
+        Args:
+            sha (str | None): the git blob SHA of the file, None to use any worker
+            fn (Callable): the function to run
+            args: the arguments of the function
+
+        Returns:
+            concurrent.futures.Future: the result of the function
+        """
+        if sha is None:
+            index = next(self._next_worker)
+        else:
+            index = hash(sha)
+        return self._executors[index % len(self._executors)].submit(fn, *args)
+
+    def shutdown(self):
+        """Stop the workers once their work is done"""
+        for executor in self._executors:
+            executor.shutdown()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.shutdown()
+
+
+def create_parse_pool(workers) -> ParsePool:
+    """
+    Create the process pool parsing and merging the existing dependabot.yml files
+
+    Args:
+        workers (int): the number of worker processes
+
+    Returns:
+        ParsePool: the pool
+    """
+    return ParsePool(workers)
+
+
+def load_existing_ecosystems_cache(path):
+    """
+    Load the (package ecosystem, directory) pairs of the existing dependabot.yml files
+    found by the previous runs. A missing or invalid cache file is ignored.
+
+    Args:
+        path (str): the path of the cache file
+    """
+    try:
+        with open(path, "r", encoding="utf-8") as cache_file:
+            cached_ecosystems = json.load(cache_file)
+    except FileNotFoundError:
+        return
+    except (OSError, ValueError) as e:
+        print(f"Ignoring the existing config cache file {path}: {e}")
+        return
+    if not isinstance(cached_ecosystems, dict):
+        print(f"Ignoring the existing config cache file {path}: not a mapping")
+        return
+
+    with existing_config_cache_lock:
+        for sha, pairs in cached_ecosystems.items():
+            # Skip the entries that are not lists of [ecosystem, directory] pairs
+            if isinstance(pairs, list) and all(
+                isinstance(pair, list) and len(pair) == 2 for pair in pairs
+            ):
+                existing_ecosystems_cache.setdefault(
+                    sha,
+                    frozenset(
+                        (str(ecosystem), str(directory))
+                        for ecosystem, directory in pairs
+                    ),
+                )
+
+
+def save_existing_ecosystems_cache(path):
+    """
+    Save the (package ecosystem, directory) pairs of the existing dependabot.yml files
+    for the next runs
+
+    Args:
+        path (str): the path of the cache file
+    """
+    with existing_config_cache_lock:
+        cached_ecosystems = {
+            sha: sorted([ecosystem, directory] for ecosystem, directory in pairs)
+            for sha, pairs in existing_ecosystems_cache.items()
+        }
+    if os.path.dirname(path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+    # Replace the file at once so an interrupted run never leaves a truncated cache
+    with open(f"{path}.tmp", "w", encoding="utf-8") as cache_file:
+        json.dump(cached_ecosystems, cache_file, sort_keys=True)
+    os.replace(f"{path}.tmp", path)
+
+
+def load_extra_dependabot_config(dependabot_config_file):
+    """
+    Load and validate the DEPENDABOT_CONFIG_FILE once per run into a read-only table
+    of the private registry configuration of each package ecosystem
+
+    Args:
+        dependabot_config_file: the path of the DEPENDABOT_CONFIG_FILE
+
+    Returns:
+        MappingProxyType | None: the private registry configuration of each package ecosystem or None if the file is empty
+
+    Raises:
+        ValueError: the file is not valid YAML or not a private registries configuration
+    """
+    try:
+        with open(dependabot_config_file, "r", encoding="utf-8") as config_file:
+            extra_dependabot_config = load_dependabot_config(config_file)
+    except ruamel.yaml.YAMLError as e:
+        raise ValueError(
+            f"DEPENDABOT_CONFIG_FILE {dependabot_config_file} is not valid YAML: {e}"
+        ) from e
+
+    if extra_dependabot_config is None:
+        return None
+    if not isinstance(extra_dependabot_config, dict):
+        raise ValueError(
+            f"DEPENDABOT_CONFIG_FILE {dependabot_config_file} must map package ecosystems to private registries"
+        )
+    for ecosystem, registry in extra_dependabot_config.items():
+        if not isinstance(registry, dict) or "type" not in registry:
+            raise ValueError(
+                f"The {ecosystem} private registry in DEPENDABOT_CONFIG_FILE {dependabot_config_file} must be a mapping with a type"
+            )
+    return MappingProxyType(dict(extra_dependabot_config))
 
 
 def make_dependabot_config(
@@ -27,9 +347,9 @@ def make_dependabot_config(
     labels,
     dependabot_config,
     extra_dependabot_config,
-) -> str:
+) -> dict:
     """
-    Make the dependabot configuration for a specific package ecosystem
+    Add the dependabot configuration for a specific package ecosystem to dependabot_config
 
     Args:
         ecosystem: the package ecosystem to make the dependabot configuration for
@@ -41,7 +361,7 @@ def make_dependabot_config(
         extra_dependabot_config: File with the configuration to add dependabot configs (ex: private registries)
 
     Returns:
-        str: the dependabot configuration for the package ecosystem
+        dict: dependabot_config with the package ecosystem added
     """
 
     dependabot_config["updates"].append(
@@ -97,7 +417,228 @@ def make_dependabot_config(
             }
         )
 
-    return yaml.dump(dependabot_config, stream)
+    return dependabot_config
+
+
+def dump_dependabot_config(dependabot_config) -> str:
+    """
+    Serialize the dependabot configuration of a repo to YAML
+
+    Args:
+        dependabot_config: the dependabot configuration built by build_dependabot_file
+
+    Returns:
+        str: the dependabot.yml file content
+    """
+    dumper = ruamel.yaml.YAML()
+    dumper.indent(mapping=2, sequence=4, offset=2)
+    stream = io.StringIO()
+    dumper.dump(dependabot_config, stream)
+    return stream.getvalue()
+
+
+def fingerprint(value):
+    """
+    Build a hashable fingerprint of a YAML value that also tells the quoting styles
+    of the scalars apart
+
+    Args:
+        value: the YAML value
+
+    Returns:
+        tuple: the fingerprint of the value
+    """
+    if isinstance(value, dict):
+        return (
+            "dict",
+            tuple((fingerprint(key), fingerprint(item)) for key, item in value.items()),
+        )
+    if isinstance(value, list):
+        return ("list", tuple(fingerprint(item) for item in value))
+    return (type(value).__name__, value)
+
+
+def is_simple_scalar(value) -> bool:
+    """Check if ruamel writes the value as a single quoted scalar on one line"""
+    return (
+        isinstance(value, str)
+        and len(value) <= FAST_SCALAR_MAX_LENGTH
+        and value.isascii()
+        and value.isprintable()
+    )
+
+
+def quote(value) -> str:
+    """Write the value as a single quoted YAML scalar"""
+    return "'" + value.replace("'", "''") + "'"
+
+
+@functools.lru_cache(maxsize=None)
+def ecosystem_fragment(ecosystem) -> str:
+    """Get the text of the update entry fields specific to the package ecosystem"""
+    return f"  - package-ecosystem: {quote(ecosystem)}\n    directory: '/'\n"
+
+
+@functools.lru_cache(maxsize=RENDER_CACHE_SIZE)
+def settings_fragment(group_dependencies, schedule, schedule_day, labels) -> str:
+    """Get the text of the update entry fields shared by every package ecosystem"""
+    fragment = f"    schedule:\n      interval: {quote(schedule)}\n"
+    if schedule_day:
+        fragment += f"      day: {quote(schedule_day)}\n"
+    if labels:
+        fragment += "    labels:\n"
+        fragment += "".join(f"      - {quote(label)}\n" for label in labels)
+    if group_dependencies:
+        fragment += (
+            "    groups:\n"
+            "      production-dependencies:\n"
+            "        dependency-type: 'production'\n"
+            "      development-dependencies:\n"
+            "        dependency-type: 'development'\n"
+        )
+    return fragment
+
+
+def emit_new_dependabot_config(
+    ecosystems, group_dependencies, schedule, schedule_day, labels
+) -> str | None:
+    """
+    Write a new dependabot.yml without private registries from precompiled text
+    fragments. The output is identical to the ruamel serialization of the configuration
+    built by make_dependabot_config.
+
+    Args:
+        ecosystems: the package ecosystems in the order they were detected
+        group_dependencies: whether to group dependencies in the dependabot.yml file
+        schedule: the schedule to run dependabot ex: "daily"
+        schedule_day: the day of the week to run dependabot ex: "monday" if schedule is "weekly"
+        labels: the list of labels to be added to dependabot configuration
+
+    Returns:
+        str | None: the dependabot.yml file content, or None if a value needs the ruamel emitter
+    """
+    labels = tuple(labels or [])
+    values = [*ecosystems, schedule, *labels]
+    if schedule_day:
+        values.append(schedule_day)
+    if not all(is_simple_scalar(value) for value in values):
+        return None
+    settings = settings_fragment(
+        bool(group_dependencies), schedule, schedule_day, labels
+    )
+    return "version: 2\nupdates:\n" + "".join(
+        ecosystem_fragment(str(ecosystem)) + settings for ecosystem in ecosystems
+    )
+
+
+def render_new_dependabot_config(
+    ecosystems,
+    group_dependencies,
+    schedule,
+    schedule_day,
+    labels,
+    extra_dependabot_config,
+) -> str:
+    """
+    Render a new dependabot.yml for the package ecosystems. The rendered files are
+    kept in a LRU cache keyed by the ecosystems and the settings, so repos needing the
+    same file skip the YAML serialization.
+
+    Args:
+        ecosystems: the package ecosystems in the order they were detected
+        group_dependencies: whether to group dependencies in the dependabot.yml file
+        schedule: the schedule to run dependabot ex: "daily"
+        schedule_day: the day of the week to run dependabot ex: "monday" if schedule is "weekly"
+        labels: the list of labels to be added to dependabot configuration
+        extra_dependabot_config: File with the configuration to add dependabot configs (ex: private registries)
+
+    Returns:
+        str: the dependabot.yml file content
+    """
+    extra_key = None
+    if extra_dependabot_config:
+        extra_key = tuple(
+            fingerprint(extra_dependabot_config.get(ecosystem))
+            for ecosystem in ecosystems
+        )
+    key = (
+        tuple(ecosystems),
+        bool(group_dependencies),
+        schedule,
+        schedule_day,
+        tuple(labels or []),
+        extra_key,
+    )
+    with render_cache_lock:
+        if key in render_cache:
+            render_cache.move_to_end(key)
+            return render_cache[key]
+
+    rendered = None
+    # Private registries are arbitrary YAML so they always go through ruamel
+    if not extra_dependabot_config or not any(
+        extra_dependabot_config.get(ecosystem) for ecosystem in ecosystems
+    ):
+        rendered = emit_new_dependabot_config(
+            ecosystems, group_dependencies, schedule, schedule_day, labels
+        )
+    if rendered is None:
+        dependabot_config = new_dependabot_config()
+        for ecosystem in ecosystems:
+            make_dependabot_config(
+                ecosystem,
+                group_dependencies,
+                schedule,
+                schedule_day,
+                labels,
+                dependabot_config,
+                extra_dependabot_config,
+            )
+        rendered = dump_dependabot_config(dependabot_config)
+
+    with render_cache_lock:
+        render_cache[key] = rendered
+        render_cache.move_to_end(key)
+        while len(render_cache) > RENDER_CACHE_SIZE:
+            render_cache.popitem(last=False)
+    return rendered
+
+
+def render_dependabot_file(
+    dependabot_file,
+    existing_config,
+    group_dependencies,
+    schedule,
+    schedule_day,
+    labels,
+    extra_dependabot_config,
+) -> str:
+    """
+    Render the dependabot.yml file built by build_dependabot_file
+
+    Args:
+        dependabot_file: the dependabot configuration built by build_dependabot_file
+        existing_config: the existing dependabot configuration file or None if it doesn't exist
+        group_dependencies: whether to group dependencies in the dependabot.yml file
+        schedule: the schedule to run dependabot ex: "daily"
+        schedule_day: the day of the week to run dependabot ex: "monday" if schedule is "weekly"
+        labels: the list of labels to be added to dependabot configuration
+        extra_dependabot_config: File with the configuration to add dependabot configs (ex: private registries)
+
+    Returns:
+        str: the dependabot.yml file content
+    """
+    # An existing file keeps its own content and formatting so it is always serialized
+    if existing_config:
+        return dump_dependabot_config(dependabot_file)
+    return render_new_dependabot_config(
+        [update["package-ecosystem"] for update in dependabot_file["updates"]],
+        group_dependencies,
+        schedule,
+        schedule_day,
+        labels,
+        extra_dependabot_config,
+    )
 
 
 def build_dependabot_file(
@@ -110,9 +651,9 @@ def build_dependabot_file(
     schedule_day,
     labels,
     extra_dependabot_config,
-) -> str | None:
+) -> dict | None:
     """
-    Build the dependabot.yml file for a repo based on the repo contents
+    Build the dependabot.yml configuration for a repo based on the repo contents
 
     Args:
         repo: the repository to build the dependabot.yml file for
@@ -126,43 +667,487 @@ def build_dependabot_file(
         extra_dependabot_config: File with the configuration to add dependabot configs (ex: private registries)
 
     Returns:
-        str: the dependabot.yml file for the repo
-    """
-    package_managers_found = {
-        "bundler": False,
-        "npm": False,
-        "pip": False,
-        "cargo": False,
-        "gomod": False,
-        "composer": False,
-        "mix": False,
-        "nuget": False,
-        "docker": False,
-        "terraform": False,
-        "github-actions": False,
-        "maven": False,
-    }
+        dict | None: the dependabot configuration for the repo or None if no new package manager was found
+    """
+    existing_ecosystems: frozenset[tuple[str, str]] = frozenset()
+    if existing_config:
+        existing_ecosystems = get_existing_ecosystems(existing_config)
+
+    ecosystems = detect_package_managers(
+        repo,
+        get_repo_exempt_ecosystems(repo, exempt_ecosystems, repo_specific_exemptions),
+        existing_ecosystems,
+    )
+    if not ecosystems:
+        return None
 
-    # create a local copy in order to avoid overwriting the global exemption list
-    exempt_ecosystems_list = exempt_ecosystems.copy()
     if existing_config:
-        yaml.preserve_quotes = True
-        try:
-            dependabot_file = yaml.load(base64.b64decode(existing_config.content))
-        except ruamel.yaml.YAMLError as e:
-            print(f"YAML indentation error: {e}")
-            raise
+        dependabot_file = load_existing_dependabot_config(existing_config)
     else:
-        dependabot_file = copy.deepcopy(data)
+        dependabot_file = new_dependabot_config()
+    for ecosystem in ecosystems:
+        make_dependabot_config(
+            ecosystem,
+            group_dependencies,
+            schedule,
+            schedule_day,
+            labels,
+            dependabot_file,
+            extra_dependabot_config,
+        )
+
+    return dependabot_file
+
 
-    add_existing_ecosystem_to_exempt_list(exempt_ecosystems_list, dependabot_file)
+def generate_dependabot_file(
+    repo,
+    group_dependencies,
+    exempt_ecosystems,
+    repo_specific_exemptions,
+    existing_config,
+    schedule,
+    schedule_day,
+    labels,
+    extra_dependabot_config,
+    parse_pool=None,
+) -> str | None:
+    """
+    Build and render the dependabot.yml file for a repo based on the repo contents
+
+    Args:
+        repo: the repository to build the dependabot.yml file for
+        group_dependencies: whether to group dependencies in the dependabot.yml file
+        exempt_ecosystems: the list of ecosystems to ignore
+        repo_specific_exemptions: the list of ecosystems to ignore for a specific repo
+        existing_config: the existing dependabot configuration file or None if it doesn't exist
+        schedule: the schedule to run dependabot ex: "daily"
+        schedule_day: the day of the week to run dependabot ex: "monday" if schedule is "daily"
+        labels: the list of labels to be added to dependabot configuration
+        extra_dependabot_config: File with the configuration to add dependabot configs (ex: private registries)
+        parse_pool (ParsePool | None): the pool parsing and merging existing files
+
+    Returns:
+        str | None: the dependabot.yml file content or None if no new package manager was found
+    """
+    if existing_config:
+        return build_existing_dependabot_file(
+            parse_pool,
+            repo,
+            group_dependencies,
+            exempt_ecosystems,
+            repo_specific_exemptions,
+            existing_config,
+            schedule,
+            schedule_day,
+            labels,
+            extra_dependabot_config,
+        )
+
+    # A new file is rendered from the detected ecosystems without building its configuration
+    ecosystems = detect_package_managers(
+        repo,
+        get_repo_exempt_ecosystems(repo, exempt_ecosystems, repo_specific_exemptions),
+    )
+    if not ecosystems:
+        return None
+    return render_new_dependabot_config(
+        ecosystems,
+        group_dependencies,
+        schedule,
+        schedule_day,
+        labels,
+        extra_dependabot_config,
+    )
+
+
+def build_existing_dependabot_file(
+    parse_pool,
+    repo,
+    group_dependencies,
+    exempt_ecosystems,
+    repo_specific_exemptions,
+    existing_config,
+    schedule,
+    schedule_day,
+    labels,
+    extra_dependabot_config,
+) -> str | None:
+    """
+    Build and render the updated dependabot.yml of a repo with an existing configuration.
+    The new entries are patched into the existing text when possible. With a process
+    pool the CPU bound YAML work runs on other cores while the threads keep probing
+    the repos.
+
+    Args:
+        parse_pool (ParsePool | None): the pool parsing and merging the existing files
+        repo: the repository to build the dependabot.yml file for
+        group_dependencies: whether to group dependencies in the dependabot.yml file
+        exempt_ecosystems: the list of ecosystems to ignore
+        repo_specific_exemptions: the list of ecosystems to ignore for a specific repo
+        existing_config: the existing dependabot configuration file
+        schedule: the schedule to run dependabot ex: "daily"
+        schedule_day: the day of the week to run dependabot ex: "monday" if schedule is "daily"
+        labels: the list of labels to be added to dependabot configuration
+        extra_dependabot_config: File with the configuration to add dependabot configs (ex: private registries)
+
+    Returns:
+        str | None: the dependabot.yml file content or None if no new package manager was found
+    """
+    existing_ecosystems = get_existing_ecosystems(existing_config, parse_pool)
+
+    ecosystems = detect_package_managers(
+        repo,
+        get_repo_exempt_ecosystems(repo, exempt_ecosystems, repo_specific_exemptions),
+        existing_ecosystems,
+    )
+    if not ecosystems:
+        return None
+
+    content = base64.b64decode(existing_config.content)
+    if parse_pool:
+        sha = get_blob_sha(existing_config)
+        return parse_pool.submit(
+            sha,
+            merge_existing_dependabot_config,
+            content,
+            sha,
+            existing_ecosystems,
+            ecosystems,
+            group_dependencies,
+            schedule,
+            schedule_day,
+            labels,
+            dict(extra_dependabot_config) if extra_dependabot_config else None,
+        ).result()
+
+    patched = patch_existing_dependabot_config(
+        content,
+        existing_ecosystems,
+        ecosystems,
+        group_dependencies,
+        schedule,
+        schedule_day,
+        labels,
+        extra_dependabot_config,
+    )
+    if patched is not None:
+        return patched
+
+    # Fall back to the round-trip of the parsed configuration kept for the blob
+    dependabot_file = load_existing_dependabot_config(existing_config)
+    for ecosystem in ecosystems:
+        make_dependabot_config(
+            ecosystem,
+            group_dependencies,
+            schedule,
+            schedule_day,
+            labels,
+            dependabot_file,
+            extra_dependabot_config,
+        )
+    return dump_dependabot_config(dependabot_file)
+
+
+def read_existing_ecosystems(content, sha=None) -> frozenset[tuple[str, str]]:
+    """
+    Parse an existing dependabot.yml and index its (package ecosystem, directory) pairs.
+    In a pool worker the parsed file is kept by git blob SHA so merging new entries
+    into it on the same worker does not parse it again.
+
+    Args:
+        content (bytes): the content of the dependabot.yml file
+        sha (str | None): the git blob SHA of the file
+
+    Returns:
+        frozenset[tuple[str, str]]: the index of the existing configuration
+    """
+    return index_existing_ecosystems(
+        cache_dependabot_config(sha, lambda: load_dependabot_config(content))
+    )
+
+
+def merge_existing_dependabot_config(
+    content,
+    sha,
+    existing_ecosystems,
+    ecosystems,
+    group_dependencies,
+    schedule,
+    schedule_day,
+    labels,
+    extra_dependabot_config,
+) -> str:
+    """
+    Add the package ecosystems to an existing dependabot.yml and render it, patching
+    the text when possible and falling back to a full round-trip otherwise
 
+    Args:
+        content (bytes): the content of the existing dependabot.yml file
+        sha (str | None): the git blob SHA of the file, to reuse the file parsed by read_existing_ecosystems
+        existing_ecosystems: the (package ecosystem, directory) pairs of the existing configuration
+        ecosystems: the package ecosystems to add
+        group_dependencies: whether to group dependencies in the dependabot.yml file
+        schedule: the schedule to run dependabot ex: "daily"
+        schedule_day: the day of the week to run dependabot ex: "monday" if schedule is "daily"
+        labels: the list of labels to be added to dependabot configuration
+        extra_dependabot_config: File with the configuration to add dependabot configs (ex: private registries)
+
+    Returns:
+        str: the updated dependabot.yml file content
+    """
+    patched = patch_existing_dependabot_config(
+        content,
+        existing_ecosystems,
+        ecosystems,
+        group_dependencies,
+        schedule,
+        schedule_day,
+        labels,
+        extra_dependabot_config,
+    )
+    if patched is not None:
+        return patched
+
+    dependabot_config = copy.deepcopy(
+        cache_dependabot_config(sha, lambda: load_dependabot_config(content))
+    )
+    for ecosystem in ecosystems:
+        make_dependabot_config(
+            ecosystem,
+            group_dependencies,
+            schedule,
+            schedule_day,
+            labels,
+            dependabot_config,
+            extra_dependabot_config,
+        )
+    return dump_dependabot_config(dependabot_config)
+
+
+def find_top_level_block(lines, key, sequence):
+    """
+    Find the block of a top level key of a dependabot.yml written in block style
+
+    Args:
+        lines (list[str]): the lines of the dependabot.yml file
+        key (str): the top level key ex: "updates"
+        sequence (bool): whether the block is a sequence, which may not be indented
+
+    Returns:
+        tuple[int, int] | None: the index of the last line of the block and the
+        indentation of its children, None if the key is missing or not in block style
+    """
+    starts = [index for index, line in enumerate(lines) if line.startswith(f"{key}:")]
+    if len(starts) != 1 or not TOP_LEVEL_BLOCK_PATTERN.fullmatch(
+        lines[starts[0]].rstrip("\n").partition(":")[2]
+    ):
+        return None
+
+    last = starts[0]
+    indent = None
+    for index in range(starts[0] + 1, len(lines)):
+        line = lines[index].rstrip("\n")
+        if not line.strip():
+            continue
+        if not line.startswith(" ") and not (
+            sequence and (line == "-" or line.startswith("- "))
+        ):
+            break
+        last = index
+        content = line.lstrip(" ")
+        if indent is None and not content.startswith("#"):
+            if sequence != content.startswith("-"):
+                return None
+            indent = len(line) - len(content)
+    if indent is None:
+        return None
+    return last, indent
+
+
+def reindent_fragment(lines, indent):
+    """
+    Move the lines of a fragment dumped with an indentation of 2 to another indentation
+
+    Returns:
+        list[str] | None: the moved lines, None if they cannot be moved
+    """
+    if indent >= 2:
+        return [" " * (indent - 2) + line for line in lines]
+    if not all(line.startswith("  ") for line in lines):
+        return None
+    return [line[2:] for line in lines]
+
+
+def patch_existing_dependabot_config(
+    content,
+    existing_ecosystems,
+    ecosystems,
+    group_dependencies,
+    schedule,
+    schedule_day,
+    labels,
+    extra_dependabot_config,
+) -> str | None:
+    """
+    Add the package ecosystems to an existing dependabot.yml by appending text to its
+    updates (and registries) blocks, keeping the rest of the file byte for byte. The
+    patched file is parsed to check that it holds the existing and the new entries.
+
+    Args:
+        content (bytes): the content of the existing dependabot.yml file
+        existing_ecosystems: the (package ecosystem, directory) pairs of the existing configuration
+        ecosystems: the package ecosystems to add
+        group_dependencies: whether to group dependencies in the dependabot.yml file
+        schedule: the schedule to run dependabot ex: "daily"
+        schedule_day: the day of the week to run dependabot ex: "monday" if schedule is "daily"
+        labels: the list of labels to be added to dependabot configuration
+        extra_dependabot_config: File with the configuration to add dependabot configs (ex: private registries)
+
+    Returns:
+        str | None: the updated dependabot.yml file content, None if the file has to be
+        updated with a full round-trip
+    """
+    try:
+        text = content.decode("utf-8")
+    except UnicodeDecodeError:
+        return None
+    if "\r" in text:
+        return None
+
+    additions = new_dependabot_config()
+    for ecosystem in ecosystems:
+        make_dependabot_config(
+            ecosystem,
+            group_dependencies,
+            schedule,
+            schedule_day,
+            labels,
+            additions,
+            extra_dependabot_config,
+        )
+
+    lines = text.splitlines(keepends=True)
+    if lines and not lines[-1].endswith("\n"):
+        lines[-1] += "\n"
+    patched_lines = insert_dependabot_additions(lines, additions)
+    if patched_lines is None:
+        return None
+    patched = "".join(patched_lines)
+
+    try:
+        patched_config = load_dependabot_config(patched)
+    except ruamel.yaml.YAMLError:
+        return None
+    if not isinstance(patched_config, dict) or not is_patched(
+        patched_config, existing_ecosystems, additions
+    ):
+        return None
+    return patched
+
+
+def insert_dependabot_additions(lines, additions):
+    """
+    Insert the dumped entries of additions at the end of the updates and registries
+    blocks of an existing dependabot.yml. A missing registries block is added at the
+    end of the file like the round-trip does.
+
+    Args:
+        lines (list[str]): the lines of the existing dependabot.yml file
+        additions: the dependabot configuration holding the entries to add
+
+    Returns:
+        list[str] | None: the patched lines, None if the blocks cannot be patched as text
+    """
+    insertions = []
+    appended = []
+    for key, sequence in (("updates", True), ("registries", False)):
+        if key not in additions:
+            continue
+        fragment = dump_dependabot_config({key: additions[key]}).splitlines(
+            keepends=True
+        )
+        block = find_top_level_block(lines, key, sequence)
+        if block is None:
+            if key == "updates" or any(line.startswith(f"{key}:") for line in lines):
+                return None
+            appended = fragment
+            continue
+        last, indent = block
+        children = reindent_fragment(fragment[1:], indent)
+        if children is None:
+            return None
+        insertions.append((last + 1, children))
+
+    patched_lines = list(lines)
+    # Insert from the bottom so the positions of the other blocks stay valid
+    for position, children in sorted(
+        insertions, key=lambda item: item[0], reverse=True
+    ):
+        patched_lines[position:position] = children
+    return patched_lines + appended
+
+
+def is_patched(patched_config, existing_ecosystems, additions) -> bool:
+    """Check that a patched dependabot.yml holds the existing and the new entries"""
+    updates = patched_config.get("updates")
+    if not isinstance(updates, list):
+        return False
+    existing_count = len(updates) - len(additions["updates"])
+    if existing_count < 0 or updates[existing_count:] != additions["updates"]:
+        return False
+    if (
+        index_existing_ecosystems({"updates": updates[:existing_count]})
+        != existing_ecosystems
+    ):
+        return False
+    registries = patched_config.get("registries") or {}
+    return all(
+        registries.get(name) == registry
+        for name, registry in additions.get("registries", {}).items()
+    )
+
+
+def get_repo_exempt_ecosystems(repo, exempt_ecosystems, repo_specific_exemptions):
+    """
+    Get the ecosystems to ignore for a repo
+
+    Args:
+        repo: the repository to build the dependabot.yml file for
+        exempt_ecosystems: the list of ecosystems to ignore
+        repo_specific_exemptions: the list of ecosystems to ignore for a specific repo
+
+    Returns:
+        list[str]: the ecosystems to ignore for the repo
+    """
     # If there are repository specific exemptions,
     # overwrite the global exemptions for this repo only
     if repo_specific_exemptions and repo.full_name in repo_specific_exemptions:
-        exempt_ecosystems_list = []
-        for ecosystem in repo_specific_exemptions[repo.full_name]:
-            exempt_ecosystems_list.append(ecosystem)
+        return list(repo_specific_exemptions[repo.full_name])
+    return exempt_ecosystems
+
+
+def detect_package_managers(
+    repo, exempt_ecosystems_list, existing_ecosystems=frozenset()
+) -> list[str]:
+    """
+    Detect the package managers used by a repo based on the repo contents
+
+    Args:
+        repo: the repository to inspect
+        exempt_ecosystems_list: the list of ecosystems to ignore
+        existing_ecosystems: the (package ecosystem, directory) pairs already configured
+
+    Returns:
+        list[str]: the package ecosystems found, in the order they were detected
+    """
+    package_managers_found = []
+    # Only an existing entry for the root directory configures the manifests found here
+    exempt_ecosystems = set(exempt_ecosystems_list)
+    exempt_ecosystems.update(
+        ecosystem
+        for ecosystem, directory in existing_ecosystems
+        if directory == ROOT_DIRECTORY
+    )
 
     package_managers = {
         "bundler": ["Gemfile", "Gemfile.lock"],
@@ -189,21 +1174,12 @@ def build_dependabot_file(
 
     # Detect package managers where manifest files have known names
     for manager, manifest_files in package_managers.items():
-        if manager in exempt_ecosystems_list:
+        if manager in exempt_ecosystems:
             continue
         for file in manifest_files:
             try:
                 if check_optional_file(repo, file):
-                    package_managers_found[manager] = True
-                    make_dependabot_config(
-                        manager,
-                        group_dependencies,
-                        schedule,
-                        schedule_day,
-                        labels,
-                        dependabot_file,
-                        extra_dependabot_config,
-                    )
+                    package_managers_found.append(manager)
                     break
             except OptionalFileNotFoundError:
                 # The file does not exist and is not required,
@@ -211,74 +1187,70 @@ def build_dependabot_file(
                 pass
 
     # detect package managers with variable file names
-    if "terraform" not in exempt_ecosystems_list:
+    if "terraform" not in exempt_ecosystems:
         try:
             for file in repo.directory_contents("/"):
                 if file[0].endswith(".tf"):
-                    package_managers_found["terraform"] = True
-                    make_dependabot_config(
-                        "terraform",
-                        group_dependencies,
-                        schedule,
-                        schedule_day,
-                        labels,
-                        dependabot_file,
-                        extra_dependabot_config,
-                    )
+                    package_managers_found.append("terraform")
                     break
         except github3.exceptions.NotFoundError:
             # The file does not exist and is not required,
             # so we should continue to the next one rather than raising error or logging
             pass
-    if "github-actions" not in exempt_ecosystems_list:
+    if "github-actions" not in exempt_ecosystems:
         try:
             for file in repo.directory_contents(".github/workflows"):
                 if file[0].endswith(".yml") or file[0].endswith(".yaml"):
-                    package_managers_found["github-actions"] = True
-                    make_dependabot_config(
-                        "github-actions",
-                        group_dependencies,
-                        schedule,
-                        schedule_day,
-                        labels,
-                        dependabot_file,
-                        extra_dependabot_config,
-                    )
+                    package_managers_found.append("github-actions")
                     break
         except github3.exceptions.NotFoundError:
             # The file does not exist and is not required,
             # so we should continue to the next one rather than raising error or logging
             pass
-    if "devcontainers" not in exempt_ecosystems_list:
+    if "devcontainers" not in exempt_ecosystems:
         try:
             for file in repo.directory_contents(".devcontainer"):
                 if file[0] == "devcontainer.json":
-                    package_managers_found["devcontainers"] = True
-                    make_dependabot_config(
-                        "devcontainers",
-                        group_dependencies,
-                        schedule,
-                        schedule_day,
-                        labels,
-                        dependabot_file,
-                        extra_dependabot_config,
-                    )
+                    package_managers_found.append("devcontainers")
                     break
         except github3.exceptions.NotFoundError:
             # The file does not exist and is not required,
             # so we should continue to the next one rather than raising error or logging
             pass
 
-    if any(package_managers_found.values()):
-        return dependabot_file
-    return None
+    return package_managers_found
+
+
+def normalize_directory(directory) -> str:
+    """
+    Normalize the directory of a dependabot.yml entry, ie. frontend/ to /frontend
+    and . or ./ to /. A recursive glob of the root directory, ie. /**, covers the root.
+    """
+    path = posixpath.normpath("/" + str(directory).strip().lstrip("/"))
+    if path == "/**":
+        return ROOT_DIRECTORY
+    return path
 
 
-def add_existing_ecosystem_to_exempt_list(exempt_ecosystems, existing_config):
+def index_existing_ecosystems(existing_config) -> frozenset[tuple[str, str]]:
     """
-    Add the existing package ecosystems found in the dependabot.yml
-    to the exempt list so we don't get duplicate entries and maintain configuration settings
+    Index the (package ecosystem, directory) pairs configured in the dependabot.yml
+    so we don't get duplicate entries and maintain configuration settings
+
+    Args:
+        existing_config: the existing dependabot configuration
+
+    Returns:
+        frozenset[tuple[str, str]]: the (package ecosystem, directory) pairs
     """
+    pairs = set()
     if existing_config:
-        for entry in existing_config.get("updates", []):
-            exempt_ecosystems.append(entry["package-ecosystem"])
+        for entry in existing_config.get("updates") or []:
+            directories = entry.get("directories") or [
+                entry.get("directory", ROOT_DIRECTORY)
+            ]
+            for directory in directories:
+                pairs.add(
+                    (str(entry["package-ecosystem"]), normalize_directory(directory))
+                )
+    return frozenset(pairs)
@@ -7,10 +7,13 @@ import re
 from os.path import dirname, join
 
 from dotenv import load_dotenv
+from output_writer import OUTPUT_FORMATS
+from repositories import DEFAULT_LISTING_CONCURRENCY
 
 MAX_TITLE_LENGTH = 70
 MAX_BODY_LENGTH = 65536
 MAX_COMMIT_MESSAGE_LENGTH = 65536
+DEFAULT_ORGANIZATION_CONCURRENCY = 2
 
 
 def get_bool_env_var(env_var_name: str, default: bool = False) -> bool:
@@ -94,6 +97,40 @@ def parse_repo_specific_exemptions(repo_specific_exemptions_str: str) -> dict:
     return exemptions_dict
 
 
+def get_read_apps(read_apps_str: str) -> list[tuple[int, int, bytes]]:
+    """Parse the GH_READ_APPS environment variable into a list of GitHub App credentials.
+
+    Args:
+        read_apps_str: The GH_READ_APPS environment variable as a string, comma separated
+            <app id>:<installation id>:<private key> entries.
+
+    Returns:
+        A list of (app id, installation id, private key) tuples.
+    """
+    read_apps = []
+    for read_app in read_apps_str.split(","):
+        if not read_app.strip():
+            continue
+        app_id, _, rest = read_app.strip().partition(":")
+        installation_id, _, private_key = rest.partition(":")
+        if (
+            not app_id.strip().isdigit()
+            or not installation_id.strip().isdigit()
+            or not private_key.strip()
+        ):
+            raise ValueError(
+                "GH_READ_APPS environment variable not formatted correctly. Expected <app id>:<installation id>:<private key> entries."
+            )
+        read_apps.append(
+            (
+                int(app_id),
+                int(installation_id),
+                private_key.strip().encode("utf8"),
+            )
+        )
+    return read_apps
+
+
 def get_env_vars(
     test: bool = False,
 ) -> tuple[
@@ -126,6 +163,26 @@ def get_env_vars(
     str | None,
     list[str],
     str | None,
+    bool,
+    bool,
+    bool,
+    bool,
+    str,
+    int,
+    bool,
+    bool,
+    str,
+    bool,
+    list[str],
+    str,
+    int,
+    bool,
+    list[str],
+    str,
+    int,
+    str,
+    str,
+    list[tuple[int, int, bytes]],
 ]:
     """
     Get the environment variables for use in the action.
@@ -162,6 +219,27 @@ def get_env_vars(
         team_name (str): The team to search for repositories in
         labels (list[str]): A list of labels to be added to dependabot configuration
         dependabot_config_file (str): Dependabot extra configuration file location path
+        skip_empty_repos (bool): Whether to skip repositories without any content
+        skip_disabled_repos (bool): Whether to skip disabled repositories
+        skip_fork_repos (bool): Whether to skip forked repositories
+        skip_template_repos (bool): Whether to skip template repositories
+        code_security_configuration (str): Name of the organization code security configuration used to enable security updates in bulk
+        listing_concurrency (int): The maximum number of concurrent requests used to list repositories
+        server_side_filtering (bool): Whether to filter organization repositories server-side with the search API
+        parallel_pagination (bool): Whether to fetch the pages of the organization repositories concurrently
+        repository_file (str): A file, or - for stdin, to stream the repositories to scan from
+        installation_repositories (bool): Whether to scan every repository the configured GitHub App installation can access
+        organizations (list[str]): The organizations to scan in a single run
+        enterprise_slug (str): The enterprise whose organizations are scanned in a single run
+        organization_concurrency (int): The maximum number of organizations processed at the same time
+        include_child_teams (bool): Whether the repositories of the nested child teams of TEAM_NAME are included
+        read_tokens (list[str]): Additional tokens the read requests are spread over
+        output_dir (str): The directory the generated dependabot file of every repository is written to
+        parse_workers (int): The number of processes parsing and merging existing dependabot files, 0 to disable
+        existing_config_cache_file (str): The file keeping the ecosystems of the existing dependabot files across runs
+        output_format (str): The format of the generated dependabot files, "yaml" or "jsonl"
+        read_apps (list[tuple[int, int, bytes]]): The (app id, installation id, private key) of the
+            additional GitHub Apps the read requests are spread over
     """
 
     if not test:  # pragma: no cover
@@ -171,18 +249,72 @@ def get_env_vars(
 
     organization = os.getenv("ORGANIZATION")
     repositories_str = os.getenv("REPOSITORY")
+    repository_file = os.getenv("REPOSITORY_FILE", "").strip()
     search_query = os.getenv("REPOSITORY_SEARCH_QUERY", "").strip()
     team_name = os.getenv("TEAM_NAME")
-    # Either organization, repository, or search_query must be set
-    if not organization and not repositories_str and not search_query:
+    installation_repositories = get_bool_env_var("INSTALLATION_REPOSITORIES")
+    organizations_str = os.getenv("ORGANIZATIONS", "").strip()
+    enterprise_slug = os.getenv("ENTERPRISE_SLUG", "").strip()
+    # Either organization(s), enterprise_slug, repository, repository_file, search_query,
+    # or installation_repositories must be set
+    if not any(
+        (
+            organization,
+            organizations_str,
+            enterprise_slug,
+            repositories_str,
+            repository_file,
+            search_query,
+            installation_repositories,
+        )
+    ):
         raise ValueError(
-            "ORGANIZATION, REPOSITORY, and REPOSITORY_SEARCH_QUERY environment variables were not set. Please set one"
+            "ORGANIZATION, ORGANIZATIONS, ENTERPRISE_SLUG, REPOSITORY, REPOSITORY_FILE, REPOSITORY_SEARCH_QUERY, "
+            "and INSTALLATION_REPOSITORIES environment variables were not set. Please set one"
+        )
+    # Multi-organization runs replace every other way of selecting repositories
+    if (organizations_str or enterprise_slug) and any(
+        (
+            organization,
+            repositories_str,
+            repository_file,
+            search_query,
+            team_name,
+            installation_repositories,
+            os.getenv("PROJECT_ID"),
         )
+    ):
+        raise ValueError(
+            "ORGANIZATIONS and ENTERPRISE_SLUG environment variables cannot be used with ORGANIZATION, REPOSITORY, "
+            "REPOSITORY_FILE, REPOSITORY_SEARCH_QUERY, TEAM_NAME, INSTALLATION_REPOSITORIES or PROJECT_ID"
+        )
+    # Separate organizations_str into a list based on the comma separator
+    organizations_list = []
+    if organizations_str:
+        organizations_list = [
+            org.strip() for org in organizations_str.split(",") if org.strip()
+        ]
     # Team name and repository are mutually exclusive
     if repositories_str and team_name:
         raise ValueError(
             "TEAM_NAME environment variable cannot be used with REPOSITORY"
         )
+    if repository_file and (repositories_str or team_name):
+        raise ValueError(
+            "REPOSITORY_FILE environment variable cannot be used with REPOSITORY or TEAM_NAME"
+        )
+    include_child_teams = get_bool_env_var("INCLUDE_CHILD_TEAMS")
+    if include_child_teams and not team_name:
+        raise ValueError(
+            "INCLUDE_CHILD_TEAMS environment variable requires TEAM_NAME to be set"
+        )
+    # "-" reads the repositories from stdin
+    if (
+        repository_file
+        and repository_file != "-"
+        and not os.path.exists(repository_file)
+    ):
+        raise ValueError(f"REPOSITORY_FILE {repository_file} was not found")
 
     # Separate repositories_str into a list based on the comma separator
     repositories_list = []
@@ -201,6 +333,26 @@ def get_env_vars(
             "GH_APP_ID set and GH_APP_INSTALLATION_ID or GH_APP_PRIVATE_KEY variable not set"
         )
 
+    if installation_repositories and not gh_app_id:
+        raise ValueError(
+            "INSTALLATION_REPOSITORIES requires GH_APP_ID, GH_APP_INSTALLATION_ID and GH_APP_PRIVATE_KEY to be set"
+        )
+    # The installation listing replaces every other way of selecting repositories
+    if installation_repositories and any(
+        (
+            organization,
+            repositories_str,
+            repository_file,
+            search_query,
+            team_name,
+            os.getenv("PROJECT_ID"),
+        )
+    ):
+        raise ValueError(
+            "INSTALLATION_REPOSITORIES environment variable cannot be used with ORGANIZATION, REPOSITORY, "
+            "REPOSITORY_FILE, REPOSITORY_SEARCH_QUERY, TEAM_NAME or PROJECT_ID"
+        )
+
     token = os.getenv("GH_TOKEN", "")
     if (
         not gh_app_id
@@ -210,6 +362,15 @@ def get_env_vars(
     ):
         raise ValueError("GH_TOKEN environment variable not set")
 
+    # Separate the additional read tokens into a list based on the comma separator
+    read_tokens = [
+        read_token.strip()
+        for read_token in os.getenv("GH_READ_TOKENS", "").split(",")
+        if read_token.strip()
+    ]
+
+    read_apps = get_read_apps(os.getenv("GH_READ_APPS", ""))
+
     ghe = os.getenv("GH_ENTERPRISE_URL", default="").strip()
 
     exempt_repos = os.getenv("EXEMPT_REPOS")
@@ -352,6 +513,50 @@ Please enable it by merging this pull request so that we can keep our dependenci
             f"No dependabot extra configuration found. Please create one in {dependabot_config_file}"
         )
 
+    skip_empty_repos = get_bool_env_var("SKIP_EMPTY_REPOS", default=True)
+    skip_disabled_repos = get_bool_env_var("SKIP_DISABLED_REPOS", default=True)
+    skip_fork_repos = get_bool_env_var("SKIP_FORK_REPOS", default=True)
+    skip_template_repos = get_bool_env_var("SKIP_TEMPLATE_REPOS", default=True)
+
+    code_security_configuration = os.getenv("CODE_SECURITY_CONFIGURATION", "").strip()
+    if code_security_configuration and not (
+        organization or organizations_list or enterprise_slug
+    ):
+        raise ValueError(
+            "CODE_SECURITY_CONFIGURATION environment variable requires ORGANIZATION, ORGANIZATIONS or ENTERPRISE_SLUG to be set"
+        )
+
+    listing_concurrency = get_int_env_var("LISTING_CONCURRENCY")
+    if listing_concurrency is None:
+        listing_concurrency = DEFAULT_LISTING_CONCURRENCY
+    elif listing_concurrency <= 0:
+        raise ValueError("LISTING_CONCURRENCY environment variable is 0 or lower")
+
+    output_dir = os.getenv("OUTPUT_DIR", "").strip()
+
+    parse_workers = get_int_env_var("PARSE_WORKERS")
+    if parse_workers is None:
+        parse_workers = 0
+    elif parse_workers < 0:
+        raise ValueError("PARSE_WORKERS environment variable is lower than 0")
+
+    existing_config_cache_file = os.getenv("EXISTING_CONFIG_CACHE_FILE", "").strip()
+
+    output_format = os.getenv("OUTPUT_FORMAT", "").strip().lower()
+    if output_format and output_format not in OUTPUT_FORMATS:
+        raise ValueError("OUTPUT_FORMAT environment variable not 'yaml' or 'jsonl'")
+    if not output_format:
+        output_format = "yaml"
+
+    server_side_filtering = get_bool_env_var("SERVER_SIDE_FILTERING")
+    parallel_pagination = get_bool_env_var("PARALLEL_PAGINATION")
+
+    organization_concurrency = get_int_env_var("ORGANIZATION_CONCURRENCY")
+    if organization_concurrency is None:
+        organization_concurrency = DEFAULT_ORGANIZATION_CONCURRENCY
+    elif organization_concurrency <= 0:
+        raise ValueError("ORGANIZATION_CONCURRENCY environment variable is 0 or lower")
+
     return (
         organization,
         repositories_list,
@@ -382,4 +587,24 @@ Please enable it by merging this pull request so that we can keep our dependenci
         team_name,
         labels_list,
         dependabot_config_file,
+        skip_empty_repos,
+        skip_disabled_repos,
+        skip_fork_repos,
+        skip_template_repos,
+        code_security_configuration,
+        listing_concurrency,
+        server_side_filtering,
+        parallel_pagination,
+        repository_file,
+        installation_repositories,
+        organizations_list,
+        enterprise_slug,
+        organization_concurrency,
+        include_child_teams,
+        read_tokens,
+        output_dir,
+        parse_workers,
+        existing_config_cache_file,
+        output_format,
+        read_apps,
     )
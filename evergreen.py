@@ -1,17 +1,36 @@
+# pylint: disable=too-many-lines
+
 """This file contains the main() and other functions needed to open an issue/PR dependabot is not enabled but could be"""
 
-import io
+import functools
 import sys
 import uuid
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 
 import auth
+import coalesce
 import env
 import github3
+import repositories
 import requests
-import ruamel.yaml
-from dependabot_file import build_dependabot_file
+from dependabot_file import (
+    create_parse_pool,
+    generate_dependabot_file,
+    load_existing_ecosystems_cache,
+    load_extra_dependabot_config,
+    save_existing_ecosystems_cache,
+)
 from exceptions import OptionalFileNotFoundError, check_optional_file
+from output_writer import OutputWriter
+
+# Maximum number of repositories attached to a code security configuration per request
+CODE_SECURITY_ATTACH_BATCH_SIZE = 250
+# Repositories prepared at the same time per parse worker, so the workers always have files queued
+PREPARE_THREADS_PER_PARSE_WORKER = 2
+# Skip reason of the repositories the token cannot write to
+NO_WRITE_ACCESS = "no write access"
 
 
 def main():  # pragma: no cover
@@ -48,6 +67,26 @@ def main():  # pragma: no cover
         team_name,
         labels,
         dependabot_config_file,
+        skip_empty_repos,
+        skip_disabled_repos,
+        skip_fork_repos,
+        skip_template_repos,
+        code_security_configuration,
+        listing_concurrency,
+        server_side_filtering,
+        parallel_pagination,
+        repository_file,
+        installation_repositories,
+        organizations,
+        enterprise_slug,
+        organization_concurrency,
+        include_child_teams,
+        read_tokens,
+        output_dir,
+        parse_workers,
+        existing_config_cache_file,
+        output_format,
+        read_apps,
     ) = env.get_env_vars()
 
     # Auth to GitHub.com or GHE
@@ -61,10 +100,172 @@ def main():  # pragma: no cover
     )
 
     if not token and gh_app_id and gh_app_installation_id and gh_app_private_key:
-        token = auth.get_github_app_installation_token(
+        # Refresh the installation token before it expires for github3 and the raw API calls
+        token = auth.InstallationTokenProvider(
             ghe, gh_app_id, gh_app_private_key, gh_app_installation_id
         )
+        github_connection.session.auth = token
+
+    # Spread the read requests over the additional tokens, writes keep using the primary identity
+    # The installation tokens of the additional GitHub Apps are refreshed before they expire
+    read_tokens = read_tokens + [
+        auth.InstallationTokenProvider(ghe, app_id, private_key, installation_id)
+        for app_id, installation_id, private_key in read_apps
+    ]
+    if read_tokens:
+        github_connection.session.auth = auth.TokenPool(token, read_tokens)
+
+    # Share identical concurrent GET requests between the workers
+    coalesce.mount_coalescing_adapter(
+        github_connection.session,
+        max(
+            requests.adapters.DEFAULT_POOLSIZE,
+            listing_concurrency * organization_concurrency,
+        ),
+    )
+
+    # Load the private registries of DEPENDABOT_CONFIG_FILE once for every repository
+    # If running locally on a computer the local file takes precedence over the one existent on the repository
+    extra_dependabot_config = None
+    if dependabot_config_file:
+        extra_dependabot_config = load_extra_dependabot_config(dependabot_config_file)
+
+    # Every organization shares the connection, and with it the connection pool and token
+    process = functools.partial(
+        process_organization,
+        github_connection=github_connection,
+        token=token,
+        ghe=ghe,
+        search_query=search_query,
+        repository_list=repository_list,
+        team_name=team_name,
+        exempt_repositories_list=exempt_repositories_list,
+        follow_up_type=follow_up_type,
+        title=title,
+        body=body,
+        created_after_date=created_after_date,
+        dry_run=dry_run,
+        commit_message=commit_message,
+        project_id=project_id,
+        group_dependencies=group_dependencies,
+        filter_visibility=filter_visibility,
+        batch_size=batch_size,
+        enable_security_updates=enable_security_updates,
+        exempt_ecosystems=exempt_ecosystems,
+        update_existing=update_existing,
+        repo_specific_exemptions=repo_specific_exemptions,
+        schedule=schedule,
+        schedule_day=schedule_day,
+        labels=labels,
+        extra_dependabot_config=extra_dependabot_config,
+        skip_empty_repos=skip_empty_repos,
+        skip_disabled_repos=skip_disabled_repos,
+        skip_fork_repos=skip_fork_repos,
+        skip_template_repos=skip_template_repos,
+        code_security_configuration=code_security_configuration,
+        listing_concurrency=listing_concurrency,
+        server_side_filtering=server_side_filtering,
+        parallel_pagination=parallel_pagination,
+        repository_file=repository_file,
+        installation_repositories=installation_repositories,
+        include_child_teams=include_child_teams,
+    )
+
+    # Skip parsing the existing dependabot files already seen by the previous runs
+    if existing_config_cache_file:
+        load_existing_ecosystems_cache(existing_config_cache_file)
+
+    # Parse and merge the existing dependabot files on other cores when updating them,
+    # preparing several repositories at the same time to keep every worker busy
+    parse_pool = None
+    prepare_concurrency = 1
+    if parse_workers and update_existing:
+        parse_pool = create_parse_pool(parse_workers)
+        prepare_concurrency = PREPARE_THREADS_PER_PARSE_WORKER * parse_workers
+
+    failed_organizations = []
+    try:
+        with OutputWriter(output_dir, output_format=output_format) as output_writer:
+            process = functools.partial(
+                process,
+                output_writer=output_writer,
+                parse_pool=parse_pool,
+                prepare_concurrency=prepare_concurrency,
+            )
+            if organizations or enterprise_slug:
+                organization_names = get_organization_names(
+                    github_connection, organizations, enterprise_slug
+                )
+                summaries, failed_organizations = process_organizations(
+                    process, organization_names, organization_concurrency
+                )
+                summary_content = "".join(summaries)
+            else:
+                summary_content = process(organization)
+    finally:
+        # Stop the parse workers even when the run fails
+        if parse_pool:
+            parse_pool.shutdown()
+
+    if existing_config_cache_file:
+        save_existing_ecosystems_cache(existing_config_cache_file)
+
+    # Append the summary content to the GitHub step summary file
+    append_to_github_summary(summary_content)
 
+    # Fail the run once every other organization has been processed
+    if failed_organizations:
+        print(f"Failed to process organizations: {', '.join(failed_organizations)}")
+        sys.exit(1)
+
+
+def process_organization(
+    organization,
+    *,
+    github_connection,
+    token,
+    ghe,
+    search_query,
+    repository_list,
+    team_name,
+    exempt_repositories_list,
+    follow_up_type,
+    title,
+    body,
+    created_after_date,
+    dry_run,
+    commit_message,
+    project_id,
+    group_dependencies,
+    filter_visibility,
+    batch_size,
+    enable_security_updates,
+    exempt_ecosystems,
+    update_existing,
+    repo_specific_exemptions,
+    schedule,
+    schedule_day,
+    labels,
+    extra_dependabot_config,
+    skip_empty_repos,
+    skip_disabled_repos,
+    skip_fork_repos,
+    skip_template_repos,
+    code_security_configuration,
+    listing_concurrency,
+    server_side_filtering,
+    parallel_pagination,
+    repository_file,
+    installation_repositories,
+    include_child_teams,
+    output_writer,
+    parse_pool,
+    prepare_concurrency,
+):  # pragma: no cover
+    """
+    Open an issue/PR in the eligible repositories of one organization, or of the
+    repositories selected without an organization, and return its job summary section
+    """
     # Set the project_global_id to None by default
     project_global_id = None
 
@@ -77,9 +278,31 @@ def main():  # pragma: no cover
             )
         project_global_id = get_global_project_id(ghe, token, organization, project_id)
 
+    # Filter the organization repositories server-side when the settings can be expressed as a search query
+    if server_side_filtering and not search_query:
+        search_query = get_filtered_search_query(
+            organization,
+            team_name,
+            repository_list,
+            repository_file,
+            installation_repositories,
+            filter_visibility,
+            created_after_date,
+            skip_fork_repos,
+        )
+
     # Get the repositories from the organization, team name, or list of repositories
     repos = get_repos_iterator(
-        organization, team_name, repository_list, search_query, github_connection
+        organization,
+        team_name,
+        repository_list,
+        search_query,
+        github_connection,
+        listing_concurrency,
+        parallel_pagination,
+        repository_file,
+        installation_repositories,
+        include_child_teams,
     )
 
     # Setting up the action summary content
@@ -104,92 +327,64 @@ def main():  # pragma: no cover
         "| --- | --- | --- | --- |\n"
     )
 
+    # Repositories without a code security configuration get the existing one attached,
+    # the others get Dependabot security updates enabled one by one
+    code_security_configuration_id = None
+    if enable_security_updates and code_security_configuration and not dry_run:
+        code_security_configuration_id = get_code_security_configuration_id(
+            ghe, token, organization, code_security_configuration
+        )
+
     # Iterate through the repositories and open an issue/PR if dependabot is not enabled
     count_eligible = 0
     count_prs_created = 0
-    for repo in repos:
+    skipped_without_write_access = []
+    security_updates_repository_ids = []
+    prepare = functools.partial(
+        prepare_repository,
+        exempt_repositories_list=exempt_repositories_list,
+        skip_empty_repos=skip_empty_repos,
+        skip_disabled_repos=skip_disabled_repos,
+        skip_fork_repos=skip_fork_repos,
+        skip_template_repos=skip_template_repos,
+        filter_visibility=filter_visibility,
+        created_after_date=created_after_date,
+        follow_up_type=follow_up_type,
+        team_name=team_name,
+        update_existing=update_existing,
+        group_dependencies=group_dependencies,
+        exempt_ecosystems=exempt_ecosystems,
+        repo_specific_exemptions=repo_specific_exemptions,
+        schedule=schedule,
+        schedule_day=schedule_day,
+        labels=labels,
+        extra_dependabot_config=extra_dependabot_config,
+        parse_pool=parse_pool,
+    )
+    for repo, (
+        skip_reason,
+        existing_config,
+        dependabot_filename_to_use,
+        dependabot_file,
+    ) in prepare_ahead(prepare, repos, prepare_concurrency):
         # if batch_size is defined, ensure we break if we exceed the number of eligible repos
         if batch_size and count_eligible >= batch_size:
             print(f"Batch size met at {batch_size} eligible repositories.")
             break
 
-        # Check all the things to see if repo is eligible for a pr/issue
-        if repo.full_name in exempt_repositories_list:
-            print(f"Skipping {repo.full_name} (exempted)")
-            continue
-        if repo.archived:
-            print(f"Skipping {repo.full_name} (archived)")
-            continue
-        if repo.visibility.lower() not in filter_visibility:
-            print(f"Skipping {repo.full_name} (visibility-filtered)")
-            continue
-        existing_config = None
-        filename_list = [".github/dependabot.yaml", ".github/dependabot.yml"]
-        dependabot_filename_to_use = filename_list[0]  # Default to the first filename
-        for filename in filename_list:
-            existing_config = check_existing_config(repo, filename)
-            if existing_config:
-                dependabot_filename_to_use = filename
-                break
-
-        if existing_config and not update_existing:
-            print(
-                f"Skipping {repo.full_name} (dependabot file already exists and update_existing is False)"
-            )
-            continue
-
-        if created_after_date and is_repo_created_date_before(
-            repo.created_at, created_after_date
-        ):
-            print(f"Skipping {repo.full_name} (created after filter)")
+        if skip_reason:
+            print(f"Skipping {repo.full_name} ({skip_reason})")
+            if skip_reason == NO_WRITE_ACCESS:
+                skipped_without_write_access.append(repo.full_name)
             continue
 
-        # Check if there is any extra configuration to be added to the dependabot file by checking the DEPENDABOT_CONFIG_FILE env variable
-        if dependabot_config_file:
-            yaml = ruamel.yaml.YAML()
-            yaml.preserve_quotes = True
-            # If running locally on a computer the local file takes precedence over the one existent on the repository
-            try:
-                with open(
-                    dependabot_config_file, "r", encoding="utf-8"
-                ) as extra_dependabot_config:
-                    extra_dependabot_config = yaml.load(extra_dependabot_config)
-            except ruamel.yaml.YAMLError as e:
-                print(f"YAML indentation error: {e}")
-                continue
-
-        else:
-            # If no dependabot configuration file is present set the variable empty
-            extra_dependabot_config = None
-
         print(f"Checking {repo.full_name} for compatible package managers")
-        # Try to detect package managers and build a dependabot file
-        dependabot_file = build_dependabot_file(
-            repo,
-            group_dependencies,
-            exempt_ecosystems,
-            repo_specific_exemptions,
-            existing_config,
-            schedule,
-            schedule_day,
-            labels,
-            extra_dependabot_config,
-        )
-
-        yaml = ruamel.yaml.YAML()
-        stream = io.StringIO()
-        yaml.indent(mapping=2, sequence=4, offset=2)
-
-        # create locally the dependabot file
-        with open("dependabot-output.yaml", "w", encoding="utf-8") as yaml_file:
-            yaml.dump(dependabot_file, yaml_file)
-
         if dependabot_file is None:
             print("\tNo (new) compatible package manager found")
             continue
 
-        dependabot_file = yaml.dump(dependabot_file, stream)
-        dependabot_file = stream.getvalue()
+        # Create the dependabot file locally in the background
+        output_writer.write(repo.full_name, dependabot_file)
 
         # If dry_run is set, just print the dependabot file
         if dry_run:
@@ -210,8 +405,19 @@ def main():  # pragma: no cover
 
         # Get dependabot security updates enabled if possible
         if enable_security_updates:
-            if not is_dependabot_security_updates_enabled(
-                ghe, repo.owner, repo.name, token
+            security_and_analysis = getattr(repo, "security_and_analysis", None)
+            if (
+                code_security_configuration_id
+                and get_dependabot_security_updates_status(security_and_analysis)
+                is False
+                and not has_code_security_configuration(
+                    ghe, repo.owner, repo.name, token
+                )
+            ):
+                # Collect the repository to attach the code security configuration in bulk at the end of the run
+                security_updates_repository_ids.append(repo.id)
+            elif not is_dependabot_security_updates_enabled(
+                ghe, repo.owner, repo.name, token, security_and_analysis
             ):
                 enable_dependabot_security_updates(ghe, repo.owner, repo.name, token)
 
@@ -269,10 +475,243 @@ def main():  # pragma: no cover
                     print("\tFailed to create pull request. Check write permissions.")
                     continue
 
+    if security_updates_repository_ids:
+        attach_code_security_configuration(
+            ghe,
+            token,
+            organization,
+            code_security_configuration_id,
+            security_updates_repository_ids,
+        )
+
     print(f"Done. {str(count_eligible)} repositories were eligible.")
     print(f"{str(count_prs_created)} pull requests were created.")
-    # Append the summary content to the GitHub step summary file
-    append_to_github_summary(summary_content)
+    if skipped_without_write_access:
+        print(
+            f"{str(len(skipped_without_write_access))} repositories were skipped due to missing write access."
+        )
+        summary_content += get_skipped_without_write_access_summary(
+            skipped_without_write_access
+        )
+    return summary_content
+
+
+def prepare_repository(
+    repo,
+    *,
+    exempt_repositories_list,
+    skip_empty_repos,
+    skip_disabled_repos,
+    skip_fork_repos,
+    skip_template_repos,
+    filter_visibility,
+    created_after_date,
+    follow_up_type,
+    team_name,
+    update_existing,
+    group_dependencies,
+    exempt_ecosystems,
+    repo_specific_exemptions,
+    schedule,
+    schedule_day,
+    labels,
+    extra_dependabot_config,
+    parse_pool=None,
+):
+    """
+    Check if a repository is eligible for a pr/issue and generate its dependabot file.
+    It only reads from GitHub, so several repositories can be prepared at the same time.
+
+    Returns:
+        tuple: the reason the repository is skipped or None, the existing dependabot
+        file or None, the name of the dependabot file and the generated dependabot
+        file or None if no new package manager was found
+    """
+    filename_list = [".github/dependabot.yaml", ".github/dependabot.yml"]
+    dependabot_filename_to_use = filename_list[0]  # Default to the first filename
+
+    # Check all the things to see if repo is eligible for a pr/issue
+    skip_reason = get_repo_skip_reason(
+        repo,
+        exempt_repositories_list,
+        skip_empty_repos,
+        skip_disabled_repos,
+        skip_fork_repos,
+        skip_template_repos,
+        filter_visibility,
+        created_after_date,
+    )
+    if not skip_reason and follow_up_type == "pull":
+        if not has_write_permission(repo, team_name):
+            skip_reason = NO_WRITE_ACCESS
+    if skip_reason:
+        return skip_reason, None, dependabot_filename_to_use, None
+
+    existing_config = None
+    for filename in filename_list:
+        existing_config = check_existing_config(repo, filename)
+        if existing_config:
+            dependabot_filename_to_use = filename
+            break
+
+    if existing_config and not update_existing:
+        return (
+            "dependabot file already exists and update_existing is False",
+            existing_config,
+            dependabot_filename_to_use,
+            None,
+        )
+
+    # Try to detect package managers and build a dependabot file
+    dependabot_file = generate_dependabot_file(
+        repo,
+        group_dependencies,
+        exempt_ecosystems,
+        repo_specific_exemptions,
+        existing_config,
+        schedule,
+        schedule_day,
+        labels,
+        extra_dependabot_config,
+        parse_pool,
+    )
+    return None, existing_config, dependabot_filename_to_use, dependabot_file
+
+
+def get_repo_skip_reason(
+    repo,
+    exempt_repositories_list,
+    skip_empty_repos,
+    skip_disabled_repos,
+    skip_fork_repos,
+    skip_template_repos,
+    filter_visibility,
+    created_after_date,
+) -> str | None:
+    """Get the reason a repository is not eligible from its listing metadata, or None"""
+    if repo.full_name in exempt_repositories_list:
+        return "exempted"
+    if repo.archived:
+        return "archived"
+    skip_reason = get_repo_metadata_skip_reason(
+        repo,
+        skip_empty_repos,
+        skip_disabled_repos,
+        skip_fork_repos,
+        skip_template_repos,
+    )
+    if skip_reason:
+        return skip_reason
+    if repo.visibility.lower() not in filter_visibility:
+        return "visibility-filtered"
+    if created_after_date and is_repo_created_date_before(
+        repo.created_at, created_after_date
+    ):
+        return "created after filter"
+    return None
+
+
+def prepare_ahead(prepare, repos, concurrency):
+    """
+    Prepare the repositories on a thread pool, running ahead of the caller, and yield
+    them with their result in the order of the repositories. While the caller opens
+    the issue/PR of a repository, the next ones are probed and their existing files
+    parsed on the other cores.
+
+    Args:
+        prepare (Callable): prepares one repository
+        repos (Iterable): the repositories to prepare
+        concurrency (int): the maximum number of repositories prepared at the same time
+
+    Yields:
+        tuple: each repository and the result of prepare
+    """
+    if concurrency <= 1:
+        for repo in repos:
+            yield repo, prepare(repo)
+        return
+
+    pending = deque()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        try:
+            for repo in repos:
+                pending.append((repo, executor.submit(prepare, repo)))
+                if len(pending) >= concurrency:
+                    repo, future = pending.popleft()
+                    yield repo, future.result()
+            while pending:
+                repo, future = pending.popleft()
+                yield repo, future.result()
+        finally:
+            # Do not prepare the repositories the caller no longer needs (ex: batch size met)
+            for _, future in pending:
+                future.cancel()
+
+
+def get_organization_names(github_connection, organizations, enterprise_slug):
+    """
+    Get the organizations to scan in a multi-organization run, de-duplicated and in order
+
+    Args:
+        github_connection (github3.GitHub): the GitHub connection object
+        organizations (list[str]): the organizations listed explicitly
+        enterprise_slug (str): the enterprise whose organizations are scanned too
+
+    Returns:
+        list[str]: the organizations to scan
+    """
+    organization_names = list(organizations)
+    if enterprise_slug:
+        organization_names.extend(
+            repositories.list_enterprise_organizations(
+                github_connection, enterprise_slug
+            )
+        )
+    return list(dict.fromkeys(organization_names))
+
+
+def process_organizations(process, organization_names, concurrency):
+    """
+    Process several organizations at the same time and return their job summary
+    sections in the order of the organizations. An organization that fails does not
+    stop the others, the error is reported in its job summary section instead.
+
+    Args:
+        process (Callable[[str], str]): processes one organization and returns its summary
+        organization_names (list[str]): the organizations to process
+        concurrency (int): the maximum number of organizations processed at the same time
+
+    Returns:
+        tuple[list[str], list[str]]: the job summary section of each organization
+        and the names of the organizations that failed
+    """
+
+    def process_or_report(organization):
+        try:
+            return process(organization), False
+        except Exception as e:  # pylint: disable=broad-exception-caught
+            print(f"Failed to process organization {organization}: {e}")
+            return get_failed_organization_summary(organization, e), True
+
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        results = list(executor.map(process_or_report, organization_names))
+
+    summaries = [summary for summary, _ in results]
+    failed_organizations = [
+        organization
+        for organization, (_, failed) in zip(organization_names, results)
+        if failed
+    ]
+    return summaries, failed_organizations
+
+
+def get_failed_organization_summary(organization, error) -> str:
+    """Build the job summary section of an organization that could not be processed"""
+    return f"""
+## ❌ Job Summary
+- **Organization:** {organization}
+- **Error:** {error}\n
+    """
 
 
 def is_repo_created_date_before(repo_created_at: str, created_after_date: str):
@@ -283,11 +722,95 @@ def is_repo_created_date_before(repo_created_at: str, created_after_date: str):
     )
 
 
-def is_dependabot_security_updates_enabled(ghe, owner, repo, access_token):
+def get_repo_metadata_skip_reason(
+    repo,
+    skip_empty_repos=True,
+    skip_disabled_repos=True,
+    skip_fork_repos=True,
+    skip_template_repos=True,
+) -> str | None:
+    """
+    Check the repository metadata returned by the listing endpoints and return the
+    reason the repository should be skipped, or None if it is still a candidate.
+    These checks do not require any additional API calls.
+
+    Args:
+        repo (github3.repos.repo.ShortRepository): The repository to check
+        skip_empty_repos (bool): Skip repositories without any content
+        skip_disabled_repos (bool): Skip disabled repositories
+        skip_fork_repos (bool): Skip forked repositories
+        skip_template_repos (bool): Skip template repositories
+
+    Returns:
+        str | None: The reason to skip the repository or None
+    """
+    if skip_empty_repos and getattr(repo, "size", None) == 0:
+        return "empty"
+    if skip_disabled_repos and getattr(repo, "disabled", False) is True:
+        return "disabled"
+    if skip_fork_repos and getattr(repo, "fork", False) is True:
+        return "fork"
+    if skip_template_repos and getattr(repo, "is_template", False) is True:
+        return "template"
+    return None
+
+
+def has_write_permission(repo, team_name=None) -> bool:
+    """
+    Check the permissions object returned by the listing endpoints to see if the
+    authenticated identity can push to the repository.
+    If the permissions are not part of the repository metadata we assume write access
+    and let the API calls decide. The team listings return the permissions of the team
+    instead of the ones of the authenticated identity, so they are not checked.
+
+    Args:
+        repo (github3.repos.repo.ShortRepository): The repository to check
+        team_name (str | None): The team(s) the repository was listed from
+
+    Returns:
+        bool: False if the repository is known to be read-only, otherwise True
+    """
+    if team_name:
+        return True
+    permissions = getattr(repo, "permissions", None)
+    if not isinstance(permissions, dict) or "push" not in permissions:
+        return True
+    return bool(permissions.get("push") or permissions.get("admin"))
+
+
+def get_skipped_without_write_access_summary(repository_names) -> str:
+    """
+    Build the job summary section listing the repositories skipped due to missing write access
+
+    Args:
+        repository_names (list[str]): The full names of the skipped repositories
+
+    Returns:
+        str: The markdown summary section
+    """
+    rows = "".join(f"| {repository} |\n" for repository in repository_names)
+    return (
+        "\n\n## 🔐 Skipped Repositories (No Write Access)\n\n"
+        "| Repository |\n"
+        "| --- |\n"
+        f"{rows}"
+    )
+
+
+def is_dependabot_security_updates_enabled(
+    ghe, owner, repo, access_token, security_and_analysis=None
+):
     """
     Check if Dependabot security updates are enabled at the /repos/:owner/:repo/automated-security-fixes endpoint using the requests library
     API: https://docs.github.com/en/rest/repos/repos?apiVersion=2022-11-28#check-if-automated-security-fixes-are-enabled-for-a-repository
+
+    If the security_and_analysis object from the repository metadata is passed and
+    contains the Dependabot security updates status, it is used instead of the API call.
     """
+    status = get_dependabot_security_updates_status(security_and_analysis)
+    if status is not None:
+        return status
+
     api_endpoint = f"{ghe}/api/v3" if ghe else "https://api.github.com"
     url = f"{api_endpoint}/repos/{owner}/{repo}/automated-security-fixes"
     headers = {
@@ -301,6 +824,25 @@ def is_dependabot_security_updates_enabled(ghe, owner, repo, access_token):
     return False
 
 
+def get_dependabot_security_updates_status(security_and_analysis) -> bool | None:
+    """
+    Read the Dependabot security updates status from the security_and_analysis
+    object returned with the repository metadata for admin tokens
+
+    Args:
+        security_and_analysis (dict | None): The security_and_analysis repository metadata
+
+    Returns:
+        bool | None: The status or None if it is not part of the metadata
+    """
+    if not isinstance(security_and_analysis, dict):
+        return None
+    security_updates = security_and_analysis.get("dependabot_security_updates")
+    if not isinstance(security_updates, dict) or "status" not in security_updates:
+        return None
+    return security_updates["status"] == "enabled"
+
+
 def check_existing_config(repo, filename):
     """
     Check if a file already exists in the
@@ -344,36 +886,202 @@ def enable_dependabot_security_updates(ghe, owner, repo, access_token):
         print("\tFailed to enable Dependabot security updates.")
 
 
+def get_code_security_configuration_id(ghe, token, organization, name):
+    """
+    Get the ID of the existing organization code security configuration with the given name.
+    The configuration is never created here: attaching a configuration replaces the one
+    of the repositories, so it has to be set up by the organization owners with all the
+    security features they want.
+    API: https://docs.github.com/en/rest/code-security/configurations?apiVersion=2022-11-28
+    """
+    api_endpoint = f"{ghe}/api/v3" if ghe else "https://api.github.com"
+    url = f"{api_endpoint}/orgs/{organization}/code-security/configurations"
+    headers = {
+        "Authorization": f"Bearer {token}",
+        "Accept": "application/vnd.github+json",
+    }
+
+    params = {"per_page": 100}
+    try:
+        while url:
+            response = requests.get(url, headers=headers, params=params, timeout=20)
+            response.raise_for_status()
+            for configuration in response.json():
+                if configuration.get("name") == name:
+                    return configuration["id"]
+            # The URL of the next page already holds the query parameters
+            url = response.links.get("next", {}).get("url")
+            params = {}
+    except requests.exceptions.RequestException as e:
+        print(f"Request failed: {e}")
+        return None
+    except KeyError as e:
+        print(f"Failed to parse response: {e}")
+        return None
+
+    print(f"Code security configuration {name} was not found in {organization}")
+    return None
+
+
+def has_code_security_configuration(ghe, owner, repo, access_token):
+    """
+    Check if a code security configuration is attached to the repository. When it cannot
+    be checked the repository is considered attached so its configuration is never replaced.
+    API: https://docs.github.com/en/rest/code-security/configurations#get-the-code-security-configuration-associated-with-a-repository
+    """
+    api_endpoint = f"{ghe}/api/v3" if ghe else "https://api.github.com"
+    url = f"{api_endpoint}/repos/{owner}/{repo}/code-security-configuration"
+    headers = {
+        "Authorization": f"Bearer {access_token}",
+        "Accept": "application/vnd.github+json",
+    }
+
+    try:
+        response = requests.get(url, headers=headers, timeout=20)
+    except requests.exceptions.RequestException as e:
+        print(f"Request failed: {e}")
+        return True
+    if response.status_code == 204:
+        return False
+    if response.status_code == 200:
+        return bool(response.json().get("configuration"))
+    return True
+
+
+def attach_code_security_configuration(
+    ghe, token, organization, configuration_id, repository_ids
+):
+    """
+    Attach the code security configuration to the selected repositories in batches
+    API: https://docs.github.com/en/rest/code-security/configurations?apiVersion=2022-11-28#attach-a-configuration-to-repositories
+    """
+    api_endpoint = f"{ghe}/api/v3" if ghe else "https://api.github.com"
+    url = f"{api_endpoint}/orgs/{organization}/code-security/configurations/{configuration_id}/attach"
+    headers = {
+        "Authorization": f"Bearer {token}",
+        "Accept": "application/vnd.github+json",
+    }
+
+    attached = 0
+    for start in range(0, len(repository_ids), CODE_SECURITY_ATTACH_BATCH_SIZE):
+        end = start + CODE_SECURITY_ATTACH_BATCH_SIZE
+        batch = repository_ids[start:end]
+        data = {"scope": "selected", "selected_repository_ids": batch}
+        try:
+            response = requests.post(url, headers=headers, json=data, timeout=20)
+        except requests.exceptions.RequestException as e:
+            print(f"Request failed: {e}")
+            response = None
+        if response is not None and response.status_code == 202:
+            attached += len(batch)
+        else:
+            print(
+                f"Failed to attach code security configuration to {len(batch)} repositories."
+            )
+    print(
+        f"Code security configuration attached to {attached} repositories to enable Dependabot security updates."
+    )
+    return attached
+
+
+def get_filtered_search_query(
+    organization,
+    team_name,
+    repository_list,
+    repository_file,
+    installation_repositories,
+    filter_visibility,
+    created_after_date,
+    skip_fork_repos,
+):
+    """
+    Get the search query filtering the organization repositories server-side, or None
+    when the repositories come from another source or the settings cannot be
+    expressed as a search query
+    """
+    # Only the listing of the whole organization is replaced by a search
+    if (
+        not organization
+        or team_name
+        or repository_list
+        or repository_file
+        or installation_repositories
+    ):
+        return None
+
+    filtered_search_query = repositories.build_filtered_search_query(
+        organization, filter_visibility, created_after_date, skip_fork_repos
+    )
+    if filtered_search_query:
+        print(f"Filtering repositories server-side with: {filtered_search_query}")
+    else:
+        print("Repository filters cannot be applied server-side, listing all")
+    return filtered_search_query
+
+
 def get_repos_iterator(
-    organization, team_name, repository_list, search_query, github_connection
+    organization,
+    team_name,
+    repository_list,
+    search_query,
+    github_connection,
+    listing_concurrency=repositories.DEFAULT_LISTING_CONCURRENCY,
+    parallel_pagination=False,
+    repository_file=None,
+    installation_repositories=False,
+    include_child_teams=False,
 ):
-    """Get the repositories from the organization, team_name, repository_list, or via search query"""
+    """
+    Get the repositories from the organization, team_name, repository_list, repository_file,
+    the GitHub App installation, or via search query
+    """
     # Use GitHub search API if REPOSITORY_SEARCH_QUERY is set
     if search_query:
-        # Return repositories matching the search query
-        repos = []
-        # Search results need to be converted to a list of repositories since they are returned as a search iterator
-        for repo in github_connection.search_repositories(search_query):
-            repos.append(repo.repository)
-        return repos
+        # Stream the repositories matching the search query, partitioned by creation date past the search limit
+        return repositories.search_repositories(
+            github_connection, search_query, listing_concurrency
+        )
+
+    # Stream the repositories from REPOSITORY_FILE, resolving them in batches as they are read
+    if repository_file:
+        return repositories.resolve_repositories(
+            github_connection, repositories.read_repository_names(repository_file)
+        )
+
+    # List every repository the GitHub App installation can access
+    if installation_repositories:
+        return repositories.list_installation_repositories(
+            github_connection, listing_concurrency
+        )
 
     repos = []
     # Default behavior: list all organization/team repositories or specific repository list
     if organization and not repository_list and not team_name:
+        if parallel_pagination:
+            return repositories.list_organization_repositories(
+                github_connection, organization, listing_concurrency
+            )
         repos = github_connection.organization(organization).repositories()
     elif team_name and organization:
+        team_slugs = [slug.strip() for slug in team_name.split(",") if slug.strip()]
+        # Stream the union of the repositories of several teams and/or their child teams
+        if len(team_slugs) > 1 or include_child_teams:
+            return repositories.list_teams_repositories(
+                github_connection,
+                organization,
+                team_slugs,
+                include_child_teams,
+                listing_concurrency,
+            )
         # Get the repositories from the team
-        team = github_connection.organization(organization).team_by_name(team_name)
+        team = github_connection.organization(organization).team_by_name(team_slugs[0])
         if team.repos_count == 0:
-            print(f"Team {team_name} has no repositories")
+            print(f"Team {team_slugs[0]} has no repositories")
             sys.exit(1)
         repos = team.repositories()
     else:
-        # Get the repositories from the repository_list
-        for repo in repository_list:
-            repos.append(
-                github_connection.repository(repo.split("/")[0], repo.split("/")[1])
-            )
+        # Resolve the repositories from the repository_list in batches with GraphQL
+        repos = repositories.resolve_repositories(github_connection, repository_list)
 
     return repos
 
@@ -16,6 +16,23 @@ class OptionalFileNotFoundError(github3.exceptions.NotFoundError):
     """
 
 
+class GraphQLError(github3.exceptions.GitHubError):
+    """Exception raised when a GraphQL request returns errors instead of data.
+
+    GraphQL answers with a 200 status and reports the failures, ie. rate limits or
+    fields not supported by GitHub Enterprise Server, in an errors array. The message
+    is built from that array.
+
+    Args:
+        resp: The HTTP response object of the GraphQL request
+    """
+
+    def __init__(self, resp):
+        super().__init__(resp)
+        messages = [str(error.get("message")) for error in self.errors]
+        self.msg = "; ".join(messages) or "[No data]"
+
+
 def check_optional_file(repo, filename):
     """
     Example utility function demonstrating OptionalFileNotFoundError usage.
@@ -0,0 +1,126 @@
+"""This is the module that contains the background writer of the generated dependabot files."""
+
+import json
+import os
+import queue
+import threading
+
+# Maximum number of generated files waiting to be written
+OUTPUT_BUFFER_SIZE = 1000
+# File overwritten with the last generated dependabot file when no output directory is set
+DEFAULT_OUTPUT_FILE = "dependabot-output.yaml"
+# File streaming every generated dependabot file with the jsonl output format
+JSONL_OUTPUT_FILE = "dependabot-output.jsonl"
+# Formats of the output: one YAML file per repository or a single JSON Lines stream
+OUTPUT_FORMATS = ("yaml", "jsonl")
+
+
+class OutputWriter:
+    """
+    Write the generated dependabot files on a background thread so the scan does not
+    wait on the disk. With an output directory every repository gets its own
+    <output_dir>/<owner>/<name>.yaml file, otherwise the last generated file is kept
+    in dependabot-output.yaml. With the jsonl format every generated file is appended
+    to a single dependabot-output.jsonl stream in the output directory instead.
+    """
+
+    def __init__(
+        self, output_dir="", buffer_size=OUTPUT_BUFFER_SIZE, output_format="yaml"
+    ):
+        self.output_dir = output_dir
+        self.output_format = output_format
+        self.error = None
+        self._files = queue.Queue(maxsize=buffer_size)
+        self._jsonl_file = None
+        self._thread = threading.Thread(
+            target=self._run, name="output-writer", daemon=True
+        )
+        self._thread.start()
+
+    def get_path(self, repository_full_name) -> str:
+        """Get the path of the file of the repository"""
+        if self.output_format == "jsonl":
+            return os.path.join(self.output_dir, JSONL_OUTPUT_FILE)
+        if not self.output_dir:
+            return DEFAULT_OUTPUT_FILE
+        return os.path.join(self.output_dir, *repository_full_name.split("/")) + ".yaml"
+
+    def write(self, repository_full_name, content):
+        """
+        Queue the dependabot file generated for a repository
+
+        Args:
+            repository_full_name (str): the owner/name of the repository
+            content (str): the dependabot file content
+        """
+        self._files.put((repository_full_name, content))
+
+    def close(self):
+        """
+        Write the queued files and stop the writer
+
+        Raises:
+            Exception: the first error that happened while writing the files
+        """
+        self._files.put(None)
+        self._thread.join()
+        if self.error:
+            raise self.error
+
+    def _run(self):
+        try:
+            while True:
+                item = self._files.get()
+                if item is None:
+                    return
+                # Keep draining the queue after an error so the scan is never blocked
+                if self.error:
+                    continue
+                # Any error is kept for close(), a dead thread would block write() forever
+                try:
+                    self._write_file(*item)
+                except Exception as e:  # pylint: disable=broad-exception-caught
+                    self.error = e
+        finally:
+            self._close_jsonl_file()
+
+    def _write_file(self, repository_full_name, content):
+        path = self.get_path(repository_full_name)
+        if self.output_format == "jsonl":
+            # The stream is opened once per run and written one line per repository
+            if self._jsonl_file is None:
+                self._jsonl_file = open_output_file(path)
+            self._jsonl_file.write(
+                json.dumps({"repository": repository_full_name, "content": content})
+                + "\n"
+            )
+            return
+        with open_output_file(path) as output_file:
+            output_file.write(content)
+
+    def _close_jsonl_file(self):
+        if self._jsonl_file is None:
+            return
+        try:
+            self._jsonl_file.close()
+        except OSError as e:
+            self.error = self.error or e
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        try:
+            self.close()
+        except Exception as e:  # pylint: disable=broad-exception-caught
+            # Do not mask the exception the block is already unwinding with
+            if exc_value is None:
+                raise
+            exc_value.add_note(f"Writing the dependabot files also failed: {e}")
+
+
+def open_output_file(path):
+    """Open an output file for writing, creating its directory"""
+    if os.path.dirname(path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+    return open(path, "w", encoding="utf-8")
@@ -0,0 +1,888 @@
+"""This module contains the functions used to discover the repositories to scan"""
+
+import json
+import queue
+import re
+import sys
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import date, datetime, timedelta, timezone
+from itertools import islice
+from urllib.parse import parse_qs, urlparse
+
+import github3
+from exceptions import GraphQLError
+
+# URL templates of the REST repository representation, relative to the repository URL
+REPOSITORY_URL_TEMPLATES = {
+    "archive_url": "/{archive_format}{/ref}",
+    "assignees_url": "/assignees{/user}",
+    "blobs_url": "/git/blobs{/sha}",
+    "branches_url": "/branches{/branch}",
+    "collaborators_url": "/collaborators{/collaborator}",
+    "comments_url": "/comments{/number}",
+    "commits_url": "/commits{/sha}",
+    "compare_url": "/compare/{base}...{head}",
+    "contents_url": "/contents/{+path}",
+    "contributors_url": "/contributors",
+    "deployments_url": "/deployments",
+    "downloads_url": "/downloads",
+    "events_url": "/events",
+    "forks_url": "/forks",
+    "git_commits_url": "/git/commits{/sha}",
+    "git_refs_url": "/git/refs{/sha}",
+    "git_tags_url": "/git/tags{/sha}",
+    "hooks_url": "/hooks",
+    "issue_comment_url": "/issues/comments{/number}",
+    "issue_events_url": "/issues/events{/number}",
+    "issues_url": "/issues{/number}",
+    "keys_url": "/keys{/key_id}",
+    "labels_url": "/labels{/name}",
+    "languages_url": "/languages",
+    "merges_url": "/merges",
+    "milestones_url": "/milestones{/number}",
+    "notifications_url": "/notifications{?since,all,participating}",
+    "pulls_url": "/pulls{/number}",
+    "releases_url": "/releases{/id}",
+    "stargazers_url": "/stargazers",
+    "statuses_url": "/statuses/{sha}",
+    "subscribers_url": "/subscribers",
+    "subscription_url": "/subscription",
+    "tags_url": "/tags",
+    "teams_url": "/teams",
+    "trees_url": "/git/trees{/sha}",
+}
+
+# URL templates of the REST user representation, relative to the user URL
+USER_URL_TEMPLATES = {
+    "events_url": "/events{/privacy}",
+    "followers_url": "/followers",
+    "following_url": "/following{/other_user}",
+    "gists_url": "/gists{/gist_id}",
+    "organizations_url": "/orgs",
+    "received_events_url": "/received_events",
+    "repos_url": "/repos",
+    "starred_url": "/starred{/owner}{/repo}",
+    "subscriptions_url": "/subscriptions",
+}
+
+# REST permissions granted by each GraphQL viewerPermission
+VIEWER_PERMISSIONS = {
+    "ADMIN": {"admin", "maintain", "push", "triage", "pull"},
+    "MAINTAIN": {"maintain", "push", "triage", "pull"},
+    "WRITE": {"push", "triage", "pull"},
+    "TRIAGE": {"triage", "pull"},
+    "READ": {"pull"},
+}
+
+GRAPHQL_REPOSITORY_FIELDS = """
+    databaseId
+    name
+    nameWithOwner
+    description
+    url
+    createdAt
+    isArchived
+    isDisabled
+    isEmpty
+    isFork
+    isPrivate
+    isTemplate
+    visibility
+    diskUsage
+    viewerPermission
+    defaultBranchRef { name }
+    owner {
+      __typename
+      login
+      url
+      avatarUrl
+      ... on Organization { databaseId }
+      ... on User { databaseId }
+    }
+"""
+
+# GitHub search stops returning results after this many items for a single query
+SEARCH_RESULTS_LIMIT = 1000
+# No repository can have been created before this date
+EARLIEST_CREATED_DATE = date(2007, 10, 1)
+DEFAULT_LISTING_CONCURRENCY = 4
+# Maximum number of search requests running at the same time, the search API only
+# allows 30 requests per minute and enforces secondary rate limits on bursts
+SEARCH_CONCURRENCY = 2
+# Number of times a rate limited search request is retried
+SEARCH_MAX_RETRIES = 5
+# Seconds to wait after a secondary rate limit without a Retry-After header
+SEARCH_RETRY_DELAY = 60
+# Maximum page size of the REST API list endpoints
+PER_PAGE = 100
+# Number of aliased repository fields resolved by a single GraphQL request
+GRAPHQL_BATCH_SIZE = 100
+# Maximum number of repositories buffered while the consumer is busy
+STREAM_BUFFER_SIZE = 1000
+# created:>YYYY-MM-DD or created:>=YYYY-MM-DD lower bounds can be combined with the partitions
+CREATED_LOWER_BOUND_PATTERN = re.compile(
+    r"\s*\bcreated:>(=?)(\d{4}-\d{2}-\d{2})(?=\s|$)"
+)
+
+
+def iterate_concurrently(producers, concurrency=DEFAULT_LISTING_CONCURRENCY):
+    """
+    Run the producers on a thread pool and yield their items as soon as they arrive.
+    The producers are read on a separate thread so a lazy iterable of producers
+    (ex: the partitions of a search) starts running before it is exhausted.
+
+    Args:
+        producers (Iterable[Callable[[], Iterable]]): callables returning the items to yield
+        concurrency (int): the maximum number of producers running at the same time
+
+    Yields:
+        the items of every producer, in the order they are received
+    """
+    items = queue.Queue(maxsize=STREAM_BUFFER_SIZE)
+    stop = threading.Event()
+    done = object()
+    fed = object()
+    submitted = 0
+
+    def put(item):
+        while not stop.is_set():
+            try:
+                items.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def run(producer):
+        try:
+            for item in producer():
+                if not put(item):
+                    return
+        except Exception as e:  # pylint: disable=broad-exception-caught
+            put(e)
+        finally:
+            put(done)
+
+    executor = ThreadPoolExecutor(max_workers=max(1, concurrency))
+
+    def feed():
+        nonlocal submitted
+        try:
+            for producer in producers:
+                if stop.is_set():
+                    return
+                executor.submit(run, producer)
+                submitted += 1
+        except Exception as e:  # pylint: disable=broad-exception-caught
+            put(e)
+        finally:
+            put(fed)
+
+    feeder = threading.Thread(target=feed, daemon=True)
+    feeder.start()
+    try:
+        finished = 0
+        all_fed = False
+        while not all_fed or finished < submitted:
+            item = items.get()
+            if item is done:
+                finished += 1
+            elif item is fed:
+                all_fed = True
+            elif isinstance(item, Exception):
+                raise item
+            else:
+                yield item
+    finally:
+        # Unblock the producers if the consumer stopped early (ex: batch size met)
+        stop.set()
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+def get_page(github_connection, url, params):
+    """
+    Get a single page of a REST API list endpoint
+
+    Args:
+        github_connection (github3.GitHub): the GitHub connection object
+        url (str): the list endpoint
+        params (dict): the query parameters including the page number
+
+    Returns:
+        requests.Response: the response of the page
+
+    Raises:
+        github3.exceptions.GitHubError: the request failed
+    """
+    response = github_connection.session.get(url, params=params)
+    if response.status_code != 200:
+        raise github3.exceptions.error_for(response)
+    return response
+
+
+def get_last_page(response) -> int:
+    """Read the last page number from the Link header of the first page of a list endpoint"""
+    last = response.links.get("last")
+    if not last:
+        return 1
+    return int(parse_qs(urlparse(last["url"]).query).get("page", ["1"])[0])
+
+
+def list_repositories_concurrently(
+    github_connection, url, concurrency=DEFAULT_LISTING_CONCURRENCY, items_key=None
+):
+    """
+    Stream the repositories of a REST API list endpoint, fetching every page after
+    the first one concurrently instead of following the next links one at a time.
+
+    Args:
+        github_connection (github3.GitHub): the GitHub connection object
+        url (str): the list endpoint
+        concurrency (int): the maximum number of pages fetched at the same time
+        items_key (str | None): the key of the repositories if the endpoint returns an object
+
+    Yields:
+        github3.repos.repo.ShortRepository: the listed repositories
+    """
+
+    def fetch_page(page, response=None):
+        if response is None:
+            response = get_page(
+                github_connection, url, {"per_page": PER_PAGE, "page": page}
+            )
+        items = response.json()
+        if items_key:
+            items = items.get(items_key, [])
+        return [
+            github3.repos.ShortRepository(repo, github_connection) for repo in items
+        ]
+
+    first_page = get_page(github_connection, url, {"per_page": PER_PAGE, "page": 1})
+    yield from fetch_page(1, first_page)
+    producers = [
+        lambda page=page: fetch_page(page)
+        for page in range(2, get_last_page(first_page) + 1)
+    ]
+    yield from iterate_concurrently(producers, concurrency)
+
+
+def list_organization_repositories(
+    github_connection, organization, concurrency=DEFAULT_LISTING_CONCURRENCY
+):
+    """
+    Stream the repositories of the organization, fetching the pages concurrently
+
+    Args:
+        github_connection (github3.GitHub): the GitHub connection object
+        organization (str): the organization to list repositories from
+        concurrency (int): the maximum number of pages fetched at the same time
+
+    Yields:
+        github3.repos.repo.ShortRepository: the repositories of the organization
+    """
+    url = github_connection.session.build_url("orgs", organization, "repos")
+    yield from list_repositories_concurrently(github_connection, url, concurrency)
+
+
+def list_installation_repositories(
+    github_connection, concurrency=DEFAULT_LISTING_CONCURRENCY
+):
+    """
+    Stream every repository the GitHub App installation the connection is
+    authenticated as can access, fetching the pages concurrently. An installation
+    belongs to a single organization or user account, so only the repositories of
+    the account of the configured installation are listed.
+    API: https://docs.github.com/en/rest/apps/installations?apiVersion=2022-11-28#list-repositories-accessible-to-the-app-installation
+
+    Args:
+        github_connection (github3.GitHub): the connection authenticated as a GitHub App installation
+        concurrency (int): the maximum number of pages fetched at the same time
+
+    Yields:
+        github3.repos.repo.ShortRepository: the repositories of the installation
+    """
+    url = github_connection.session.build_url("installation", "repositories")
+    yield from list_repositories_concurrently(
+        github_connection, url, concurrency, items_key="repositories"
+    )
+
+
+def list_child_team_slugs(github_connection, organization, team_slug):
+    """
+    Stream the slugs of the direct child teams of a team
+
+    Args:
+        github_connection (github3.GitHub): the GitHub connection object
+        organization (str): the organization of the team
+        team_slug (str): the slug of the parent team
+
+    Yields:
+        str: the slug of each child team
+    """
+    url = github_connection.session.build_url(
+        "orgs", organization, "teams", team_slug, "teams"
+    )
+    page = last_page = 1
+    while page <= last_page:
+        response = get_page(
+            github_connection, url, {"per_page": PER_PAGE, "page": page}
+        )
+        if page == 1:
+            last_page = get_last_page(response)
+        for team in response.json():
+            yield team["slug"]
+        page += 1
+
+
+def expand_team_slugs(github_connection, organization, team_slugs):
+    """
+    Get the teams and all of their nested child teams, parents first and without duplicates
+
+    Args:
+        github_connection (github3.GitHub): the GitHub connection object
+        organization (str): the organization of the teams
+        team_slugs (list[str]): the slugs of the top level teams
+
+    Returns:
+        list[str]: the slugs of the teams and their descendants
+    """
+    expanded = list(dict.fromkeys(team_slugs))
+    index = 0
+    while index < len(expanded):
+        for child_slug in list_child_team_slugs(
+            github_connection, organization, expanded[index]
+        ):
+            if child_slug not in expanded:
+                expanded.append(child_slug)
+        index += 1
+    return expanded
+
+
+def list_teams_repositories(
+    github_connection,
+    organization,
+    team_slugs,
+    include_child_teams=False,
+    concurrency=DEFAULT_LISTING_CONCURRENCY,
+):
+    """
+    Stream the union of the repositories of several teams, fetching the teams
+    concurrently and yielding a repository shared by several teams only once
+
+    Args:
+        github_connection (github3.GitHub): the GitHub connection object
+        organization (str): the organization of the teams
+        team_slugs (list[str]): the slugs of the teams
+        include_child_teams (bool): whether the nested child teams are included
+        concurrency (int): the maximum number of teams listed at the same time
+
+    Yields:
+        github3.repos.repo.ShortRepository: the repositories of the teams
+    """
+    if include_child_teams:
+        team_slugs = expand_team_slugs(github_connection, organization, team_slugs)
+    producers = [
+        lambda team_slug=team_slug: list_repositories_concurrently(
+            github_connection,
+            github_connection.session.build_url(
+                "orgs", organization, "teams", team_slug, "repos"
+            ),
+            1,
+        )
+        for team_slug in dict.fromkeys(team_slugs)
+    ]
+    seen_ids = set()
+    for repo in iterate_concurrently(producers, concurrency):
+        if repo.id in seen_ids:
+            continue
+        seen_ids.add(repo.id)
+        yield repo
+
+
+def list_enterprise_organizations(github_connection, enterprise_slug):
+    """
+    Stream the login of every organization of the enterprise, 100 per GraphQL request
+
+    Args:
+        github_connection (github3.GitHub): the GitHub connection object
+        enterprise_slug (str): the slug of the enterprise
+
+    Yields:
+        str: the login of each organization of the enterprise
+    """
+    query = """
+    query($slug: String!, $cursor: String) {
+      enterprise(slug: $slug) {
+        organizations(first: 100, after: $cursor) {
+          nodes { login }
+          pageInfo { hasNextPage endCursor }
+        }
+      }
+    }
+    """
+    graphql_url = get_graphql_url(github_connection)
+    cursor = None
+    while True:
+        response = github_connection.session.post(
+            graphql_url,
+            json={
+                "query": query,
+                "variables": {"slug": enterprise_slug, "cursor": cursor},
+            },
+        )
+        if response.status_code != 200:
+            raise github3.exceptions.error_for(response)
+        enterprise = (response.json().get("data") or {}).get("enterprise")
+        if not enterprise:
+            raise ValueError(f"Enterprise {enterprise_slug} was not found")
+        organizations = enterprise["organizations"]
+        for node in organizations["nodes"]:
+            yield node["login"]
+        if not organizations["pageInfo"]["hasNextPage"]:
+            return
+        cursor = organizations["pageInfo"]["endCursor"]
+
+
+def chunked(iterable, size):
+    """Yield lists of up to size items from the iterable without reading it all upfront"""
+    iterator = iter(iterable)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def get_graphql_url(github_connection) -> str:
+    """Get the GraphQL endpoint of the GitHub instance the connection is using"""
+    base_url = github_connection.session.base_url
+    # GitHub Enterprise Server serves the REST API under /api/v3 and GraphQL under /api/graphql
+    if base_url.endswith("/v3"):
+        base_url = base_url[: -len("/v3")]
+    return f"{base_url}/graphql"
+
+
+def read_repository_names(repository_file):
+    """
+    Lazily read the owner/name of the repositories to scan from a file, or stdin if it is -.
+    Every line is either a plain owner/name or a JSON object with a repository or
+    full_name key. Blank lines and lines starting with # are ignored.
+
+    Args:
+        repository_file (str): the path of the file or - for stdin
+
+    Yields:
+        str: the owner/name of each repository
+    """
+    if repository_file == "-":
+        yield from parse_repository_lines(sys.stdin)
+        return
+    with open(repository_file, "r", encoding="utf-8") as lines:
+        yield from parse_repository_lines(lines)
+
+
+def parse_repository_lines(lines):
+    """Yield the owner/name of each line of a REPOSITORY_FILE"""
+    for line in lines:
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        if line.startswith("{"):
+            try:
+                entry = json.loads(line)
+            except json.JSONDecodeError:
+                print(f"Skipping {line} (invalid JSON)")
+                continue
+            line = entry.get("repository") or entry.get("full_name") or ""
+            if not line:
+                print(f"Skipping {entry} (no repository or full_name key)")
+                continue
+        yield line
+
+
+def resolve_repositories(
+    github_connection, repository_names, batch_size=GRAPHQL_BATCH_SIZE
+):
+    """
+    Stream the repositories named owner/name, resolving up to batch_size of them
+    per GraphQL request with aliased repository fields instead of one REST request each.
+
+    Args:
+        github_connection (github3.GitHub): the GitHub connection object
+        repository_names (Iterable[str]): the owner/name of the repositories
+        batch_size (int): the number of repositories resolved per request
+
+    Yields:
+        github3.repos.repo.ShortRepository: the repositories that were found
+    """
+    graphql_url = get_graphql_url(github_connection)
+    for chunk in chunked(repository_names, batch_size):
+        variables = {}
+        fields = []
+        valid_names = []
+        for repository_name in chunk:
+            owner, _, name = repository_name.strip().partition("/")
+            if not owner or not name:
+                print(f"Skipping {repository_name} (not in owner/name format)")
+                continue
+            index = len(valid_names)
+            variables[f"owner{index}"] = owner
+            variables[f"name{index}"] = name
+            fields.append(
+                f"repo{index}: repository(owner: $owner{index}, name: $name{index}) {{{GRAPHQL_REPOSITORY_FIELDS}}}"
+            )
+            valid_names.append(repository_name.strip())
+        if not valid_names:
+            continue
+        definitions = ", ".join(
+            f"$owner{index}: String!, $name{index}: String!"
+            for index in range(len(valid_names))
+        )
+        query = f"query({definitions}) {{\n" + "\n".join(fields) + "\n}"
+        response = github_connection.session.post(
+            graphql_url, json={"query": query, "variables": variables}
+        )
+        if response.status_code != 200:
+            raise github3.exceptions.error_for(response)
+        payload = response.json()
+        data = payload.get("data")
+        if data is None:
+            raise GraphQLError(response)
+        # A partial failure reports the error of each alias that could not be resolved
+        alias_errors = {}
+        for error in payload.get("errors") or []:
+            path = error.get("path") or [None]
+            if path[0] in data:
+                alias_errors[path[0]] = error
+            else:
+                print(f"GraphQL error: {error.get('message')}")
+        for index, repository_name in enumerate(valid_names):
+            node = data.get(f"repo{index}")
+            error = alias_errors.get(f"repo{index}")
+            if error and error.get("type") != "NOT_FOUND":
+                print(f"Skipping {repository_name} ({error.get('message')})")
+                continue
+            if not node:
+                print(f"Skipping {repository_name} (not found)")
+                continue
+            yield github3.repos.ShortRepository(
+                graphql_repository_to_rest(node, github_connection.session.base_url),
+                github_connection,
+            )
+
+
+def graphql_repository_to_rest(node, api_url) -> dict:
+    """
+    Convert a GraphQL repository node to the REST representation used by github3
+
+    Args:
+        node (dict): the GraphQL repository with the GRAPHQL_REPOSITORY_FIELDS
+        api_url (str): the REST API base URL
+
+    Returns:
+        dict: the REST representation of the repository
+    """
+    owner = node["owner"]
+    owner_url = f"{api_url}/users/{owner['login']}"
+    repository_url = f"{api_url}/repos/{node['nameWithOwner']}"
+    repository = {
+        "id": node["databaseId"],
+        "name": node["name"],
+        "full_name": node["nameWithOwner"],
+        "description": node["description"],
+        "html_url": node["url"],
+        "url": repository_url,
+        "created_at": node["createdAt"],
+        "archived": node["isArchived"],
+        "disabled": node["isDisabled"],
+        "fork": node["isFork"],
+        "private": node["isPrivate"],
+        "is_template": node["isTemplate"],
+        "visibility": node["visibility"].lower(),
+        # diskUsage is reported in kilobytes and can round down to 0 for small repositories
+        "size": 0 if node["isEmpty"] else max(node["diskUsage"] or 0, 1),
+        "default_branch": (node["defaultBranchRef"] or {}).get("name"),
+        "owner": {
+            "login": owner["login"],
+            "id": owner.get("databaseId"),
+            "type": owner["__typename"],
+            "avatar_url": owner["avatarUrl"],
+            "gravatar_id": "",
+            "html_url": owner["url"],
+            "site_admin": False,
+            "url": owner_url,
+        },
+    }
+    repository["owner"].update(
+        {key: owner_url + suffix for key, suffix in USER_URL_TEMPLATES.items()}
+    )
+    repository.update(
+        {
+            key: repository_url + suffix
+            for key, suffix in REPOSITORY_URL_TEMPLATES.items()
+        }
+    )
+    if node["viewerPermission"] in VIEWER_PERMISSIONS:
+        granted = VIEWER_PERMISSIONS[node["viewerPermission"]]
+        repository["permissions"] = {
+            permission: permission in granted
+            for permission in ("admin", "maintain", "push", "triage", "pull")
+        }
+    return repository
+
+
+def get_rate_limit_delay(response) -> float | None:
+    """
+    Get the number of seconds to wait before retrying a rate limited request
+
+    Args:
+        response (requests.Response): the failed response
+
+    Returns:
+        float | None: the seconds to wait or None if the request was not rate limited
+    """
+    if response.status_code not in (403, 429):
+        return None
+    retry_after = response.headers.get("Retry-After")
+    if retry_after and retry_after.isdigit():
+        return float(retry_after)
+    reset = response.headers.get("X-RateLimit-Reset")
+    if response.headers.get("X-RateLimit-Remaining") == "0" and reset:
+        return max(float(reset) - time.time(), 0) + 1
+    if response.status_code == 429 or "rate limit" in response.text.lower():
+        return SEARCH_RETRY_DELAY
+    return None
+
+
+def get_search_page(github_connection, query, page, per_page=PER_PAGE) -> dict:
+    """
+    Get a single page of repository search results, waiting and retrying when the
+    search rate limits are hit
+
+    Args:
+        github_connection (github3.GitHub): the GitHub connection object
+        query (str): the search query
+        page (int): the page number
+        per_page (int): the number of results per page
+
+    Returns:
+        dict: the total_count and the items of the page
+
+    Raises:
+        github3.exceptions.GitHubError: the request failed or is still rate limited
+    """
+    url = github_connection.session.build_url("search", "repositories")
+    params = {"q": query, "per_page": per_page, "page": page}
+    attempt = 0
+    while True:
+        response = github_connection.session.get(url, params=params)
+        if response.status_code == 200:
+            return response.json()
+        delay = get_rate_limit_delay(response)
+        if delay is None or attempt >= SEARCH_MAX_RETRIES:
+            raise github3.exceptions.error_for(response)
+        attempt += 1
+        print(f"Search rate limit hit, retrying in {delay:.0f} seconds")
+        time.sleep(delay)
+
+
+def iterate_search_results(github_connection, query, first_page=None):
+    """
+    Stream the repositories matching a search query page by page
+
+    Args:
+        github_connection (github3.GitHub): the GitHub connection object
+        query (str): the search query
+        first_page (dict | None): the first page when it was already fetched
+
+    Yields:
+        github3.repos.repo.ShortRepository: the repositories matching the query
+    """
+    page = 1
+    results = first_page or get_search_page(github_connection, query, page)
+    while True:
+        items = results.get("items", [])
+        for item in items:
+            yield github3.repos.ShortRepository(item, github_connection)
+        total_count = min(results.get("total_count", 0), SEARCH_RESULTS_LIMIT)
+        if len(items) < PER_PAGE or page * PER_PAGE >= total_count:
+            return
+        page += 1
+        results = get_search_page(github_connection, query, page)
+
+
+def partition_search_query(
+    github_connection,
+    query,
+    start=EARLIEST_CREATED_DATE,
+    end=None,
+    concurrency=DEFAULT_LISTING_CONCURRENCY,
+):
+    """
+    Split the search query into non-overlapping created: date ranges that each
+    return at most SEARCH_RESULTS_LIMIT results, bisecting the ranges that return more.
+    The ranges are yielded as soon as their count is known, along with the first page
+    of results fetched to count them, so they can be fetched while the others are
+    still being bisected.
+
+    Args:
+        github_connection (github3.GitHub): the GitHub connection object
+        query (str): the search query without a created: qualifier
+        start (date): the first creation date to include
+        end (date): the last creation date to include, defaults to today
+        concurrency (int): the maximum number of count requests running at the same time,
+            capped to SEARCH_CONCURRENCY
+
+    Yields:
+        tuple[str, dict]: the partitioned search query and its first page of results
+    """
+    if end is None:
+        end = datetime.now(timezone.utc).date()
+    concurrency = min(concurrency, SEARCH_CONCURRENCY)
+    executor = ThreadPoolExecutor(max_workers=max(1, concurrency))
+
+    def count(date_range):
+        return get_search_page(
+            github_connection, created_range_query(query, *date_range), 1
+        )
+
+    try:
+        pending = {executor.submit(count, (start, end)): (start, end)}
+        while pending:
+            completed, _ = wait(pending, return_when=FIRST_COMPLETED)
+            partitions = []
+            for future in completed:
+                range_start, range_end = pending.pop(future)
+                first_page = future.result()
+                total_count = first_page["total_count"]
+                if total_count == 0:
+                    continue
+                if total_count <= SEARCH_RESULTS_LIMIT or range_start == range_end:
+                    if total_count > SEARCH_RESULTS_LIMIT:
+                        print(
+                            f"Search results for repositories created on {range_start} are limited to {SEARCH_RESULTS_LIMIT} of {total_count}"
+                        )
+                    partitions.append(
+                        (created_range_query(query, range_start, range_end), first_page)
+                    )
+                    continue
+                middle = range_start + timedelta(
+                    days=(range_end - range_start).days // 2
+                )
+                for date_range in (
+                    (range_start, middle),
+                    (middle + timedelta(days=1), range_end),
+                ):
+                    pending[executor.submit(count, date_range)] = date_range
+            # The halves are counted while the partitions found so far are fetched
+            yield from partitions
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+def split_created_lower_bound(search_query):
+    """
+    Remove a created:>DATE or created:>=DATE qualifier from the search query
+    so it can be used as the start of the created: partitions
+
+    Args:
+        search_query (str): the search query
+
+    Returns:
+        tuple[str, date]: the query without the qualifier and the first creation date to include
+    """
+    match = CREATED_LOWER_BOUND_PATTERN.search(search_query)
+    if not match:
+        return search_query, EARLIEST_CREATED_DATE
+    start = date.fromisoformat(match.group(2))
+    if not match.group(1):
+        start += timedelta(days=1)
+    query = CREATED_LOWER_BOUND_PATTERN.sub("", search_query, count=1).strip()
+    return query, max(start, EARLIEST_CREATED_DATE)
+
+
+def created_range_query(query, start, end) -> str:
+    """Add a created: date range qualifier to the search query"""
+    return f"{query} created:{start.isoformat()}..{end.isoformat()}"
+
+
+def build_filtered_search_query(
+    organization, filter_visibility, created_after_date, skip_fork_repos
+):
+    """
+    Turn the eligibility settings into a search query that only returns candidate
+    repositories of the organization, so they are filtered server-side.
+    Archived repositories are never candidates and are always excluded.
+
+    Args:
+        organization (str): the organization to list repositories from
+        filter_visibility (list[str]): the visibilities of the repositories in scope
+        created_after_date (str): only include repositories created on or after this date
+        skip_fork_repos (bool): whether forked repositories are excluded
+
+    Returns:
+        str | None: the search query or None when the settings cannot be expressed
+        as search qualifiers and have to be evaluated client-side
+    """
+    qualifiers = [f"org:{organization}", "archived:false"]
+    visibilities = set(filter_visibility)
+    if visibilities != {"public", "private", "internal"}:
+        # Search qualifiers are combined with AND so only a single visibility can be selected
+        if len(visibilities) != 1:
+            return None
+        qualifiers.append(f"is:{visibilities.pop()}")
+    if created_after_date:
+        qualifiers.append(f"created:>={created_after_date}")
+    # Search excludes forks unless asked to include them
+    qualifiers.append("fork:false" if skip_fork_repos else "fork:true")
+    return " ".join(qualifiers)
+
+
+def search_repositories(
+    github_connection, search_query, concurrency=DEFAULT_LISTING_CONCURRENCY
+):
+    """
+    Stream the repositories matching the search query.
+    When the query matches more than SEARCH_RESULTS_LIMIT repositories, it is split
+    into created: date ranges that are fetched concurrently as soon as they are found,
+    so every match is returned.
+
+    Args:
+        github_connection (github3.GitHub): the GitHub connection object
+        search_query (str): the search query
+        concurrency (int): the maximum number of search requests running at the same time,
+            capped to SEARCH_CONCURRENCY
+
+    Yields:
+        github3.repos.repo.ShortRepository: the repositories matching the query
+    """
+    first_page = get_search_page(github_connection, search_query, 1)
+    total_count = first_page["total_count"]
+    if not total_count:
+        return
+    query, start = split_created_lower_bound(search_query)
+    if total_count <= SEARCH_RESULTS_LIMIT or "created:" in query:
+        if total_count > SEARCH_RESULTS_LIMIT:
+            print(
+                f"Search results are limited to {SEARCH_RESULTS_LIMIT} of {total_count} repositories, "
+                "remove the created: qualifier from the query to search all of them"
+            )
+        yield from iterate_search_results(github_connection, search_query, first_page)
+        return
+
+    print(
+        f"Search matched {total_count} repositories, splitting the query by creation date"
+    )
+    concurrency = min(concurrency, SEARCH_CONCURRENCY)
+    partitions = partition_search_query(
+        github_connection, query, start, concurrency=concurrency
+    )
+    producers = (
+        lambda partition=partition, first_page=first_page: iterate_search_results(
+            github_connection, partition, first_page
+        )
+        for partition, first_page in partitions
+    )
+    yield from iterate_concurrently(producers, concurrency)
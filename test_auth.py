@@ -1,6 +1,8 @@
 """Test cases for the auth module."""
 
+import time
 import unittest
+from datetime import datetime, timedelta, timezone
 from unittest.mock import MagicMock, patch
 
 import auth
@@ -129,5 +131,252 @@ class TestAuth(unittest.TestCase):
         )
 
 
+def installation_access(token, expires_in):
+    """Build the response of the installation access token endpoint"""
+    expires_at = datetime.now(timezone.utc) + expires_in
+    return {"token": token, "expires_at": expires_at.strftime("%Y-%m-%dT%H:%M:%SZ")}
+
+
+class TestInstallationTokenProvider(unittest.TestCase):
+    """
+    Test case for the InstallationTokenProvider class.
+    """
+
+    def setUp(self):
+        self.provider = auth.InstallationTokenProvider(
+            "", "gh_app_id", b"private_key", "gh_installation_id"
+        )
+
+    @patch("auth.request_github_app_installation_access")
+    def test_get_token_is_cached(self, mock_access):
+        """
+        Test that the token is only created once while it is valid.
+        """
+        mock_access.return_value = installation_access("token1", timedelta(hours=1))
+
+        self.assertEqual(self.provider.get_token(), "token1")
+        self.assertEqual(self.provider.get_token(), "token1")
+        mock_access.assert_called_once_with(
+            "", "gh_app_id", b"private_key", "gh_installation_id"
+        )
+
+    @patch("auth.request_github_app_installation_access")
+    def test_get_token_refreshed_before_expiry(self, mock_access):
+        """
+        Test that the token is refreshed when it expires within the refresh margin.
+        """
+        mock_access.side_effect = [
+            installation_access("token1", timedelta(minutes=2)),
+            installation_access("token2", timedelta(hours=1)),
+        ]
+
+        self.assertEqual(self.provider.get_token(), "token1")
+        self.assertEqual(self.provider.get_token(), "token2")
+        self.assertEqual(mock_access.call_count, 2)
+
+    @patch("auth.request_github_app_installation_access")
+    def test_get_token_keeps_token_when_refresh_fails(self, mock_access):
+        """
+        Test that the current token is kept when it cannot be refreshed.
+        """
+        mock_access.side_effect = [
+            installation_access("token1", timedelta(minutes=2)),
+            None,
+        ]
+
+        self.assertEqual(self.provider.get_token(), "token1")
+        self.assertEqual(self.provider.get_token(), "token1")
+
+    @patch("auth.request_github_app_installation_access")
+    def test_get_token_raises_without_token(self, mock_access):
+        """
+        Test that an error is raised when no token can be created, and that
+        no new token is requested before the retry delay.
+        """
+        mock_access.side_effect = [
+            None,
+            installation_access("token1", timedelta(hours=1)),
+        ]
+        request = MagicMock(headers={})
+
+        with self.assertRaises(ValueError):
+            self.provider.get_token()
+        with self.assertRaises(ValueError):
+            self.provider(request)
+        self.assertNotIn("Authorization", request.headers)
+        mock_access.assert_called_once()
+
+    @patch("auth.request_github_app_installation_access")
+    def test_get_token_retried_after_delay(self, mock_access):
+        """
+        Test that a new token is requested once the retry delay has passed.
+        """
+        mock_access.side_effect = [
+            None,
+            installation_access("token1", timedelta(hours=1)),
+        ]
+        provider = auth.InstallationTokenProvider(
+            "",
+            "gh_app_id",
+            b"private_key",
+            "gh_installation_id",
+            retry_delay=timedelta(0),
+        )
+
+        with self.assertRaises(ValueError):
+            provider.get_token()
+        self.assertEqual(provider.get_token(), "token1")
+        self.assertEqual(mock_access.call_count, 2)
+
+    @patch("auth.request_github_app_installation_access")
+    def test_provider_authenticates_requests(self, mock_access):
+        """
+        Test that the provider sets the Authorization header and formats as the token.
+        """
+        mock_access.return_value = installation_access("token1", timedelta(hours=1))
+        request = MagicMock(headers={})
+
+        self.assertIs(self.provider(request), request)
+        self.assertEqual(request.headers["Authorization"], "token token1")
+        self.assertEqual(f"Bearer {self.provider}", "Bearer token1")
+
+
+def rate_limited_response(remaining, reset_at, resource="core"):
+    """Build a response with the rate limit headers"""
+    response = MagicMock()
+    response.headers = {
+        "X-RateLimit-Remaining": str(remaining),
+        "X-RateLimit-Reset": str(reset_at),
+        "X-RateLimit-Resource": resource,
+    }
+    return response
+
+
+class TestTokenPool(unittest.TestCase):
+    """
+    Test case for the TokenPool class.
+    """
+
+    def setUp(self):
+        self.pool = auth.TokenPool("primary", ["read1", "read2"])
+        self.reset_at = time.time() + 3600
+
+    def send(self, method):
+        """Authenticate a request and return the token it was sent with"""
+        request = requests.Request(method, "https://api.github.com/user").prepare()
+        self.pool(request)
+        return request
+
+    def test_reads_use_token_with_most_remaining_budget(self):
+        """
+        Test that a read request uses the token with the most remaining budget.
+        """
+        for index, remaining in enumerate([100, 4000, 50]):
+            self.pool.record_rate_limit(
+                index, rate_limited_response(remaining, self.reset_at)
+            )
+
+        request = self.send("GET")
+
+        self.assertEqual(request.headers["Authorization"], "token read1")
+
+    def test_writes_use_primary_token(self):
+        """
+        Test that write requests always use the primary token.
+        """
+        self.pool.record_rate_limit(0, rate_limited_response(1, self.reset_at))
+
+        request = self.send("POST")
+
+        self.assertEqual(request.headers["Authorization"], "token primary")
+
+    def test_budget_is_restored_after_reset(self):
+        """
+        Test that a token has its full budget again once its rate limit was reset.
+        """
+        self.pool.record_rate_limit(0, rate_limited_response(0, time.time() - 1))
+        self.pool.record_rate_limit(1, rate_limited_response(10, self.reset_at))
+        self.pool.record_rate_limit(2, rate_limited_response(10, self.reset_at))
+
+        self.assertEqual(self.pool.pick_read_token(), 0)
+
+    def test_response_hook_records_rate_limit(self):
+        """
+        Test that the rate limit headers of the response are recorded for the token used.
+        """
+        self.pool.record_rate_limit(0, rate_limited_response(10, self.reset_at))
+        self.pool.record_rate_limit(2, rate_limited_response(10, self.reset_at))
+        request = self.send("GET")
+        self.assertEqual(request.headers["Authorization"], "token read1")
+
+        request.hooks["response"][0](rate_limited_response(5, self.reset_at))
+
+        self.assertEqual(self.pool.pick_read_token(), 0)
+
+    def test_budgets_are_kept_per_resource(self):
+        """
+        Test that the search and GraphQL budgets do not overwrite the core budget.
+        """
+        self.pool.record_rate_limit(0, rate_limited_response(4000, self.reset_at))
+        self.pool.record_rate_limit(1, rate_limited_response(100, self.reset_at))
+        self.pool.record_rate_limit(2, rate_limited_response(100, self.reset_at))
+        self.pool.record_rate_limit(
+            0, rate_limited_response(2, self.reset_at, "search")
+        )
+        self.pool.record_rate_limit(
+            0, rate_limited_response(10, self.reset_at, "graphql")
+        )
+        self.pool.record_rate_limit(
+            1, rate_limited_response(25, self.reset_at, "search")
+        )
+        self.pool.record_rate_limit(
+            2, rate_limited_response(20, self.reset_at, "search")
+        )
+
+        core_request = self.send("GET")
+        search_request = requests.Request(
+            "GET", "https://api.github.com/search/repositories?q=org:my-org"
+        ).prepare()
+        self.pool(search_request)
+
+        self.assertEqual(core_request.headers["Authorization"], "token primary")
+        self.assertEqual(search_request.headers["Authorization"], "token read1")
+
+    def test_get_rate_limit_resource(self):
+        """
+        Test that the rate limit resource is derived from the url of the request.
+        """
+        for url, resource in [
+            ("https://api.github.com/orgs/my-org/repos", "core"),
+            ("https://api.github.com/search/repositories?q=org:my-org", "search"),
+            ("https://api.github.com/search/code?q=org:my-org", "code_search"),
+            ("https://api.github.com/graphql", "graphql"),
+            ("https://ghe.example.com/api/graphql", "graphql"),
+        ]:
+            with self.subTest(url=url):
+                self.assertEqual(auth.get_rate_limit_resource(url), resource)
+
+    @patch("auth.request_github_app_installation_access")
+    def test_installation_read_tokens_are_refreshed(self, mock_access):
+        """
+        Test that an installation token provider used for reads is refreshed before it expires.
+        """
+        mock_access.side_effect = [
+            installation_access("installation1", timedelta(minutes=2)),
+            installation_access("installation2", timedelta(hours=1)),
+        ]
+        provider = auth.InstallationTokenProvider(
+            "", "gh_app_id", b"private_key", "gh_installation_id"
+        )
+        self.pool = auth.TokenPool("primary", [provider])
+        self.pool.record_rate_limit(0, rate_limited_response(10, self.reset_at))
+
+        first_request = self.send("GET")
+        second_request = self.send("GET")
+
+        self.assertEqual(first_request.headers["Authorization"], "token installation1")
+        self.assertEqual(second_request.headers["Authorization"], "token installation2")
+
+
 if __name__ == "__main__":
     unittest.main()
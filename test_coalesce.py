@@ -0,0 +1,153 @@
+"""Test the coalesce module."""
+
+import threading
+import unittest
+from concurrent.futures import Future
+from unittest.mock import MagicMock, patch
+
+import requests
+from coalesce import CoalescingAdapter, mount_coalescing_adapter
+
+
+def build_request(method, url, headers=None):
+    """Prepare a request to send with the adapter"""
+    return requests.Request(method, url, headers=headers).prepare()
+
+
+def ok_response():
+    """Build a successful response"""
+    response = requests.Response()
+    response.status_code = 200
+    response._content = b'{"login": "my-org"}'  # pylint: disable=protected-access
+    return response
+
+
+class TestCoalescingAdapter(unittest.TestCase):
+    """Test the CoalescingAdapter class in coalesce.py"""
+
+    @patch("requests.adapters.HTTPAdapter.send")
+    def test_concurrent_identical_gets_share_one_request(self, mock_send):
+        """Test that identical GET requests in flight at the same time are sent once"""
+        adapter = CoalescingAdapter()
+        url = "https://api.github.com/repos/my-org/repo1"
+        started = threading.Event()
+        waiting = threading.Event()
+
+        class ObservedFuture(Future):
+            """Future signaling when a follower waits for the leader"""
+
+            def result(self, timeout=None):
+                waiting.set()
+                return super().result(timeout)
+
+        def slow_send(*_args, **_kwargs):
+            started.set()
+            waiting.wait(5)
+            return ok_response()
+
+        mock_send.side_effect = slow_send
+        results = []
+
+        def send():
+            results.append(adapter.send(build_request("GET", url)))
+
+        with patch("coalesce.Future", ObservedFuture):
+            leader = threading.Thread(target=send)
+            leader.start()
+            started.wait(5)
+            follower = threading.Thread(target=send)
+            follower.start()
+            leader.join()
+            follower.join()
+
+        mock_send.assert_called_once()
+        self.assertEqual(
+            [response.json() for response in results], [{"login": "my-org"}] * 2
+        )
+        self.assertIsNot(results[0], results[1])
+
+    @patch("requests.adapters.HTTPAdapter.send")
+    def test_immutable_resources_are_memoized(self, mock_send):
+        """Test that the resources matching the memo patterns are fetched once per run"""
+        mock_send.side_effect = lambda *args, **kwargs: ok_response()
+        adapter = CoalescingAdapter()
+
+        for _ in range(2):
+            adapter.send(
+                build_request("GET", "https://ghe.example.com/api/v3/orgs/my-org")
+            )
+        for _ in range(2):
+            adapter.send(
+                build_request("GET", "https://api.github.com/repos/my-org/repo1")
+            )
+
+        self.assertEqual(mock_send.call_count, 3)
+
+    @patch("requests.adapters.HTTPAdapter.send")
+    def test_tokens_are_not_shared(self, mock_send):
+        """Test that the responses of a token are never shared with another token"""
+        mock_send.side_effect = lambda *args, **kwargs: ok_response()
+        adapter = CoalescingAdapter()
+        url = "https://api.github.com/orgs/my-org"
+
+        for token in ("token1", "token2", "token1"):
+            adapter.send(build_request("GET", url, {"Authorization": f"token {token}"}))
+
+        self.assertEqual(mock_send.call_count, 2)
+
+    @patch("requests.adapters.HTTPAdapter.send")
+    def test_memoized_replays_skip_response_hooks(self, mock_send):
+        """Test that the response hooks only see the responses actually received"""
+        mock_send.side_effect = lambda *args, **kwargs: ok_response()
+        session = requests.Session()
+        mount_coalescing_adapter(session, 10)
+        hook = MagicMock(return_value=None)
+
+        for _ in range(2):
+            response = session.get(
+                "https://api.github.com/orgs/my-org", hooks={"response": hook}
+            )
+
+        self.assertEqual(response.json(), {"login": "my-org"})
+        mock_send.assert_called_once()
+        hook.assert_called_once()
+
+    @patch("requests.adapters.HTTPAdapter.send")
+    def test_writes_are_not_coalesced(self, mock_send):
+        """Test that requests other than GET are always sent"""
+        mock_send.side_effect = lambda *args, **kwargs: ok_response()
+        adapter = CoalescingAdapter()
+
+        for _ in range(2):
+            adapter.send(build_request("POST", "https://api.github.com/orgs/my-org"))
+
+        self.assertEqual(mock_send.call_count, 2)
+
+    @patch("requests.adapters.HTTPAdapter.send")
+    def test_failed_request_is_raised(self, mock_send):
+        """Test that a failed request is raised and not kept"""
+        mock_send.side_effect = [requests.exceptions.ConnectionError, ok_response()]
+        adapter = CoalescingAdapter()
+        request = build_request("GET", "https://api.github.com/orgs/my-org")
+
+        with self.assertRaises(requests.exceptions.ConnectionError):
+            adapter.send(request)
+        self.assertEqual(adapter.send(request).status_code, 200)
+
+    def test_mount_coalescing_adapter(self):
+        """Test that the adapter is mounted for both schemes"""
+        session = MagicMock()
+
+        mount_coalescing_adapter(session, 16)
+
+        adapter = session.mount.call_args_list[0].args[1]
+        self.assertIsInstance(adapter, CoalescingAdapter)
+        self.assertEqual(adapter._pool_maxsize, 16)  # pylint: disable=protected-access
+        self.assertEqual(
+            [call.args[0] for call in session.mount.call_args_list],
+            ["https://", "http://"],
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
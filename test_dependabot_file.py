@@ -1,14 +1,43 @@
-# pylint: disable=too-many-public-methods
+# pylint: disable=too-many-public-methods,too-many-lines
 """Tests for the dependabot_file.py functions."""
 
 import base64
+import gc
+import itertools
 import os
+import tempfile
+import tracemalloc
 import unittest
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
 from unittest.mock import MagicMock, patch
 
 import github3
 import ruamel.yaml
-from dependabot_file import add_existing_ecosystem_to_exempt_list, build_dependabot_file
+from dependabot_file import (
+    build_dependabot_file,
+    create_parse_pool,
+    detect_package_managers,
+    dump_dependabot_config,
+    emit_new_dependabot_config,
+    existing_config_cache,
+    existing_ecosystems_cache,
+    generate_dependabot_file,
+    get_existing_ecosystems,
+    index_existing_ecosystems,
+    load_dependabot_config,
+    load_existing_ecosystems_cache,
+    load_extra_dependabot_config,
+    make_dependabot_config,
+    merge_existing_dependabot_config,
+    patch_existing_dependabot_config,
+    read_existing_ecosystems,
+    render_cache,
+    render_dependabot_file,
+    render_new_dependabot_config,
+    save_existing_ecosystems_cache,
+)
+from output_writer import OutputWriter
 
 yaml = ruamel.yaml.YAML()
 
@@ -175,10 +204,12 @@ type: 'npm'
   password: '${{secrets.password}}'
   """)
 
+        # The configuration is only serialized once it is complete
+        dependabot_file = build_dependabot_file(
+            repo, False, [], {}, None, "weekly", "", [], extra_dependabot_config
+        )
         with self.assertRaises(ruamel.yaml.YAMLError):
-            build_dependabot_file(
-                repo, False, [], {}, None, "weekly", "", [], extra_dependabot_config
-            )
+            dump_dependabot_config(dependabot_file)
 
     @patch.dict(os.environ, {"DEPENDABOT_CONFIG_FILE": "dependabot-config.yaml"})
     def test_build_dependabot_file_with_extra_dependabot_config_file(self):
@@ -577,25 +608,137 @@ updates:
         )
         self.assertIsNone(result)
 
-    def test_add_existing_ecosystem_to_exempt_list(self):
-        """Test that existing ecosystems are added to the exempt list"""
-        exempt_ecosystems = ["npm", "pip", "github-actions"]
-
+    def test_index_existing_ecosystems(self):
+        """Test that the existing (ecosystem, directory) pairs are indexed"""
         existing_config = {
             "updates": [
-                {"package-ecosystem": "npm"},
-                {"package-ecosystem": "pip"},
+                {"package-ecosystem": "npm", "directory": "/"},
+                {"package-ecosystem": "npm", "directory": "frontend/"},
+                {"package-ecosystem": "pip", "directories": ["/", "/tools"]},
                 {"package-ecosystem": "bundler"},
             ]
         }
 
-        add_existing_ecosystem_to_exempt_list(exempt_ecosystems, existing_config)
+        self.assertEqual(
+            index_existing_ecosystems(existing_config),
+            {
+                ("npm", "/"),
+                ("npm", "/frontend"),
+                ("pip", "/"),
+                ("pip", "/tools"),
+                ("bundler", "/"),
+            },
+        )
+        self.assertEqual(index_existing_ecosystems(None), frozenset())
+
+    def test_index_existing_ecosystems_root_spellings(self):
+        """Test that every spelling of the root directory is indexed as the root"""
+        for directory in (".", "./", "/.", "//", "**", "/**", "/**/"):
+            with self.subTest(directory=directory):
+                existing_config = {
+                    "updates": [{"package-ecosystem": "npm", "directory": directory}]
+                }
+
+                self.assertEqual(
+                    index_existing_ecosystems(existing_config), {("npm", "/")}
+                )
+
+        existing_config = {
+            "updates": [
+                {"package-ecosystem": "npm", "directory": "./frontend/"},
+                {"package-ecosystem": "pip", "directories": ["/apps/**"]},
+            ]
+        }
+        self.assertEqual(
+            index_existing_ecosystems(existing_config),
+            {("npm", "/frontend"), ("pip", "/apps/**")},
+        )
+
+    def test_build_dependabot_file_with_existing_config_in_dot_directory(self):
+        """Test that an existing entry for . is not duplicated for the root directory"""
+        repo = MagicMock()
+        repo.file_contents.side_effect = lambda f: f in ("package.json", "Gemfile")
+        existing_config = MagicMock()
+        existing_config.content = base64.b64encode(b"""
+version: 2
+updates:
+  - package-ecosystem: "npm"
+    directory: "."
+    schedule:
+      interval: "weekly"
+  - package-ecosystem: "bundler"
+    directories:
+      - "/**"
+    schedule:
+      interval: "weekly"
+""")
+
+        result = build_dependabot_file(
+            repo, False, [], {}, existing_config, "weekly", "", [], None
+        )
+
+        self.assertIsNone(result)
+
+    def test_build_dependabot_file_with_existing_config_in_subdirectory(self):
+        """Test that an entry of a subdirectory does not block the root directory"""
+        repo = MagicMock()
+        repo.file_contents.side_effect = lambda f: f in ("package.json", "Gemfile")
+        existing_config = MagicMock()
+        existing_config.content = base64.b64encode(b"""
+version: 2
+updates:
+  - package-ecosystem: "npm"
+    directory: "/frontend"
+    schedule:
+      interval: "weekly"
+  - package-ecosystem: "bundler"
+    directories:
+      - "/"
+      - "/docs"
+    schedule:
+      interval: "weekly"
+""")
+
+        result = build_dependabot_file(
+            repo, False, [], {}, existing_config, "weekly", "", [], None
+        )
+
+        self.assertEqual(
+            [
+                (update["package-ecosystem"], update.get("directory"))
+                for update in result["updates"]
+            ],
+            [("npm", "/frontend"), ("bundler", None), ("npm", "/")],
+        )
+
+    def test_build_dependabot_file_keeps_existing_with_repo_specific_exemptions(self):
+        """Test that the existing ecosystems stay exempt with repo specific exemptions"""
+        repo = MagicMock()
+        repo.full_name = "test/test"
+        repo.file_contents.side_effect = lambda f: f in ("Gemfile", "Dockerfile")
+        existing_config = MagicMock()
+        existing_config.content = base64.b64encode(b"""
+version: 2
+updates:
+  - package-ecosystem: "bundler"
+    directory: "/"
+    schedule:
+      interval: "weekly"
+""")
+
+        result = build_dependabot_file(
+            repo,
+            False,
+            [],
+            {"test/test": ["docker"]},
+            existing_config,
+            "weekly",
+            "",
+            [],
+            None,
+        )
 
-        # Check new ecosystem is added to exempt list
-        self.assertIn("bundler", exempt_ecosystems)
-        # Keep existing ecosystems in exempt list
-        for ecosystem in exempt_ecosystems:
-            self.assertIn(ecosystem, exempt_ecosystems)
+        self.assertIsNone(result)
 
     def test_build_dependabot_file_for_multiple_repos_with_few_existing_config(self):
         """
@@ -808,5 +951,775 @@ updates:
         self.assertEqual(result, expected_result)
 
 
+class TestDependabotConfigSerialization(unittest.TestCase):
+    """
+    Test that the dependabot configuration is only serialized once per repo.
+    """
+
+    def test_make_dependabot_config_does_not_serialize(self):
+        """Test that adding an ecosystem only builds the configuration structure"""
+        dependabot_config = {"version": 2, "updates": []}
+
+        with patch("ruamel.yaml.YAML.dump") as mock_dump:
+            result = make_dependabot_config(
+                "npm", False, "weekly", "", [], dependabot_config, None
+            )
+
+        mock_dump.assert_not_called()
+        self.assertIs(result, dependabot_config)
+        self.assertEqual(result["updates"][0]["package-ecosystem"], "npm")
+
+    def test_dump_dependabot_config(self):
+        """Test that the dependabot configuration is serialized with the dependabot.yml indentation"""
+        dependabot_config = make_dependabot_config(
+            "bundler",
+            False,
+            "weekly",
+            "",
+            ["dependencies"],
+            {"version": 2, "updates": []},
+            None,
+        )
+
+        self.assertEqual(
+            dump_dependabot_config(dependabot_config),
+            """version: 2
+updates:
+  - package-ecosystem: 'bundler'
+    directory: '/'
+    schedule:
+      interval: 'weekly'
+    labels:
+      - 'dependencies'
+""",
+        )
+
+    def test_memory_is_flat_over_many_repos(self):
+        """Benchmark that merging, serializing and writing the files of many repos does not accumulate memory"""
+        render_cache.clear()
+        self.addCleanup(render_cache.clear)
+        extra_dependabot_config = yaml.load(b"""
+npm:
+  type: 'npm'
+  url: 'https://yourprivateregistry/npm/'
+""")
+        # Plain objects, mocks would keep every call and its arguments
+        repo = SimpleNamespace(
+            file_contents=lambda f: f in ("package.json", "Dockerfile"),
+            directory_contents=lambda path: [],
+        )
+        dump_calls = itertools.count()
+
+        def counting_dump_dependabot_config(dependabot_config):
+            next(dump_calls)
+            return dump_dependabot_config(dependabot_config)
+
+        def generate_repos(output_writer, start, count):
+            for index in range(start, start + count):
+                # Every repo has its own existing file and labels, and every other file has
+                # CRLF line endings so the full ruamel round-trip runs besides the text patch
+                newline = "\r\n" if index % 2 else "\n"
+                existing_config = SimpleNamespace(
+                    sha=None,
+                    content=base64.b64encode(
+                        newline.join(
+                            [
+                                "version: 2",
+                                "updates:",
+                                "  - package-ecosystem: 'pip'",
+                                f"    directory: '/service-{index}'",
+                                "    schedule:",
+                                "      interval: 'weekly'",
+                                "",
+                            ]
+                        ).encode()
+                    ),
+                )
+                content = generate_dependabot_file(
+                    repo,
+                    True,
+                    [],
+                    {},
+                    existing_config,
+                    "weekly",
+                    "",
+                    [f"team-{index}"],
+                    extra_dependabot_config,
+                )
+                output_writer.write(f"my-org/repo{index}", content)
+
+        with tempfile.TemporaryDirectory() as output_dir:
+            with patch(
+                "dependabot_file.dump_dependabot_config",
+                counting_dump_dependabot_config,
+            ):
+                tracemalloc.start()
+                try:
+                    with OutputWriter(output_dir, buffer_size=16) as output_writer:
+                        # Fill the caches before measuring
+                        generate_repos(output_writer, 0, 50)
+                        # ruamel leaves reference cycles behind, count only what is kept
+                        gc.collect()
+                        after_warm_up, _ = tracemalloc.get_traced_memory()
+                        generate_repos(output_writer, 50, 250)
+                        gc.collect()
+                        after_many_repos, _ = tracemalloc.get_traced_memory()
+                finally:
+                    tracemalloc.stop()
+
+            self.assertGreaterEqual(next(dump_calls), 300)
+            with open(
+                os.path.join(output_dir, "my-org", "repo299.yaml"), encoding="utf-8"
+            ) as output_file:
+                written = output_file.read()
+            self.assertIn("package-ecosystem: 'npm'", written)
+            self.assertIn("team-299", written)
+            self.assertIn("registries:", written)
+
+        self.assertLess(after_many_repos - after_warm_up, 64 * 1024)
+
+
+class TestRenderDependabotFile(unittest.TestCase):
+    """
+    Test the memoized rendering of new dependabot.yml files.
+    """
+
+    def setUp(self):
+        render_cache.clear()
+
+    def test_render_new_dependabot_config_matches_serialization(self):
+        """Test that the rendered file is the serialization of the built configuration"""
+        extra_dependabot_config = yaml.load(b"""
+npm:
+  type: 'npm'
+  url: 'https://yourprivateregistry/npm/'
+""")
+        dependabot_config = new_config_for(
+            ["npm", "pip"], extra_dependabot_config=extra_dependabot_config
+        )
+
+        result = render_new_dependabot_config(
+            ["npm", "pip"], True, "weekly", "monday", ["deps"], extra_dependabot_config
+        )
+
+        self.assertEqual(result, dump_dependabot_config(dependabot_config))
+
+    def test_generate_new_dependabot_file_skips_ruamel(self):
+        """Test that a new file is rendered without building its ruamel configuration"""
+        repo = MagicMock()
+        repo.file_contents.side_effect = lambda f: f in ("Gemfile", "package.json")
+        expected_result = dump_dependabot_config(new_config_for(["bundler", "npm"]))
+
+        with patch(
+            "dependabot_file.make_dependabot_config"
+        ) as mock_make_dependabot_config:
+            result = generate_dependabot_file(
+                repo, True, [], {}, None, "weekly", "monday", ["deps"], None
+            )
+
+        mock_make_dependabot_config.assert_not_called()
+        self.assertEqual(result, expected_result)
+
+    def test_render_new_dependabot_config_is_memoized(self):
+        """Test that an identical file is only serialized once"""
+        with patch(
+            "dependabot_file.emit_new_dependabot_config", return_value="rendered"
+        ) as mock_emit:
+            for _ in range(3):
+                result = render_new_dependabot_config(
+                    ["npm"], False, "weekly", "", ["deps"], None
+                )
+            render_new_dependabot_config(["npm"], False, "daily", "", ["deps"], None)
+
+        self.assertEqual(result, "rendered")
+        self.assertEqual(mock_emit.call_count, 2)
+
+    def test_render_new_dependabot_config_cache_is_bounded(self):
+        """Test that the least recently used files are evicted"""
+        with patch("dependabot_file.RENDER_CACHE_SIZE", 2):
+            for schedule in ["daily", "weekly", "monthly"]:
+                render_new_dependabot_config(["npm"], False, schedule, "", [], None)
+
+        self.assertEqual(
+            [key[2] for key in render_cache],
+            ["weekly", "monthly"],
+        )
+
+    def test_render_new_dependabot_config_keyed_by_extra_config(self):
+        """Test that registries differing only by their quoting are rendered separately"""
+        single_quoted = yaml.load(b"npm:\n  type: 'npm'\n")
+        double_quoted = yaml.load(b'npm:\n  type: "npm"\n')
+
+        first = render_new_dependabot_config(
+            ["npm"], False, "weekly", "", [], single_quoted
+        )
+        second = render_new_dependabot_config(
+            ["npm"], False, "weekly", "", [], double_quoted
+        )
+
+        self.assertIn("type: 'npm'", first)
+        self.assertIn('type: "npm"', second)
+
+    def test_render_dependabot_file_with_existing_config(self):
+        """Test that an existing configuration is serialized instead of rendered from the cache"""
+        dependabot_config = new_config_for(["npm"])
+
+        with patch("dependabot_file.render_new_dependabot_config") as mock_render:
+            result = render_dependabot_file(
+                dependabot_config, MagicMock(), True, "weekly", "monday", ["deps"], None
+            )
+
+        mock_render.assert_not_called()
+        self.assertEqual(result, dump_dependabot_config(dependabot_config))
+
+    def test_emit_new_dependabot_config_golden_file(self):
+        """Test the fast emitter against a golden dependabot.yml"""
+        result = emit_new_dependabot_config(
+            ["bundler", "github-actions"], True, "weekly", "monday", ["dependencies"]
+        )
+
+        self.assertEqual(
+            result,
+            """version: 2
+updates:
+  - package-ecosystem: 'bundler'
+    directory: '/'
+    schedule:
+      interval: 'weekly'
+      day: 'monday'
+    labels:
+      - 'dependencies'
+    groups:
+      production-dependencies:
+        dependency-type: 'production'
+      development-dependencies:
+        dependency-type: 'development'
+  - package-ecosystem: 'github-actions'
+    directory: '/'
+    schedule:
+      interval: 'weekly'
+      day: 'monday'
+    labels:
+      - 'dependencies'
+    groups:
+      production-dependencies:
+        dependency-type: 'production'
+      development-dependencies:
+        dependency-type: 'development'
+""",
+        )
+
+    def test_emit_new_dependabot_config_parity_with_ruamel(self):
+        """Test that the fast emitter writes the same bytes as the ruamel serialization"""
+        for ecosystems, group_dependencies, schedule_day, labels in itertools.product(
+            [["npm"], ["pip", "docker", "terraform"]],
+            [False, True],
+            ["", "tuesday"],
+            [[], ["dependencies", "it's a label", "a: b # c"]],
+        ):
+            dependabot_config = {"version": 2, "updates": []}
+            for ecosystem in ecosystems:
+                make_dependabot_config(
+                    ecosystem,
+                    group_dependencies,
+                    "weekly",
+                    schedule_day,
+                    labels,
+                    dependabot_config,
+                    None,
+                )
+
+            result = emit_new_dependabot_config(
+                ecosystems, group_dependencies, "weekly", schedule_day, labels
+            )
+
+            self.assertEqual(
+                result.encode("utf-8"),
+                dump_dependabot_config(dependabot_config).encode("utf-8"),
+            )
+
+    def test_emit_new_dependabot_config_falls_back_for_complex_values(self):
+        """Test that values ruamel could fold or escape are left to ruamel"""
+        self.assertIsNone(
+            emit_new_dependabot_config(["npm"], False, "weekly", "", ["x" * 51])
+        )
+        self.assertIsNone(
+            emit_new_dependabot_config(["npm"], False, "weekly", "", ["dépendances"])
+        )
+        long_label = " ".join(["label"] * 20)
+        self.assertEqual(
+            render_new_dependabot_config(
+                ["npm"], False, "weekly", "", [long_label], None
+            ),
+            dump_dependabot_config(
+                make_dependabot_config(
+                    "npm",
+                    False,
+                    "weekly",
+                    "",
+                    [long_label],
+                    {"version": 2, "updates": []},
+                    None,
+                )
+            ),
+        )
+
+
+def new_config_for(ecosystems, extra_dependabot_config=None):
+    """Build a new dependabot configuration for the ecosystems"""
+    dependabot_config = {"version": 2, "updates": []}
+    for ecosystem in ecosystems:
+        make_dependabot_config(
+            ecosystem,
+            True,
+            "weekly",
+            "monday",
+            ["deps"],
+            dependabot_config,
+            extra_dependabot_config,
+        )
+    return dependabot_config
+
+
+class TestLoadExtraDependabotConfig(unittest.TestCase):
+    """
+    Test the load_extra_dependabot_config function.
+    """
+
+    def load(self, content):
+        """Write the content to a DEPENDABOT_CONFIG_FILE and load it"""
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "dependabot-config.yaml")
+            with open(path, "wb") as config_file:
+                config_file.write(content)
+            return load_extra_dependabot_config(path)
+
+    def test_load_extra_dependabot_config(self):
+        """Test that the registries are loaded into a read-only table used for every repo"""
+        result = self.load(b"""
+npm:
+  type: "npm"
+  url: "https://yourprivateregistry/npm/"
+""")
+
+        with self.assertRaises(TypeError):
+            result["maven"] = {"type": "maven"}  # type: ignore[index]
+
+        repo = MagicMock()
+        repo.file_contents.side_effect = (
+            lambda f, filename="package.json": f == filename
+        )
+        rendered = dump_dependabot_config(
+            build_dependabot_file(repo, False, [], {}, None, "weekly", "", [], result)
+        )
+        self.assertIn('registries:\n  npm:\n    type: "npm"', rendered)
+
+    def test_load_extra_dependabot_config_empty(self):
+        """Test that an empty file has no registries"""
+        self.assertIsNone(self.load(b""))
+
+    def test_load_extra_dependabot_config_invalid_yaml(self):
+        """Test that a YAML error is raised once when the file is loaded"""
+        with self.assertRaises(ValueError) as context_manager:
+            self.load(b"""
+npm:
+type: 'npm'
+  url: 'https://yourprivateregistry/npm/'
+""")
+        self.assertIn("is not valid YAML", str(context_manager.exception))
+
+    def test_load_extra_dependabot_config_invalid_registry(self):
+        """Test that a registry without a type is rejected"""
+        with self.assertRaises(ValueError) as context_manager:
+            self.load(b"npm: 'https://yourprivateregistry/npm/'\n")
+        self.assertIn(
+            "The npm private registry in DEPENDABOT_CONFIG_FILE",
+            str(context_manager.exception),
+        )
+
+        with self.assertRaises(ValueError):
+            self.load(b"- npm\n")
+
+
+class TestDependabotFileConcurrency(unittest.TestCase):
+    """
+    Test that the dependabot configurations can be generated on several threads.
+    """
+
+    def test_build_dependabot_file_on_many_threads(self):
+        """Test that concurrent generation gives the same configurations as sequential generation"""
+        existing_config = MagicMock()
+        existing_config.content = base64.b64encode(b"""
+version: 2
+updates:
+  - package-ecosystem: "pip"
+    directory: "/"
+    schedule:
+      interval: "daily"
+""")
+        cases = []
+        for index, filename in enumerate(
+            ["Gemfile", "package.json", "Cargo.toml", "go.mod", "pom.xml", "mix.exs"]
+        ):
+            repo = MagicMock()
+            repo.file_contents.side_effect = lambda f, filename=filename: f == filename
+            repo.directory_contents.side_effect = github3.exceptions.NotFoundError(
+                resp=MagicMock(status_code=404)
+            )
+            cases.append(
+                (
+                    repo,
+                    index % 2 == 0,
+                    existing_config if index % 3 == 0 else None,
+                    ["weekly", "daily"][index % 2],
+                    [f"label-{index}"],
+                )
+            )
+
+        def generate(case):
+            repo, group_dependencies, existing, schedule, labels = case
+            return dump_dependabot_config(
+                build_dependabot_file(
+                    repo,
+                    group_dependencies,
+                    [],
+                    {},
+                    existing,
+                    schedule,
+                    "",
+                    labels,
+                    None,
+                )
+            )
+
+        expected = [generate(case) for case in cases] * 20
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            result = list(executor.map(generate, cases * 20))
+
+        self.assertEqual(result, expected)
+        self.assertIn('package-ecosystem: "pip"', expected[0])
+
+
+class TestParsePool(unittest.TestCase):
+    """
+    Test the parsing and merging of existing dependabot.yml files in a process pool.
+    """
+
+    existing_content = b"""
+version: 2
+updates:
+  - package-ecosystem: "pip"
+    directory: "/"
+    schedule:
+      interval: "weekly"
+    commit-message:
+      prefix: "chore(deps)"
+"""
+
+    def test_read_existing_ecosystems(self):
+        """Test that the package ecosystems of an existing file are read"""
+        self.assertEqual(
+            read_existing_ecosystems(self.existing_content), {("pip", "/")}
+        )
+
+    def test_detect_package_managers(self):
+        """Test that the package managers are detected in order and exempt ones skipped"""
+        repo = MagicMock()
+        repo.file_contents.side_effect = lambda f: f in (
+            "Gemfile",
+            "go.mod",
+            "Cargo.toml",
+        )
+
+        self.assertEqual(
+            detect_package_managers(repo, []), ["bundler", "cargo", "gomod"]
+        )
+        self.assertEqual(detect_package_managers(repo, ["cargo"]), ["bundler", "gomod"])
+
+    def test_generate_dependabot_file_in_pool(self):
+        """Test that the pool gives the same file as parsing on the calling thread"""
+        repo = MagicMock()
+        repo.file_contents.side_effect = lambda f: f in ("Gemfile", "requirements.txt")
+        existing_config = MagicMock()
+        existing_config.content = base64.b64encode(self.existing_content)
+        args = (repo, True, [], {}, existing_config, "weekly", "", ["deps"], None)
+
+        expected_result = generate_dependabot_file(*args)
+        with create_parse_pool(1) as parse_pool:
+            result = generate_dependabot_file(*args, parse_pool)
+
+        self.assertEqual(result, expected_result)
+        self.assertIn("package-ecosystem: 'bundler'", result)
+
+    def test_generate_dependabot_file_in_pool_without_new_ecosystem(self):
+        """Test that the pool gives None when every ecosystem is already configured"""
+        repo = MagicMock()
+        repo.file_contents.side_effect = lambda f: f == "requirements.txt"
+        existing_config = MagicMock()
+        existing_config.content = base64.b64encode(self.existing_content)
+
+        with create_parse_pool(1) as parse_pool:
+            result = generate_dependabot_file(
+                repo, False, [], {}, existing_config, "weekly", "", [], None, parse_pool
+            )
+
+        self.assertIsNone(result)
+
+    def test_parse_pool_routes_blob_to_same_worker(self):
+        """Test that the work on a git blob always runs on the same worker"""
+        with create_parse_pool(2) as parse_pool:
+            worker_ids = {
+                parse_pool.submit("sha1", os.getpid).result() for _ in range(4)
+            }
+            all_worker_ids = {
+                parse_pool.submit(None, os.getpid).result() for _ in range(4)
+            }
+
+        self.assertEqual(len(worker_ids), 1)
+        self.assertEqual(len(all_worker_ids), 2)
+
+    def test_merge_reuses_read_file(self):
+        """Test that merging into a file already read by the worker does not parse it again"""
+        self.addCleanup(existing_config_cache.clear)
+        self.addCleanup(existing_ecosystems_cache.clear)
+        # Flow style updates cannot be patched as text and need a round-trip
+        content = b"""version: 2
+updates: [{package-ecosystem: pip, directory: /, schedule: {interval: weekly}}]
+"""
+        existing_ecosystems = read_existing_ecosystems(content, "sha1")
+
+        with patch("dependabot_file.load_dependabot_config") as mock_load:
+            result = merge_existing_dependabot_config(
+                content,
+                "sha1",
+                existing_ecosystems,
+                ["bundler"],
+                False,
+                "weekly",
+                "",
+                [],
+                None,
+            )
+
+        mock_load.assert_not_called()
+        self.assertIn("package-ecosystem: pip", result)
+        self.assertIn("package-ecosystem: 'bundler'", result)
+
+
+class TestExistingConfigCache(unittest.TestCase):
+    """
+    Test the cache of the existing dependabot.yml files keyed by git blob SHA.
+    """
+
+    def setUp(self):
+        existing_config_cache.clear()
+        existing_ecosystems_cache.clear()
+        self.addCleanup(existing_config_cache.clear)
+        self.addCleanup(existing_ecosystems_cache.clear)
+
+    @staticmethod
+    def make_existing_config(sha):
+        """Create an existing dependabot.yml with a pip update"""
+        existing_config = MagicMock()
+        existing_config.sha = sha
+        existing_config.content = base64.b64encode(b"""
+version: 2
+updates:
+  - package-ecosystem: "pip"
+    directory: "/"
+    schedule:
+      interval: "weekly"
+""")
+        return existing_config
+
+    def test_identical_files_are_parsed_once(self):
+        """Test that repos sharing the same blob parse it once and get separate copies"""
+        repo = MagicMock()
+        repo.file_contents.side_effect = lambda f: f == "Gemfile"
+
+        with patch(
+            "dependabot_file.load_dependabot_config",
+            wraps=load_dependabot_config,
+        ) as mock_load:
+            results = [
+                build_dependabot_file(
+                    repo,
+                    False,
+                    [],
+                    {},
+                    self.make_existing_config("abc123"),
+                    "weekly",
+                    "",
+                    [],
+                    None,
+                )
+                for _ in range(3)
+            ]
+
+        mock_load.assert_called_once()
+        self.assertEqual(existing_ecosystems_cache, {"abc123": {("pip", "/")}})
+        for result in results:
+            self.assertEqual(
+                [update["package-ecosystem"] for update in result["updates"]],
+                ["pip", "bundler"],
+            )
+        self.assertIsNot(results[0], results[1])
+
+    def test_files_without_sha_are_not_cached(self):
+        """Test that a file without a blob SHA is parsed without being cached"""
+        self.assertEqual(
+            get_existing_ecosystems(self.make_existing_config(None)), {("pip", "/")}
+        )
+        self.assertEqual(len(existing_config_cache), 0)
+        self.assertEqual(existing_ecosystems_cache, {})
+
+    def test_cache_file_round_trip(self):
+        """Test that the ecosystems found by a run are reused by the next one"""
+        get_existing_ecosystems(self.make_existing_config("abc123"))
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, "cache", "existing-configs.json")
+            save_existing_ecosystems_cache(path)
+            existing_config_cache.clear()
+            existing_ecosystems_cache.clear()
+
+            load_existing_ecosystems_cache(path)
+
+        existing_config = self.make_existing_config("abc123")
+        existing_config.content = b"not parsed"
+        self.assertEqual(get_existing_ecosystems(existing_config), {("pip", "/")})
+
+    def test_invalid_cache_file_is_ignored(self):
+        """Test that a missing or invalid cache file leaves the cache empty"""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            load_existing_ecosystems_cache(os.path.join(tmpdir, "missing.json"))
+            path = os.path.join(tmpdir, "invalid.json")
+            with open(path, "w", encoding="utf-8") as cache_file:
+                cache_file.write("[")
+            load_existing_ecosystems_cache(path)
+
+        self.assertEqual(existing_ecosystems_cache, {})
+
+
+class TestPatchExistingDependabotConfig(unittest.TestCase):
+    """
+    Test the text patching of existing dependabot.yml files.
+    """
+
+    def setUp(self):
+        self.extra_dependabot_config = yaml.load(b"""
+npm:
+  type: 'npm-registry'
+  url: 'https://npm.pkg.github.com'
+  token: '${{secrets.GITHUB_TOKEN}}'
+""")
+
+    def round_trip(self, content, ecosystems, extra_dependabot_config):
+        """Add the ecosystems to the existing file with a full round-trip"""
+        dependabot_config = load_dependabot_config(content)
+        for ecosystem in ecosystems:
+            make_dependabot_config(
+                ecosystem,
+                True,
+                "weekly",
+                "",
+                ["dependencies"],
+                dependabot_config,
+                extra_dependabot_config,
+            )
+        return dependabot_config
+
+    def test_patch_keeps_existing_formatting(self):
+        """Test that the existing text is kept and the new entries match the round-trip"""
+        content = b"""version: 2
+updates:
+- package-ecosystem: pip  # main application
+  directory: /
+  schedule: {interval: daily}
+
+# end of the file
+"""
+        result = patch_existing_dependabot_config(
+            content,
+            {("pip", "/")},
+            ["npm", "bundler"],
+            True,
+            "weekly",
+            "",
+            ["dependencies"],
+            None,
+        )
+
+        self.assertTrue(
+            result.startswith(content.decode().split("\n\n", maxsplit=1)[0])
+        )
+        self.assertTrue(result.endswith("\n\n# end of the file\n"))
+        self.assertIn("- package-ecosystem: 'npm'\n  directory: '/'\n", result)
+        self.assertEqual(
+            load_dependabot_config(result),
+            self.round_trip(content, ["npm", "bundler"], None),
+        )
+
+    def test_patch_adds_registries(self):
+        """Test that the registries are added to an existing or a new registries block"""
+        updates = b"""updates:
+    - package-ecosystem: "pip"
+      directory: "/"
+      schedule:
+        interval: "weekly"
+"""
+        registries = b"""registries:
+    pypi:
+        type: python-index
+        url: https://pypi.example.com
+"""
+        for content, kept in (
+            (b"version: 2\n" + updates, b"version: 2\n" + updates),
+            (registries + updates, registries),
+        ):
+            result = patch_existing_dependabot_config(
+                content,
+                {("pip", "/")},
+                ["npm"],
+                True,
+                "weekly",
+                "",
+                ["dependencies"],
+                self.extra_dependabot_config,
+            )
+
+            self.assertTrue(result.startswith(kept.decode()))
+            self.assertEqual(
+                load_dependabot_config(result),
+                self.round_trip(content, ["npm"], self.extra_dependabot_config),
+            )
+
+    def test_patch_falls_back_to_round_trip(self):
+        """Test that files not written in block style are left to the round-trip"""
+        content = b"""version: 2
+updates: [{package-ecosystem: pip, directory: /, schedule: {interval: weekly}}]
+"""
+        self.assertIsNone(
+            patch_existing_dependabot_config(
+                content, {("pip", "/")}, ["npm"], False, "weekly", "", [], None
+            )
+        )
+
+        repo = MagicMock()
+        repo.file_contents.side_effect = lambda f: f == "package.json"
+        existing_config = MagicMock()
+        existing_config.content = base64.b64encode(content)
+        result = generate_dependabot_file(
+            repo, False, [], {}, existing_config, "weekly", "", [], None
+        )
+
+        self.assertEqual(
+            [
+                update["package-ecosystem"]
+                for update in load_dependabot_config(result)["updates"]
+            ],
+            ["pip", "npm"],
+        )
+
+
 if __name__ == "__main__":
     unittest.main()
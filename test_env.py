@@ -43,6 +43,26 @@ class TestEnv(unittest.TestCase):
             "SCHEDULE",
             "SCHEDULE_DAY",
             "LABELS",
+            "SKIP_EMPTY_REPOS",
+            "SKIP_DISABLED_REPOS",
+            "SKIP_FORK_REPOS",
+            "SKIP_TEMPLATE_REPOS",
+            "CODE_SECURITY_CONFIGURATION",
+            "LISTING_CONCURRENCY",
+            "SERVER_SIDE_FILTERING",
+            "PARALLEL_PAGINATION",
+            "REPOSITORY_FILE",
+            "INSTALLATION_REPOSITORIES",
+            "ORGANIZATIONS",
+            "ENTERPRISE_SLUG",
+            "ORGANIZATION_CONCURRENCY",
+            "INCLUDE_CHILD_TEAMS",
+            "GH_READ_TOKENS",
+            "OUTPUT_DIR",
+            "PARSE_WORKERS",
+            "EXISTING_CONFIG_CACHE_FILE",
+            "OUTPUT_FORMAT",
+            "GH_READ_APPS",
         ]
         for key in env_keys:
             if key in os.environ:
@@ -96,6 +116,26 @@ class TestEnv(unittest.TestCase):
             None,  # team_name
             [],  # labels
             None,
+            True,  # skip_empty_repos
+            True,  # skip_disabled_repos
+            True,  # skip_fork_repos
+            True,  # skip_template_repos
+            "",  # code_security_configuration
+            4,  # listing_concurrency
+            False,  # server_side_filtering
+            False,  # parallel_pagination
+            "",  # repository_file
+            False,  # installation_repositories
+            [],  # organizations
+            "",  # enterprise_slug
+            2,  # organization_concurrency
+            False,  # include_child_teams
+            [],  # read_tokens
+            "",  # output_dir
+            0,  # parse_workers
+            "",  # existing_config_cache_file
+            "yaml",  # output_format
+            [],  # read_apps
         )
         result = get_env_vars(True)
         self.assertEqual(result, expected_result)
@@ -152,6 +192,26 @@ class TestEnv(unittest.TestCase):
             None,  # team_name
             [],  # labels
             None,
+            True,  # skip_empty_repos
+            True,  # skip_disabled_repos
+            True,  # skip_fork_repos
+            True,  # skip_template_repos
+            "",  # code_security_configuration
+            4,  # listing_concurrency
+            False,  # server_side_filtering
+            False,  # parallel_pagination
+            "",  # repository_file
+            False,  # installation_repositories
+            [],  # organizations
+            "",  # enterprise_slug
+            2,  # organization_concurrency
+            False,  # include_child_teams
+            [],  # read_tokens
+            "",  # output_dir
+            0,  # parse_workers
+            "",  # existing_config_cache_file
+            "yaml",  # output_format
+            [],  # read_apps
         )
         result = get_env_vars(True)
         self.assertEqual(result, expected_result)
@@ -265,6 +325,26 @@ class TestEnv(unittest.TestCase):
             None,  # team_name
             [],  # labels
             None,
+            True,  # skip_empty_repos
+            True,  # skip_disabled_repos
+            True,  # skip_fork_repos
+            True,  # skip_template_repos
+            "",  # code_security_configuration
+            4,  # listing_concurrency
+            False,  # server_side_filtering
+            False,  # parallel_pagination
+            "",  # repository_file
+            False,  # installation_repositories
+            [],  # organizations
+            "",  # enterprise_slug
+            2,  # organization_concurrency
+            False,  # include_child_teams
+            [],  # read_tokens
+            "",  # output_dir
+            0,  # parse_workers
+            "",  # existing_config_cache_file
+            "yaml",  # output_format
+            [],  # read_apps
         )
         result = get_env_vars(True)
         self.assertEqual(result, expected_result)
@@ -323,6 +403,26 @@ class TestEnv(unittest.TestCase):
             "engineering",  # team_name
             [],  # labels
             None,
+            True,  # skip_empty_repos
+            True,  # skip_disabled_repos
+            True,  # skip_fork_repos
+            True,  # skip_template_repos
+            "",  # code_security_configuration
+            4,  # listing_concurrency
+            False,  # server_side_filtering
+            False,  # parallel_pagination
+            "",  # repository_file
+            False,  # installation_repositories
+            [],  # organizations
+            "",  # enterprise_slug
+            2,  # organization_concurrency
+            False,  # include_child_teams
+            [],  # read_tokens
+            "",  # output_dir
+            0,  # parse_workers
+            "",  # existing_config_cache_file
+            "yaml",  # output_format
+            [],  # read_apps
         )
         result = get_env_vars(True)
         self.assertEqual(result, expected_result)
@@ -398,6 +498,26 @@ we can keep our dependencies up to date and secure.",
             None,  # team_name
             [],  # labels
             None,
+            True,  # skip_empty_repos
+            True,  # skip_disabled_repos
+            True,  # skip_fork_repos
+            True,  # skip_template_repos
+            "",  # code_security_configuration
+            4,  # listing_concurrency
+            False,  # server_side_filtering
+            False,  # parallel_pagination
+            "",  # repository_file
+            False,  # installation_repositories
+            [],  # organizations
+            "",  # enterprise_slug
+            2,  # organization_concurrency
+            False,  # include_child_teams
+            [],  # read_tokens
+            "",  # output_dir
+            0,  # parse_workers
+            "",  # existing_config_cache_file
+            "yaml",  # output_format
+            [],  # read_apps
         )
         result = get_env_vars(True)
         self.assertEqual(result, expected_result)
@@ -445,6 +565,26 @@ we can keep our dependencies up to date and secure.",
             None,  # team_name
             [],  # labels
             None,
+            True,  # skip_empty_repos
+            True,  # skip_disabled_repos
+            True,  # skip_fork_repos
+            True,  # skip_template_repos
+            "",  # code_security_configuration
+            4,  # listing_concurrency
+            False,  # server_side_filtering
+            False,  # parallel_pagination
+            "",  # repository_file
+            False,  # installation_repositories
+            [],  # organizations
+            "",  # enterprise_slug
+            2,  # organization_concurrency
+            False,  # include_child_teams
+            [],  # read_tokens
+            "",  # output_dir
+            0,  # parse_workers
+            "",  # existing_config_cache_file
+            "yaml",  # output_format
+            [],  # read_apps
         )
         result = get_env_vars(True)
         self.assertEqual(result, expected_result)
@@ -457,7 +597,8 @@ we can keep our dependencies up to date and secure.",
         the_exception = cm.exception
         self.assertEqual(
             str(the_exception),
-            "ORGANIZATION, REPOSITORY, and REPOSITORY_SEARCH_QUERY environment variables were not set. Please set one",
+            "ORGANIZATION, ORGANIZATIONS, ENTERPRISE_SLUG, REPOSITORY, REPOSITORY_FILE, REPOSITORY_SEARCH_QUERY, "
+            "and INSTALLATION_REPOSITORIES environment variables were not set. Please set one",
         )
 
     @patch.dict(
@@ -506,6 +647,26 @@ we can keep our dependencies up to date and secure.",
             None,  # team_name
             [],  # labels
             None,
+            True,  # skip_empty_repos
+            True,  # skip_disabled_repos
+            True,  # skip_fork_repos
+            True,  # skip_template_repos
+            "",  # code_security_configuration
+            4,  # listing_concurrency
+            False,  # server_side_filtering
+            False,  # parallel_pagination
+            "",  # repository_file
+            False,  # installation_repositories
+            [],  # organizations
+            "",  # enterprise_slug
+            2,  # organization_concurrency
+            False,  # include_child_teams
+            [],  # read_tokens
+            "",  # output_dir
+            0,  # parse_workers
+            "",  # existing_config_cache_file
+            "yaml",  # output_format
+            [],  # read_apps
         )
         result = get_env_vars(True)
         self.assertEqual(result, expected_result)
@@ -596,6 +757,26 @@ we can keep our dependencies up to date and secure.",
             None,  # team_name
             [],  # labels
             None,
+            True,  # skip_empty_repos
+            True,  # skip_disabled_repos
+            True,  # skip_fork_repos
+            True,  # skip_template_repos
+            "",  # code_security_configuration
+            4,  # listing_concurrency
+            False,  # server_side_filtering
+            False,  # parallel_pagination
+            "",  # repository_file
+            False,  # installation_repositories
+            [],  # organizations
+            "",  # enterprise_slug
+            2,  # organization_concurrency
+            False,  # include_child_teams
+            [],  # read_tokens
+            "",  # output_dir
+            0,  # parse_workers
+            "",  # existing_config_cache_file
+            "yaml",  # output_format
+            [],  # read_apps
         )
         result = get_env_vars(True)
         self.assertEqual(result, expected_result)
@@ -643,6 +824,26 @@ we can keep our dependencies up to date and secure.",
             None,  # team_name
             [],  # labels
             None,
+            True,  # skip_empty_repos
+            True,  # skip_disabled_repos
+            True,  # skip_fork_repos
+            True,  # skip_template_repos
+            "",  # code_security_configuration
+            4,  # listing_concurrency
+            False,  # server_side_filtering
+            False,  # parallel_pagination
+            "",  # repository_file
+            False,  # installation_repositories
+            [],  # organizations
+            "",  # enterprise_slug
+            2,  # organization_concurrency
+            False,  # include_child_teams
+            [],  # read_tokens
+            "",  # output_dir
+            0,  # parse_workers
+            "",  # existing_config_cache_file
+            "yaml",  # output_format
+            [],  # read_apps
         )
         result = get_env_vars(True)
         self.assertEqual(result, expected_result)
@@ -691,6 +892,26 @@ we can keep our dependencies up to date and secure.",
             None,  # team_name
             [],  # labels
             None,
+            True,  # skip_empty_repos
+            True,  # skip_disabled_repos
+            True,  # skip_fork_repos
+            True,  # skip_template_repos
+            "",  # code_security_configuration
+            4,  # listing_concurrency
+            False,  # server_side_filtering
+            False,  # parallel_pagination
+            "",  # repository_file
+            False,  # installation_repositories
+            [],  # organizations
+            "",  # enterprise_slug
+            2,  # organization_concurrency
+            False,  # include_child_teams
+            [],  # read_tokens
+            "",  # output_dir
+            0,  # parse_workers
+            "",  # existing_config_cache_file
+            "yaml",  # output_format
+            [],  # read_apps
         )
         result = get_env_vars(True)
         self.assertEqual(result, expected_result)
@@ -739,6 +960,26 @@ we can keep our dependencies up to date and secure.",
             None,  # team_name
             [],  # labels
             None,
+            True,  # skip_empty_repos
+            True,  # skip_disabled_repos
+            True,  # skip_fork_repos
+            True,  # skip_template_repos
+            "",  # code_security_configuration
+            4,  # listing_concurrency
+            False,  # server_side_filtering
+            False,  # parallel_pagination
+            "",  # repository_file
+            False,  # installation_repositories
+            [],  # organizations
+            "",  # enterprise_slug
+            2,  # organization_concurrency
+            False,  # include_child_teams
+            [],  # read_tokens
+            "",  # output_dir
+            0,  # parse_workers
+            "",  # existing_config_cache_file
+            "yaml",  # output_format
+            [],  # read_apps
         )
         result = get_env_vars(True)
         self.assertEqual(result, expected_result)
@@ -817,6 +1058,26 @@ we can keep our dependencies up to date and secure.",
             None,  # team_name
             [],  # labels
             None,
+            True,  # skip_empty_repos
+            True,  # skip_disabled_repos
+            True,  # skip_fork_repos
+            True,  # skip_template_repos
+            "",  # code_security_configuration
+            4,  # listing_concurrency
+            False,  # server_side_filtering
+            False,  # parallel_pagination
+            "",  # repository_file
+            False,  # installation_repositories
+            [],  # organizations
+            "",  # enterprise_slug
+            2,  # organization_concurrency
+            False,  # include_child_teams
+            [],  # read_tokens
+            "",  # output_dir
+            0,  # parse_workers
+            "",  # existing_config_cache_file
+            "yaml",  # output_format
+            [],  # read_apps
         )
         result = get_env_vars(True)
         self.assertEqual(result, expected_result)
@@ -866,6 +1127,26 @@ we can keep our dependencies up to date and secure.",
             None,  # team_name
             [],  # labels
             None,
+            True,  # skip_empty_repos
+            True,  # skip_disabled_repos
+            True,  # skip_fork_repos
+            True,  # skip_template_repos
+            "",  # code_security_configuration
+            4,  # listing_concurrency
+            False,  # server_side_filtering
+            False,  # parallel_pagination
+            "",  # repository_file
+            False,  # installation_repositories
+            [],  # organizations
+            "",  # enterprise_slug
+            2,  # organization_concurrency
+            False,  # include_child_teams
+            [],  # read_tokens
+            "",  # output_dir
+            0,  # parse_workers
+            "",  # existing_config_cache_file
+            "yaml",  # output_format
+            [],  # read_apps
         )
         result = get_env_vars(True)
         self.assertEqual(result, expected_result)
@@ -914,6 +1195,26 @@ we can keep our dependencies up to date and secure.",
             None,  # team_name
             [],  # labels
             None,
+            True,  # skip_empty_repos
+            True,  # skip_disabled_repos
+            True,  # skip_fork_repos
+            True,  # skip_template_repos
+            "",  # code_security_configuration
+            4,  # listing_concurrency
+            False,  # server_side_filtering
+            False,  # parallel_pagination
+            "",  # repository_file
+            False,  # installation_repositories
+            [],  # organizations
+            "",  # enterprise_slug
+            2,  # organization_concurrency
+            False,  # include_child_teams
+            [],  # read_tokens
+            "",  # output_dir
+            0,  # parse_workers
+            "",  # existing_config_cache_file
+            "yaml",  # output_format
+            [],  # read_apps
         )
         result = get_env_vars(True)
         self.assertEqual(result, expected_result)
@@ -963,6 +1264,26 @@ we can keep our dependencies up to date and secure.",
             None,  # team_name
             [],  # labels
             None,
+            True,  # skip_empty_repos
+            True,  # skip_disabled_repos
+            True,  # skip_fork_repos
+            True,  # skip_template_repos
+            "",  # code_security_configuration
+            4,  # listing_concurrency
+            False,  # server_side_filtering
+            False,  # parallel_pagination
+            "",  # repository_file
+            False,  # installation_repositories
+            [],  # organizations
+            "",  # enterprise_slug
+            2,  # organization_concurrency
+            False,  # include_child_teams
+            [],  # read_tokens
+            "",  # output_dir
+            0,  # parse_workers
+            "",  # existing_config_cache_file
+            "yaml",  # output_format
+            [],  # read_apps
         )
         result = get_env_vars(True)
         self.assertEqual(result, expected_result)
@@ -1101,6 +1422,26 @@ we can keep our dependencies up to date and secure.",
             None,  # team_name
             [],  # labels
             None,
+            True,  # skip_empty_repos
+            True,  # skip_disabled_repos
+            True,  # skip_fork_repos
+            True,  # skip_template_repos
+            "",  # code_security_configuration
+            4,  # listing_concurrency
+            False,  # server_side_filtering
+            False,  # parallel_pagination
+            "",  # repository_file
+            False,  # installation_repositories
+            [],  # organizations
+            "",  # enterprise_slug
+            2,  # organization_concurrency
+            False,  # include_child_teams
+            [],  # read_tokens
+            "",  # output_dir
+            0,  # parse_workers
+            "",  # existing_config_cache_file
+            "yaml",  # output_format
+            [],  # read_apps
         )
         result = get_env_vars(True)
         self.assertEqual(result, expected_result)
@@ -1187,6 +1528,26 @@ we can keep our dependencies up to date and secure.",
             None,  # team_name
             ["dependencies"],  # labels
             None,
+            True,  # skip_empty_repos
+            True,  # skip_disabled_repos
+            True,  # skip_fork_repos
+            True,  # skip_template_repos
+            "",  # code_security_configuration
+            4,  # listing_concurrency
+            False,  # server_side_filtering
+            False,  # parallel_pagination
+            "",  # repository_file
+            False,  # installation_repositories
+            [],  # organizations
+            "",  # enterprise_slug
+            2,  # organization_concurrency
+            False,  # include_child_teams
+            [],  # read_tokens
+            "",  # output_dir
+            0,  # parse_workers
+            "",  # existing_config_cache_file
+            "yaml",  # output_format
+            [],  # read_apps
         )
         result = get_env_vars(True)
         self.assertEqual(result, expected_result)
@@ -1234,6 +1595,26 @@ we can keep our dependencies up to date and secure.",
             None,  # team_name
             ["dependencies", "test", "test2"],  # labels
             None,
+            True,  # skip_empty_repos
+            True,  # skip_disabled_repos
+            True,  # skip_fork_repos
+            True,  # skip_template_repos
+            "",  # code_security_configuration
+            4,  # listing_concurrency
+            False,  # server_side_filtering
+            False,  # parallel_pagination
+            "",  # repository_file
+            False,  # installation_repositories
+            [],  # organizations
+            "",  # enterprise_slug
+            2,  # organization_concurrency
+            False,  # include_child_teams
+            [],  # read_tokens
+            "",  # output_dir
+            0,  # parse_workers
+            "",  # existing_config_cache_file
+            "yaml",  # output_format
+            [],  # read_apps
         )
         result = get_env_vars(True)
         self.assertEqual(result, expected_result)
@@ -1340,6 +1721,774 @@ we can keep our dependencies up to date and secure.",
             "No dependabot extra configuration found. Please create one in config.yaml",
         )
 
+    @patch.dict(
+        os.environ,
+        {
+            "ORGANIZATION": "my_organization",
+            "GH_TOKEN": "my_token",
+            "BODY": "my body",
+            "SKIP_EMPTY_REPOS": "false",
+            "SKIP_DISABLED_REPOS": "false",
+            "SKIP_FORK_REPOS": "false",
+            "SKIP_TEMPLATE_REPOS": "false",
+        },
+        clear=True,
+    )
+    def test_get_env_vars_with_metadata_filters_disabled(self):
+        """Test that the repository metadata filters can be opted out of"""
+        expected_result = (
+            "my_organization",
+            [],
+            "",  # search_query
+            None,
+            None,
+            b"",
+            False,
+            "my_token",
+            "",
+            [],
+            "pull",
+            "Enable Dependabot",
+            "my body",
+            "",
+            False,
+            "Create/Update dependabot.yaml",
+            None,
+            False,
+            ["internal", "private", "public"],
+            None,  # batch_size
+            True,  # enable_security_updates
+            [],  # exempt_ecosystems
+            False,  # update_existing
+            {},  # repo_specific_exemptions
+            "weekly",  # schedule
+            "",  # schedule_day
+            None,  # team_name
+            [],  # labels
+            None,
+            False,  # skip_empty_repos
+            False,  # skip_disabled_repos
+            False,  # skip_fork_repos
+            False,  # skip_template_repos
+            "",  # code_security_configuration
+            4,  # listing_concurrency
+            False,  # server_side_filtering
+            False,  # parallel_pagination
+            "",  # repository_file
+            False,  # installation_repositories
+            [],  # organizations
+            "",  # enterprise_slug
+            2,  # organization_concurrency
+            False,  # include_child_teams
+            [],  # read_tokens
+            "",  # output_dir
+            0,  # parse_workers
+            "",  # existing_config_cache_file
+            "yaml",  # output_format
+            [],  # read_apps
+        )
+        result = get_env_vars(True)
+        self.assertEqual(result, expected_result)
+
+    @patch.dict(
+        os.environ,
+        {
+            "REPOSITORY": "org/repo1",
+            "GH_TOKEN": "my_token",
+            "CODE_SECURITY_CONFIGURATION": "evergreen",
+        },
+        clear=True,
+    )
+    def test_get_env_vars_code_security_configuration_without_organization(self):
+        """Test that CODE_SECURITY_CONFIGURATION requires ORGANIZATION to be set"""
+        with self.assertRaises(ValueError) as context_manager:
+            get_env_vars(True)
+        the_exception = context_manager.exception
+        self.assertEqual(
+            str(the_exception),
+            "CODE_SECURITY_CONFIGURATION environment variable requires ORGANIZATION, ORGANIZATIONS or ENTERPRISE_SLUG to be set",
+        )
+
+    @patch.dict(
+        os.environ,
+        {
+            "ORGANIZATION": "my_organization",
+            "GH_TOKEN": "my_token",
+            "LISTING_CONCURRENCY": "0",
+        },
+        clear=True,
+    )
+    def test_get_env_vars_with_invalid_listing_concurrency(self):
+        """Test that LISTING_CONCURRENCY must be a positive number"""
+        with self.assertRaises(ValueError) as context_manager:
+            get_env_vars(True)
+        the_exception = context_manager.exception
+        self.assertEqual(
+            str(the_exception),
+            "LISTING_CONCURRENCY environment variable is 0 or lower",
+        )
+
+    @patch.dict(
+        os.environ,
+        {
+            "REPOSITORY_FILE": "-",
+            "REPOSITORY": "org/repo1",
+            "GH_TOKEN": "my_token",
+        },
+        clear=True,
+    )
+    def test_get_env_vars_repository_file_with_repository(self):
+        """Test that REPOSITORY_FILE cannot be combined with REPOSITORY"""
+        with self.assertRaises(ValueError) as context_manager:
+            get_env_vars(True)
+        the_exception = context_manager.exception
+        self.assertEqual(
+            str(the_exception),
+            "REPOSITORY_FILE environment variable cannot be used with REPOSITORY or TEAM_NAME",
+        )
+
+    @patch.dict(
+        os.environ,
+        {
+            "REPOSITORY_FILE": "repositories.txt",
+            "GH_TOKEN": "my_token",
+        },
+        clear=True,
+    )
+    def test_get_env_vars_repository_file_not_found(self):
+        """Test that REPOSITORY_FILE must exist"""
+        with self.assertRaises(ValueError) as context_manager:
+            get_env_vars(True)
+        the_exception = context_manager.exception
+        self.assertEqual(
+            str(the_exception),
+            "REPOSITORY_FILE repositories.txt was not found",
+        )
+
+    @patch.dict(
+        os.environ,
+        {
+            "REPOSITORY_FILE": "-",
+            "GH_TOKEN": "my_token",
+            "BODY": "my body",
+        },
+        clear=True,
+    )
+    def test_get_env_vars_with_repository_file_from_stdin(self):
+        """Test that the repositories can be streamed from stdin"""
+        expected_result = (
+            None,
+            [],
+            "",  # search_query
+            None,
+            None,
+            b"",
+            False,
+            "my_token",
+            "",
+            [],
+            "pull",
+            "Enable Dependabot",
+            "my body",
+            "",
+            False,
+            "Create/Update dependabot.yaml",
+            None,
+            False,
+            ["internal", "private", "public"],
+            None,  # batch_size
+            True,  # enable_security_updates
+            [],  # exempt_ecosystems
+            False,  # update_existing
+            {},  # repo_specific_exemptions
+            "weekly",  # schedule
+            "",  # schedule_day
+            None,  # team_name
+            [],  # labels
+            None,
+            True,  # skip_empty_repos
+            True,  # skip_disabled_repos
+            True,  # skip_fork_repos
+            True,  # skip_template_repos
+            "",  # code_security_configuration
+            4,  # listing_concurrency
+            False,  # server_side_filtering
+            False,  # parallel_pagination
+            "-",  # repository_file
+            False,  # installation_repositories
+            [],  # organizations
+            "",  # enterprise_slug
+            2,  # organization_concurrency
+            False,  # include_child_teams
+            [],  # read_tokens
+            "",  # output_dir
+            0,  # parse_workers
+            "",  # existing_config_cache_file
+            "yaml",  # output_format
+            [],  # read_apps
+        )
+        result = get_env_vars(True)
+        self.assertEqual(result, expected_result)
+
+    def test_get_env_vars_installation_repositories_with_other_selections(self):
+        """Test that INSTALLATION_REPOSITORIES cannot be combined with another repository selection"""
+        github_app = {
+            "INSTALLATION_REPOSITORIES": "true",
+            "GH_APP_ID": "12345",
+            "GH_APP_INSTALLATION_ID": "678910",
+            "GH_APP_PRIVATE_KEY": "hello",
+        }
+        for name, value in (
+            ("ORGANIZATION", "my_organization"),
+            ("REPOSITORY", "org/repo1"),
+            ("REPOSITORY_FILE", "-"),
+            ("REPOSITORY_SEARCH_QUERY", "org:my_organization"),
+            ("TEAM_NAME", "my-team"),
+            ("PROJECT_ID", "1"),
+        ):
+            with self.subTest(name=name):
+                with patch.dict(os.environ, {**github_app, name: value}, clear=True):
+                    with self.assertRaises(ValueError) as context_manager:
+                        get_env_vars(True)
+                self.assertEqual(
+                    str(context_manager.exception),
+                    "INSTALLATION_REPOSITORIES environment variable cannot be used with ORGANIZATION, REPOSITORY, "
+                    "REPOSITORY_FILE, REPOSITORY_SEARCH_QUERY, TEAM_NAME or PROJECT_ID",
+                )
+
+    @patch.dict(
+        os.environ,
+        {
+            "INSTALLATION_REPOSITORIES": "true",
+            "GH_TOKEN": "my_token",
+        },
+        clear=True,
+    )
+    def test_get_env_vars_installation_repositories_without_github_app(self):
+        """Test that INSTALLATION_REPOSITORIES requires GitHub App authentication"""
+        with self.assertRaises(ValueError) as context_manager:
+            get_env_vars(True)
+        the_exception = context_manager.exception
+        self.assertEqual(
+            str(the_exception),
+            "INSTALLATION_REPOSITORIES requires GH_APP_ID, GH_APP_INSTALLATION_ID and GH_APP_PRIVATE_KEY to be set",
+        )
+
+    @patch.dict(
+        os.environ,
+        {
+            "ORGANIZATIONS": "org1, org2,",
+            "ENTERPRISE_SLUG": "my-enterprise",
+            "ORGANIZATION_CONCURRENCY": "8",
+            "GH_TOKEN": "my_token",
+            "BODY": "my body",
+        },
+        clear=True,
+    )
+    def test_get_env_vars_with_organizations_and_enterprise(self):
+        """Test that several organizations and an enterprise can be scanned in one run"""
+        expected_result = (
+            None,
+            [],
+            "",  # search_query
+            None,
+            None,
+            b"",
+            False,
+            "my_token",
+            "",
+            [],
+            "pull",
+            "Enable Dependabot",
+            "my body",
+            "",
+            False,
+            "Create/Update dependabot.yaml",
+            None,
+            False,
+            ["internal", "private", "public"],
+            None,  # batch_size
+            True,  # enable_security_updates
+            [],  # exempt_ecosystems
+            False,  # update_existing
+            {},  # repo_specific_exemptions
+            "weekly",  # schedule
+            "",  # schedule_day
+            None,  # team_name
+            [],  # labels
+            None,
+            True,  # skip_empty_repos
+            True,  # skip_disabled_repos
+            True,  # skip_fork_repos
+            True,  # skip_template_repos
+            "",  # code_security_configuration
+            4,  # listing_concurrency
+            False,  # server_side_filtering
+            False,  # parallel_pagination
+            "",  # repository_file
+            False,  # installation_repositories
+            ["org1", "org2"],  # organizations
+            "my-enterprise",  # enterprise_slug
+            8,  # organization_concurrency
+            False,  # include_child_teams
+            [],  # read_tokens
+            "",  # output_dir
+            0,  # parse_workers
+            "",  # existing_config_cache_file
+            "yaml",  # output_format
+            [],  # read_apps
+        )
+        result = get_env_vars(True)
+        self.assertEqual(result, expected_result)
+
+    @patch.dict(
+        os.environ,
+        {
+            "ORGANIZATIONS": "org1,org2",
+            "TEAM_NAME": "my-team",
+            "GH_TOKEN": "my_token",
+        },
+        clear=True,
+    )
+    def test_get_env_vars_organizations_with_team_name(self):
+        """Test that an error is raised when ORGANIZATIONS is combined with another repository selection"""
+        with self.assertRaises(ValueError) as context_manager:
+            get_env_vars(True)
+        the_exception = context_manager.exception
+        self.assertEqual(
+            str(the_exception),
+            "ORGANIZATIONS and ENTERPRISE_SLUG environment variables cannot be used with ORGANIZATION, REPOSITORY, "
+            "REPOSITORY_FILE, REPOSITORY_SEARCH_QUERY, TEAM_NAME, INSTALLATION_REPOSITORIES or PROJECT_ID",
+        )
+
+    @patch.dict(
+        os.environ,
+        {
+            "ENTERPRISE_SLUG": "my-enterprise",
+            "ORGANIZATION_CONCURRENCY": "0",
+            "GH_TOKEN": "my_token",
+        },
+        clear=True,
+    )
+    def test_get_env_vars_invalid_organization_concurrency(self):
+        """Test that an error is raised when ORGANIZATION_CONCURRENCY is 0 or lower"""
+        with self.assertRaises(ValueError) as context_manager:
+            get_env_vars(True)
+        the_exception = context_manager.exception
+        self.assertEqual(
+            str(the_exception),
+            "ORGANIZATION_CONCURRENCY environment variable is 0 or lower",
+        )
+
+    @patch.dict(
+        os.environ,
+        {
+            "ORGANIZATION": "my_organization",
+            "INCLUDE_CHILD_TEAMS": "true",
+            "GH_TOKEN": "my_token",
+        },
+        clear=True,
+    )
+    def test_get_env_vars_include_child_teams_without_team_name(self):
+        """Test that an error is raised when INCLUDE_CHILD_TEAMS is set without TEAM_NAME"""
+        with self.assertRaises(ValueError) as context_manager:
+            get_env_vars(True)
+        the_exception = context_manager.exception
+        self.assertEqual(
+            str(the_exception),
+            "INCLUDE_CHILD_TEAMS environment variable requires TEAM_NAME to be set",
+        )
+
+    @patch.dict(
+        os.environ,
+        {
+            "ORGANIZATION": "my_organization",
+            "GH_TOKEN": "my_token",
+            "GH_READ_TOKENS": "read_token1, read_token2,",
+            "BODY": "my body",
+        },
+        clear=True,
+    )
+    def test_get_env_vars_with_read_tokens(self):
+        """Test that the additional read tokens are parsed into a list"""
+        expected_result = (
+            "my_organization",
+            [],
+            "",  # search_query
+            None,
+            None,
+            b"",
+            False,
+            "my_token",
+            "",
+            [],
+            "pull",
+            "Enable Dependabot",
+            "my body",
+            "",
+            False,
+            "Create/Update dependabot.yaml",
+            None,
+            False,
+            ["internal", "private", "public"],
+            None,  # batch_size
+            True,  # enable_security_updates
+            [],  # exempt_ecosystems
+            False,  # update_existing
+            {},  # repo_specific_exemptions
+            "weekly",  # schedule
+            "",  # schedule_day
+            None,  # team_name
+            [],  # labels
+            None,
+            True,  # skip_empty_repos
+            True,  # skip_disabled_repos
+            True,  # skip_fork_repos
+            True,  # skip_template_repos
+            "",  # code_security_configuration
+            4,  # listing_concurrency
+            False,  # server_side_filtering
+            False,  # parallel_pagination
+            "",  # repository_file
+            False,  # installation_repositories
+            [],  # organizations
+            "",  # enterprise_slug
+            2,  # organization_concurrency
+            False,  # include_child_teams
+            ["read_token1", "read_token2"],  # read_tokens
+            "",  # output_dir
+            0,  # parse_workers
+            "",  # existing_config_cache_file
+            "yaml",  # output_format
+            [],  # read_apps
+        )
+        result = get_env_vars(True)
+        self.assertEqual(result, expected_result)
+
+    @patch.dict(
+        os.environ,
+        {
+            "ORGANIZATION": "my_organization",
+            "GH_TOKEN": "my_token",
+            "GH_READ_APPS": "123:456:-----BEGIN KEY-----\nkey1\n-----END KEY-----\n, 789:12:key2",
+            "BODY": "my body",
+        },
+        clear=True,
+    )
+    def test_get_env_vars_with_read_apps(self):
+        """Test that the credentials of the additional GitHub Apps are parsed into a list"""
+        expected_result = (
+            "my_organization",
+            [],
+            "",  # search_query
+            None,
+            None,
+            b"",
+            False,
+            "my_token",
+            "",
+            [],
+            "pull",
+            "Enable Dependabot",
+            "my body",
+            "",
+            False,
+            "Create/Update dependabot.yaml",
+            None,
+            False,
+            ["internal", "private", "public"],
+            None,  # batch_size
+            True,  # enable_security_updates
+            [],  # exempt_ecosystems
+            False,  # update_existing
+            {},  # repo_specific_exemptions
+            "weekly",  # schedule
+            "",  # schedule_day
+            None,  # team_name
+            [],  # labels
+            None,
+            True,  # skip_empty_repos
+            True,  # skip_disabled_repos
+            True,  # skip_fork_repos
+            True,  # skip_template_repos
+            "",  # code_security_configuration
+            4,  # listing_concurrency
+            False,  # server_side_filtering
+            False,  # parallel_pagination
+            "",  # repository_file
+            False,  # installation_repositories
+            [],  # organizations
+            "",  # enterprise_slug
+            2,  # organization_concurrency
+            False,  # include_child_teams
+            [],  # read_tokens
+            "",  # output_dir
+            0,  # parse_workers
+            "",  # existing_config_cache_file
+            "yaml",  # output_format
+            [
+                (123, 456, b"-----BEGIN KEY-----\nkey1\n-----END KEY-----"),
+                (789, 12, b"key2"),
+            ],  # read_apps
+        )
+        result = get_env_vars(True)
+        self.assertEqual(result, expected_result)
+
+    @patch.dict(
+        os.environ,
+        {
+            "ORGANIZATION": "my_organization",
+            "GH_TOKEN": "my_token",
+            "GH_READ_APPS": "123:private_key",
+        },
+        clear=True,
+    )
+    def test_get_env_vars_invalid_read_apps(self):
+        """Test that an error is raised when GH_READ_APPS is not formatted correctly"""
+        with self.assertRaises(ValueError) as context_manager:
+            get_env_vars(True)
+        the_exception = context_manager.exception
+        self.assertEqual(
+            str(the_exception),
+            "GH_READ_APPS environment variable not formatted correctly. Expected <app id>:<installation id>:<private key> entries.",
+        )
+
+    @patch.dict(
+        os.environ,
+        {
+            "ORGANIZATION": "my_organization",
+            "GH_TOKEN": "my_token",
+            "OUTPUT_DIR": " dependabot-output ",
+            "BODY": "my body",
+        },
+        clear=True,
+    )
+    def test_get_env_vars_with_output_dir(self):
+        """Test that the output directory of the generated files is read"""
+        expected_result = (
+            "my_organization",
+            [],
+            "",  # search_query
+            None,
+            None,
+            b"",
+            False,
+            "my_token",
+            "",
+            [],
+            "pull",
+            "Enable Dependabot",
+            "my body",
+            "",
+            False,
+            "Create/Update dependabot.yaml",
+            None,
+            False,
+            ["internal", "private", "public"],
+            None,  # batch_size
+            True,  # enable_security_updates
+            [],  # exempt_ecosystems
+            False,  # update_existing
+            {},  # repo_specific_exemptions
+            "weekly",  # schedule
+            "",  # schedule_day
+            None,  # team_name
+            [],  # labels
+            None,
+            True,  # skip_empty_repos
+            True,  # skip_disabled_repos
+            True,  # skip_fork_repos
+            True,  # skip_template_repos
+            "",  # code_security_configuration
+            4,  # listing_concurrency
+            False,  # server_side_filtering
+            False,  # parallel_pagination
+            "",  # repository_file
+            False,  # installation_repositories
+            [],  # organizations
+            "",  # enterprise_slug
+            2,  # organization_concurrency
+            False,  # include_child_teams
+            [],  # read_tokens
+            "dependabot-output",  # output_dir
+            0,  # parse_workers
+            "",  # existing_config_cache_file
+            "yaml",  # output_format
+            [],  # read_apps
+        )
+        result = get_env_vars(True)
+        self.assertEqual(result, expected_result)
+
+    @patch.dict(
+        os.environ,
+        {
+            "ORGANIZATION": "my_organization",
+            "GH_TOKEN": "my_token",
+            "EXISTING_CONFIG_CACHE_FILE": " .cache/existing-configs.json ",
+            "BODY": "my body",
+        },
+        clear=True,
+    )
+    def test_get_env_vars_with_existing_config_cache_file(self):
+        """Test that the cache file of the existing dependabot files is read"""
+        expected_result = (
+            "my_organization",
+            [],
+            "",  # search_query
+            None,
+            None,
+            b"",
+            False,
+            "my_token",
+            "",
+            [],
+            "pull",
+            "Enable Dependabot",
+            "my body",
+            "",
+            False,
+            "Create/Update dependabot.yaml",
+            None,
+            False,
+            ["internal", "private", "public"],
+            None,  # batch_size
+            True,  # enable_security_updates
+            [],  # exempt_ecosystems
+            False,  # update_existing
+            {},  # repo_specific_exemptions
+            "weekly",  # schedule
+            "",  # schedule_day
+            None,  # team_name
+            [],  # labels
+            None,
+            True,  # skip_empty_repos
+            True,  # skip_disabled_repos
+            True,  # skip_fork_repos
+            True,  # skip_template_repos
+            "",  # code_security_configuration
+            4,  # listing_concurrency
+            False,  # server_side_filtering
+            False,  # parallel_pagination
+            "",  # repository_file
+            False,  # installation_repositories
+            [],  # organizations
+            "",  # enterprise_slug
+            2,  # organization_concurrency
+            False,  # include_child_teams
+            [],  # read_tokens
+            "",  # output_dir
+            0,  # parse_workers
+            ".cache/existing-configs.json",  # existing_config_cache_file
+            "yaml",  # output_format
+            [],  # read_apps
+        )
+        result = get_env_vars(True)
+        self.assertEqual(result, expected_result)
+
+    @patch.dict(
+        os.environ,
+        {
+            "ORGANIZATION": "my_organization",
+            "GH_TOKEN": "my_token",
+            "OUTPUT_FORMAT": " JSONL ",
+            "BODY": "my body",
+        },
+        clear=True,
+    )
+    def test_get_env_vars_with_output_format(self):
+        """Test that the output format of the generated files is read"""
+        expected_result = (
+            "my_organization",
+            [],
+            "",  # search_query
+            None,
+            None,
+            b"",
+            False,
+            "my_token",
+            "",
+            [],
+            "pull",
+            "Enable Dependabot",
+            "my body",
+            "",
+            False,
+            "Create/Update dependabot.yaml",
+            None,
+            False,
+            ["internal", "private", "public"],
+            None,  # batch_size
+            True,  # enable_security_updates
+            [],  # exempt_ecosystems
+            False,  # update_existing
+            {},  # repo_specific_exemptions
+            "weekly",  # schedule
+            "",  # schedule_day
+            None,  # team_name
+            [],  # labels
+            None,
+            True,  # skip_empty_repos
+            True,  # skip_disabled_repos
+            True,  # skip_fork_repos
+            True,  # skip_template_repos
+            "",  # code_security_configuration
+            4,  # listing_concurrency
+            False,  # server_side_filtering
+            False,  # parallel_pagination
+            "",  # repository_file
+            False,  # installation_repositories
+            [],  # organizations
+            "",  # enterprise_slug
+            2,  # organization_concurrency
+            False,  # include_child_teams
+            [],  # read_tokens
+            "",  # output_dir
+            0,  # parse_workers
+            "",  # existing_config_cache_file
+            "jsonl",  # output_format
+            [],  # read_apps
+        )
+        result = get_env_vars(True)
+        self.assertEqual(result, expected_result)
+
+    @patch.dict(
+        os.environ,
+        {
+            "ORGANIZATION": "my_organization",
+            "PARSE_WORKERS": "-1",
+            "GH_TOKEN": "my_token",
+        },
+        clear=True,
+    )
+    def test_get_env_vars_invalid_parse_workers(self):
+        """Test that an error is raised when PARSE_WORKERS is lower than 0"""
+        with self.assertRaises(ValueError) as context_manager:
+            get_env_vars(True)
+        the_exception = context_manager.exception
+        self.assertEqual(
+            str(the_exception),
+            "PARSE_WORKERS environment variable is lower than 0",
+        )
+
+    @patch.dict(
+        os.environ,
+        {
+            "ORGANIZATION": "my_organization",
+            "OUTPUT_FORMAT": "csv",
+            "GH_TOKEN": "my_token",
+        },
+        clear=True,
+    )
+    def test_get_env_vars_invalid_output_format(self):
+        """Test that an error is raised when OUTPUT_FORMAT is not supported"""
+        with self.assertRaises(ValueError) as context_manager:
+            get_env_vars(True)
+        the_exception = context_manager.exception
+        self.assertEqual(
+            str(the_exception),
+            "OUTPUT_FORMAT environment variable not 'yaml' or 'jsonl'",
+        )
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -1,5 +1,8 @@
+# pylint: disable=too-many-lines
+
 """Test the evergreen.py module."""
 
+import threading
 import unittest
 import uuid
 from unittest.mock import MagicMock, patch
@@ -8,18 +11,30 @@ import github3
 import requests
 from evergreen import (
     append_to_github_summary,
+    attach_code_security_configuration,
     check_existing_config,
     check_pending_issues_for_duplicates,
     check_pending_pulls_for_duplicates,
     commit_changes,
     enable_dependabot_security_updates,
+    get_code_security_configuration_id,
+    get_dependabot_security_updates_status,
+    get_filtered_search_query,
     get_global_issue_id,
     get_global_pr_id,
     get_global_project_id,
+    get_organization_names,
+    get_repo_metadata_skip_reason,
     get_repos_iterator,
+    get_skipped_without_write_access_summary,
+    has_code_security_configuration,
+    has_write_permission,
     is_dependabot_security_updates_enabled,
     is_repo_created_date_before,
     link_item_to_project,
+    prepare_ahead,
+    prepare_repository,
+    process_organizations,
 )
 
 
@@ -131,6 +146,58 @@ class TestDependabotSecurityUpdates(unittest.TestCase):
             )
             self.assertFalse(result)
 
+    def test_is_dependabot_security_updates_enabled_from_metadata(self):
+        """
+        Test the is_dependabot_security_updates_enabled function when the status is
+        part of the repository metadata.
+
+        No request should be made to the automated-security-fixes endpoint.
+        """
+        security_and_analysis = {
+            "dependabot_security_updates": {"status": "enabled"},
+        }
+
+        with patch("requests.get") as mock_get:
+            result = is_dependabot_security_updates_enabled(
+                "", "my_owner", "my_repo", "my_access_token", security_and_analysis
+            )
+
+            mock_get.assert_not_called()
+            self.assertTrue(result)
+
+    def test_is_dependabot_security_updates_enabled_metadata_fallback(self):
+        """
+        Test the is_dependabot_security_updates_enabled function falls back to the
+        automated-security-fixes endpoint when the status is missing from the metadata.
+        """
+        security_and_analysis = {"secret_scanning": {"status": "enabled"}}
+
+        with patch("requests.get") as mock_get:
+            mock_get.return_value.status_code = 200
+            mock_get.return_value.json.return_value = {"enabled": True}
+
+            result = is_dependabot_security_updates_enabled(
+                "", "my_owner", "my_repo", "my_access_token", security_and_analysis
+            )
+
+            mock_get.assert_called_once()
+            self.assertTrue(result)
+
+    def test_get_dependabot_security_updates_status(self):
+        """Test reading the Dependabot security updates status from repository metadata"""
+        self.assertTrue(
+            get_dependabot_security_updates_status(
+                {"dependabot_security_updates": {"status": "enabled"}}
+            )
+        )
+        self.assertFalse(
+            get_dependabot_security_updates_status(
+                {"dependabot_security_updates": {"status": "disabled"}}
+            )
+        )
+        self.assertIsNone(get_dependabot_security_updates_status({}))
+        self.assertIsNone(get_dependabot_security_updates_status(None))
+
     def test_enable_dependabot_security_updates(self):
         """
         Test the enable_dependabot_security_updates function.
@@ -202,6 +269,173 @@ class TestDependabotSecurityUpdates(unittest.TestCase):
                 )
 
 
+class TestCodeSecurityConfiguration(unittest.TestCase):
+    """Test the code security configuration functions in evergreen.py"""
+
+    @patch("requests.post")
+    @patch("requests.get")
+    def test_get_existing_code_security_configuration(self, mock_get, mock_post):
+        """Test that an existing configuration is found by name"""
+        mock_get.return_value.json.return_value = [
+            {"id": 1, "name": "other"},
+            {"id": 2, "name": "evergreen"},
+        ]
+
+        result = get_code_security_configuration_id(
+            "", "my_token", "my_org", "evergreen"
+        )
+
+        mock_get.assert_called_once_with(
+            "https://api.github.com/orgs/my_org/code-security/configurations",
+            headers={
+                "Authorization": "Bearer my_token",
+                "Accept": "application/vnd.github+json",
+            },
+            params={"per_page": 100},
+            timeout=20,
+        )
+        mock_post.assert_not_called()
+        self.assertEqual(result, 2)
+
+    @patch("requests.get")
+    def test_get_code_security_configuration_on_next_page(self, mock_get):
+        """Test that the configurations are looked up on every page"""
+        first_page = MagicMock()
+        first_page.json.return_value = [{"id": 1, "name": "other"}]
+        first_page.links = {"next": {"url": "https://api.github.com/next"}}
+        second_page = MagicMock()
+        second_page.json.return_value = [{"id": 2, "name": "evergreen"}]
+        second_page.links = {}
+        mock_get.side_effect = [first_page, second_page]
+
+        result = get_code_security_configuration_id(
+            "", "my_token", "my_org", "evergreen"
+        )
+
+        self.assertEqual(
+            mock_get.call_args_list[1].args[0], "https://api.github.com/next"
+        )
+        self.assertEqual(mock_get.call_args_list[1].kwargs["params"], {})
+        self.assertEqual(result, 2)
+
+    @patch("requests.post")
+    @patch("requests.get")
+    def test_missing_code_security_configuration_is_not_created(
+        self, mock_get, mock_post
+    ):
+        """Test that a missing configuration is not created"""
+        mock_get.return_value.json.return_value = [{"id": 1, "name": "other"}]
+        mock_get.return_value.links = {}
+
+        result = get_code_security_configuration_id(
+            "", "my_token", "my_org", "evergreen"
+        )
+
+        mock_post.assert_not_called()
+        self.assertIsNone(result)
+
+    @patch("requests.get")
+    def test_get_code_security_configuration_request_failed(self, mock_get):
+        """Test that None is returned when the request fails"""
+        mock_get.side_effect = requests.exceptions.RequestException("Request failed")
+
+        result = get_code_security_configuration_id(
+            "", "my_token", "my_org", "evergreen"
+        )
+
+        self.assertIsNone(result)
+
+    @patch("requests.get")
+    def test_has_code_security_configuration(self, mock_get):
+        """Test the code security configuration attached to a repository"""
+        mock_get.return_value.status_code = 204
+        self.assertFalse(
+            has_code_security_configuration("", "my_org", "my_repo", "my_token")
+        )
+        mock_get.assert_called_once_with(
+            "https://api.github.com/repos/my_org/my_repo/code-security-configuration",
+            headers={
+                "Authorization": "Bearer my_token",
+                "Accept": "application/vnd.github+json",
+            },
+            timeout=20,
+        )
+
+        mock_get.return_value.status_code = 200
+        mock_get.return_value.json.return_value = {
+            "status": "attached",
+            "configuration": {"id": 1, "name": "GitHub recommended"},
+        }
+        self.assertTrue(
+            has_code_security_configuration("", "my_org", "my_repo", "my_token")
+        )
+
+    @patch("requests.get")
+    def test_has_code_security_configuration_unknown(self, mock_get):
+        """Test that a repository is considered attached when it cannot be checked"""
+        mock_get.return_value.status_code = 403
+        self.assertTrue(
+            has_code_security_configuration("", "my_org", "my_repo", "my_token")
+        )
+
+        mock_get.side_effect = requests.exceptions.RequestException("Request failed")
+        self.assertTrue(
+            has_code_security_configuration("", "my_org", "my_repo", "my_token")
+        )
+
+    @patch("evergreen.CODE_SECURITY_ATTACH_BATCH_SIZE", 2)
+    @patch("requests.post")
+    def test_attach_code_security_configuration_in_batches(self, mock_post):
+        """Test that repositories are attached to the configuration in batches"""
+        mock_post.return_value.status_code = 202
+
+        result = attach_code_security_configuration(
+            "https://ghe.example.com", "my_token", "my_org", 3, [1, 2, 3]
+        )
+
+        self.assertEqual(mock_post.call_count, 2)
+        first_call = mock_post.call_args_list[0]
+        self.assertEqual(
+            first_call.args[0],
+            "https://ghe.example.com/api/v3/orgs/my_org/code-security/configurations/3/attach",
+        )
+        self.assertEqual(
+            first_call.kwargs["json"],
+            {"scope": "selected", "selected_repository_ids": [1, 2]},
+        )
+        self.assertEqual(
+            mock_post.call_args_list[1].kwargs["json"]["selected_repository_ids"], [3]
+        )
+        self.assertEqual(result, 3)
+
+    @patch("requests.post")
+    def test_attach_code_security_configuration_failed(self, mock_post):
+        """Test that failed batches are not counted as attached"""
+        mock_post.return_value.status_code = 422
+
+        result = attach_code_security_configuration(
+            "", "my_token", "my_org", 3, [1, 2, 3]
+        )
+
+        self.assertEqual(result, 0)
+
+    @patch("evergreen.CODE_SECURITY_ATTACH_BATCH_SIZE", 2)
+    @patch("requests.post")
+    def test_attach_code_security_configuration_request_failed(self, mock_post):
+        """Test that a network error fails the batch without stopping the run"""
+        mock_post.side_effect = [
+            requests.exceptions.ConnectionError("Connection reset"),
+            MagicMock(status_code=202),
+        ]
+
+        result = attach_code_security_configuration(
+            "", "my_token", "my_org", 3, [1, 2, 3]
+        )
+
+        self.assertEqual(mock_post.call_count, 2)
+        self.assertEqual(result, 1)
+
+
 class TestCommitChanges(unittest.TestCase):
     """Test the commit_changes function in evergreen.py"""
 
@@ -341,31 +575,88 @@ class TestGetReposIterator(unittest.TestCase):
         # Assert that the function returned the expected result
         self.assertEqual(result, mock_repositories)
 
-    @patch("github3.login")
-    def test_get_repos_iterator_with_repository_list(self, mock_github):
+    @patch("repositories.list_organization_repositories")
+    def test_get_repos_iterator_with_parallel_pagination(
+        self, mock_list_organization_repositories
+    ):
+        """Test the get_repos_iterator function with parallel pagination"""
+        github_connection = MagicMock()
+
+        result = get_repos_iterator(
+            "my_organization", None, [], "", github_connection, 8, True
+        )
+
+        mock_list_organization_repositories.assert_called_once_with(
+            github_connection, "my_organization", 8
+        )
+        github_connection.organization.assert_not_called()
+        self.assertEqual(result, mock_list_organization_repositories.return_value)
+
+    @patch("repositories.resolve_repositories")
+    def test_get_repos_iterator_with_repository_list(self, mock_resolve_repositories):
         """Test the get_repos_iterator function with a repository list"""
         organization = None
         repository_list = ["org/repo1", "org/repo2"]
         search_query = ""
-        github_connection = mock_github.return_value
-
-        mock_repository = MagicMock()
-        mock_repository_list = [mock_repository, mock_repository]
-        github_connection.repository.side_effect = mock_repository_list
+        github_connection = MagicMock()
 
         result = get_repos_iterator(
             organization, None, repository_list, search_query, github_connection
         )
 
-        # Assert that the repository method was called with the correct arguments for each repository in the list
-        expected_calls = [
-            unittest.mock.call("org", "repo1"),
-            unittest.mock.call("org", "repo2"),
-        ]
-        github_connection.repository.assert_has_calls(expected_calls)
+        # Assert that the repositories are resolved in batches instead of one request each
+        mock_resolve_repositories.assert_called_once_with(
+            github_connection, repository_list
+        )
+        github_connection.repository.assert_not_called()
 
         # Assert that the function returned the expected result
-        self.assertEqual(result, mock_repository_list)
+        self.assertEqual(result, mock_resolve_repositories.return_value)
+
+    @patch("repositories.read_repository_names")
+    @patch("repositories.resolve_repositories")
+    def test_get_repos_iterator_with_repository_file(
+        self, mock_resolve_repositories, mock_read_repository_names
+    ):
+        """Test the get_repos_iterator function with a repository file"""
+        github_connection = MagicMock()
+
+        result = get_repos_iterator(
+            None,
+            None,
+            [],
+            "",
+            github_connection,
+            repository_file="repositories.txt",
+        )
+
+        mock_read_repository_names.assert_called_once_with("repositories.txt")
+        mock_resolve_repositories.assert_called_once_with(
+            github_connection, mock_read_repository_names.return_value
+        )
+        self.assertEqual(result, mock_resolve_repositories.return_value)
+
+    @patch("repositories.list_installation_repositories")
+    def test_get_repos_iterator_with_installation_repositories(
+        self, mock_list_installation_repositories
+    ):
+        """Test the get_repos_iterator function with the installation repositories"""
+        github_connection = MagicMock()
+
+        result = get_repos_iterator(
+            None,
+            None,
+            [],
+            "",
+            github_connection,
+            installation_repositories=True,
+        )
+
+        mock_list_installation_repositories.assert_called_once_with(
+            github_connection, 4
+        )
+        github_connection.organization.assert_not_called()
+        self.assertEqual(result, mock_list_installation_repositories.return_value)
 
     @patch("github3.login")
     def test_get_repos_iterator_with_team(self, mock_github):
@@ -403,21 +694,49 @@ class TestGetReposIterator(unittest.TestCase):
         # Assert that the function returned the expected result
         self.assertEqual(result, mock_team_repositories)
 
+    def test_get_repos_iterator_with_team_slug_list(self):
+        """Test that a single team written as a list is looked up by its slug"""
+        github_connection = MagicMock()
+
+        get_repos_iterator("my_organization", " my_team,", [], "", github_connection)
+
+        github_connection.organization.return_value.team_by_name.assert_called_once_with(
+            "my_team"
+        )
+
+    @patch("repositories.list_teams_repositories")
+    def test_get_repos_iterator_with_multiple_teams(self, mock_list_teams_repositories):
+        """Test the get_repos_iterator function with several teams"""
+        github_connection = MagicMock()
+
+        result = get_repos_iterator(
+            "my_organization",
+            "team1, team2",
+            [],
+            "",
+            github_connection,
+            include_child_teams=True,
+        )
+
+        mock_list_teams_repositories.assert_called_once_with(
+            github_connection, "my_organization", ["team1", "team2"], True, 4
+        )
+        github_connection.organization.assert_not_called()
+        self.assertEqual(result, mock_list_teams_repositories.return_value)
+
+    @patch("repositories.search_repositories")
     @patch("github3.login")
-    def test_get_repos_iterator_with_search_query(self, mock_github):
+    def test_get_repos_iterator_with_search_query(
+        self, mock_github, mock_search_repositories
+    ):
         """Test the get_repos_iterator function with a search query"""
         organization = "my_organization"
         repository_list = []
         team_name = None
         search_query = "org:my-org is:repository archived:false"
         github_connection = mock_github.return_value
-        repo1 = MagicMock()
-        repo2 = MagicMock()
-
-        # Mock the search_repositories method to return an iterator of repositories
-        github_connection.search_repositories.return_value = [repo1, repo2]
 
-        get_repos_iterator(
+        result = get_repos_iterator(
             organization,
             team_name,
             repository_list,
@@ -425,8 +744,68 @@ class TestGetReposIterator(unittest.TestCase):
             github_connection,
         )
 
-        # Assert that the search_repositories method was called with the correct argument
-        github_connection.search_repositories.assert_called_with(search_query)
+        # Assert that the search results are streamed from the search API
+        mock_search_repositories.assert_called_once_with(
+            github_connection, search_query, 4
+        )
+        self.assertEqual(result, mock_search_repositories.return_value)
+
+
+class TestGetFilteredSearchQuery(unittest.TestCase):
+    """Test the get_filtered_search_query function in evergreen.py"""
+
+    def test_get_filtered_search_query_organization(self):
+        """Test that the organization listing is replaced by a search"""
+        with patch("builtins.print"):
+            result = get_filtered_search_query(
+                "my-org", None, [], None, False, ["private"], None, True
+            )
+
+        self.assertEqual(result, "org:my-org archived:false is:private fork:false")
+
+    def test_get_filtered_search_query_unsupported_filters(self):
+        """Test that None is returned when the filters cannot be searched"""
+        with patch("builtins.print"):
+            result = get_filtered_search_query(
+                "my-org", None, [], None, False, ["private", "internal"], None, True
+            )
+
+        self.assertIsNone(result)
+
+    def test_get_filtered_search_query_other_sources(self):
+        """Test that repositories selected another way are not searched"""
+        for team_name, repository_list, repository_file, installation in [
+            ("my-team", [], None, False),
+            (None, ["my-org/repo1"], None, False),
+            (None, [], "repositories.txt", False),
+            (None, [], None, True),
+        ]:
+            with self.subTest(
+                team_name=team_name,
+                repository_list=repository_list,
+                repository_file=repository_file,
+                installation_repositories=installation,
+            ):
+                result = get_filtered_search_query(
+                    "my-org",
+                    team_name,
+                    repository_list,
+                    repository_file,
+                    installation,
+                    ["private"],
+                    None,
+                    True,
+                )
+
+                self.assertIsNone(result)
+
+    def test_get_filtered_search_query_without_organization(self):
+        """Test that nothing is searched without an organization"""
+        result = get_filtered_search_query(
+            None, None, [], None, False, ["private"], None, True
+        )
+
+        self.assertIsNone(result)
 
 
 class TestGetGlobalProjectId(unittest.TestCase):
@@ -736,6 +1115,283 @@ class TestIsRepoCreateDateBeforeCreatedAfterDate(unittest.TestCase):
             is_repo_created_date_before(repo_created_at, created_after_date)
 
 
+class TestGetRepoMetadataSkipReason(unittest.TestCase):
+    """Test the get_repo_metadata_skip_reason function in evergreen.py"""
+
+    def setUp(self):
+        self.repo = MagicMock()
+        self.repo.size = 100
+        self.repo.disabled = False
+        self.repo.fork = False
+        self.repo.is_template = False
+
+    def test_get_repo_metadata_skip_reason_eligible(self):
+        """Test that a regular repository is not skipped"""
+        self.assertIsNone(get_repo_metadata_skip_reason(self.repo))
+
+    def test_get_repo_metadata_skip_reason_empty(self):
+        """Test that an empty repository is skipped"""
+        self.repo.size = 0
+        self.assertEqual(get_repo_metadata_skip_reason(self.repo), "empty")
+
+    def test_get_repo_metadata_skip_reason_disabled(self):
+        """Test that a disabled repository is skipped"""
+        self.repo.disabled = True
+        self.assertEqual(get_repo_metadata_skip_reason(self.repo), "disabled")
+
+    def test_get_repo_metadata_skip_reason_fork(self):
+        """Test that a forked repository is skipped"""
+        self.repo.fork = True
+        self.assertEqual(get_repo_metadata_skip_reason(self.repo), "fork")
+
+    def test_get_repo_metadata_skip_reason_template(self):
+        """Test that a template repository is skipped"""
+        self.repo.is_template = True
+        self.assertEqual(get_repo_metadata_skip_reason(self.repo), "template")
+
+    def test_get_repo_metadata_skip_reason_opt_out(self):
+        """Test that every filter can be turned off"""
+        self.repo.size = 0
+        self.repo.disabled = True
+        self.repo.fork = True
+        self.repo.is_template = True
+        self.assertIsNone(
+            get_repo_metadata_skip_reason(self.repo, False, False, False, False)
+        )
+
+    def test_get_repo_metadata_skip_reason_missing_metadata(self):
+        """Test that a repository without the metadata fields is not skipped"""
+        repo = MagicMock(spec=["full_name"])
+        self.assertIsNone(get_repo_metadata_skip_reason(repo))
+
+
+class TestPrepareRepository(unittest.TestCase):
+    """Test the prepare_repository and prepare_ahead functions in evergreen.py"""
+
+    settings = {
+        "exempt_repositories_list": ["my-org/exempt"],
+        "skip_empty_repos": True,
+        "skip_disabled_repos": True,
+        "skip_fork_repos": True,
+        "skip_template_repos": True,
+        "filter_visibility": ["private", "public"],
+        "created_after_date": "",
+        "follow_up_type": "pull",
+        "team_name": None,
+        "update_existing": False,
+        "group_dependencies": False,
+        "exempt_ecosystems": [],
+        "repo_specific_exemptions": {},
+        "schedule": "weekly",
+        "schedule_day": "",
+        "labels": [],
+        "extra_dependabot_config": None,
+    }
+
+    def build_repo(self, full_name="my-org/repo1"):
+        """Build an eligible repository"""
+        repo = MagicMock(
+            full_name=full_name,
+            archived=False,
+            size=100,
+            disabled=False,
+            fork=False,
+            is_template=False,
+            visibility="private",
+        )
+        repo.permissions = {"push": True}
+        return repo
+
+    def test_prepare_repository_skipped(self):
+        """Test that the skip reason of a repository is returned without probing it"""
+        for attributes, reason in [
+            ({"full_name": "my-org/exempt"}, "exempted"),
+            ({"archived": True}, "archived"),
+            ({"fork": True}, "fork"),
+            ({"visibility": "internal"}, "visibility-filtered"),
+            ({"permissions": {"push": False}}, "no write access"),
+        ]:
+            with self.subTest(reason=reason):
+                repo = self.build_repo()
+                repo.configure_mock(**attributes)
+
+                result = prepare_repository(repo, **self.settings)
+
+                self.assertEqual(
+                    result, (reason, None, ".github/dependabot.yaml", None)
+                )
+                repo.file_contents.assert_not_called()
+
+    @patch("evergreen.generate_dependabot_file")
+    @patch("evergreen.check_existing_config")
+    def test_prepare_repository_existing_config(
+        self, mock_check_existing_config, mock_generate_dependabot_file
+    ):
+        """Test that a repository with a dependabot.yml is skipped unless it is updated"""
+        existing_config = MagicMock()
+        mock_check_existing_config.side_effect = [None, existing_config]
+        mock_generate_dependabot_file.return_value = "version: 2\n"
+        repo = self.build_repo()
+
+        result = prepare_repository(repo, **self.settings)
+
+        self.assertEqual(
+            result,
+            (
+                "dependabot file already exists and update_existing is False",
+                existing_config,
+                ".github/dependabot.yml",
+                None,
+            ),
+        )
+        mock_generate_dependabot_file.assert_not_called()
+
+        mock_check_existing_config.side_effect = [None, existing_config]
+        result = prepare_repository(repo, **{**self.settings, "update_existing": True})
+
+        self.assertEqual(
+            result, (None, existing_config, ".github/dependabot.yml", "version: 2\n")
+        )
+
+    def test_prepare_ahead_keeps_order(self):
+        """Test that the repositories are prepared concurrently and yielded in order"""
+        running = []
+        both_running = threading.Event()
+
+        def prepare(repo):
+            running.append(repo)
+            if len(running) >= 2:
+                both_running.set()
+            # The first repository only completes once the next one is prepared too
+            if repo == "repo1":
+                both_running.wait(5)
+            return repo.upper()
+
+        result = list(prepare_ahead(prepare, ["repo1", "repo2", "repo3"], 2))
+
+        self.assertTrue(both_running.is_set())
+        self.assertEqual(
+            result, [("repo1", "REPO1"), ("repo2", "REPO2"), ("repo3", "REPO3")]
+        )
+
+    def test_prepare_ahead_stops_early(self):
+        """Test that the repositories are not all prepared when the caller stops"""
+        prepared = []
+
+        def prepare(repo):
+            prepared.append(repo)
+            return repo
+
+        repos = prepare_ahead(prepare, (f"repo{index}" for index in range(100)), 2)
+        self.assertEqual(next(repos), ("repo0", "repo0"))
+        repos.close()
+
+        self.assertLessEqual(len(prepared), 3)
+
+    def test_prepare_ahead_without_concurrency(self):
+        """Test that the repositories are prepared one by one without concurrency"""
+        result = list(prepare_ahead(str.upper, ["repo1", "repo2"], 1))
+
+        self.assertEqual(result, [("repo1", "REPO1"), ("repo2", "REPO2")])
+
+
+class TestHasWritePermission(unittest.TestCase):
+    """Test the has_write_permission function in evergreen.py"""
+
+    def test_has_write_permission_with_push(self):
+        """Test that a repository with push access is writable"""
+        repo = MagicMock()
+        repo.permissions = {"admin": False, "push": True, "pull": True}
+        self.assertTrue(has_write_permission(repo))
+
+    def test_has_write_permission_read_only(self):
+        """Test that a repository with pull access only is not writable"""
+        repo = MagicMock()
+        repo.permissions = {"admin": False, "push": False, "pull": True}
+        self.assertFalse(has_write_permission(repo))
+
+    def test_has_write_permission_team_listing(self):
+        """Test that the permissions of a team listing are not the ones of the token"""
+        repo = MagicMock()
+        repo.permissions = {"admin": False, "push": False, "pull": True}
+        self.assertTrue(has_write_permission(repo, "my-team"))
+
+    def test_has_write_permission_without_permissions(self):
+        """Test that a repository without a permissions object is assumed writable"""
+        repo = MagicMock(spec=["full_name"])
+        self.assertTrue(has_write_permission(repo))
+
+    def test_get_skipped_without_write_access_summary(self):
+        """Test the summary section for repositories without write access"""
+        result = get_skipped_without_write_access_summary(["org/repo1", "org/repo2"])
+        self.assertEqual(
+            result,
+            "\n\n## 🔐 Skipped Repositories (No Write Access)\n\n"
+            "| Repository |\n"
+            "| --- |\n"
+            "| org/repo1 |\n"
+            "| org/repo2 |\n",
+        )
+
+
+class TestMultipleOrganizations(unittest.TestCase):
+    """Test the multi-organization functions in evergreen.py"""
+
+    @patch("repositories.list_enterprise_organizations")
+    def test_get_organization_names(self, mock_list_enterprise_organizations):
+        """Test that the listed and enterprise organizations are merged without duplicates"""
+        mock_list_enterprise_organizations.return_value = iter(["org2", "org3"])
+        github_connection = MagicMock()
+
+        result = get_organization_names(
+            github_connection, ["org1", "org2"], "my-enterprise"
+        )
+
+        self.assertEqual(result, ["org1", "org2", "org3"])
+        mock_list_enterprise_organizations.assert_called_once_with(
+            github_connection, "my-enterprise"
+        )
+
+    @patch("repositories.list_enterprise_organizations")
+    def test_get_organization_names_without_enterprise(
+        self, mock_list_enterprise_organizations
+    ):
+        """Test that the enterprise is not queried when only organizations are listed"""
+        result = get_organization_names(MagicMock(), ["org1"], "")
+
+        self.assertEqual(result, ["org1"])
+        mock_list_enterprise_organizations.assert_not_called()
+
+    def test_process_organizations(self):
+        """Test that the summary of every organization is returned in order"""
+        summaries, failed_organizations = process_organizations(
+            lambda organization: f"## {organization}\n", ["org1", "org2", "org3"], 2
+        )
+
+        self.assertEqual(summaries, ["## org1\n", "## org2\n", "## org3\n"])
+        self.assertEqual(failed_organizations, [])
+
+    def test_process_organizations_with_failure(self):
+        """Test that a failing organization is reported without stopping the others"""
+
+        def process(organization):
+            if organization == "org2":
+                raise github3.exceptions.ForbiddenError(MagicMock(status_code=403))
+            return f"## {organization}\n"
+
+        with patch("builtins.print") as mock_print:
+            summaries, failed_organizations = process_organizations(
+                process, ["org1", "org2", "org3"], 2
+            )
+
+        self.assertEqual(summaries[0], "## org1\n")
+        self.assertIn("- **Organization:** org2", summaries[1])
+        self.assertIn("- **Error:**", summaries[1])
+        self.assertEqual(summaries[2], "## org3\n")
+        self.assertEqual(failed_organizations, ["org2"])
+        mock_print.assert_called_once()
+
+
 class TestCheckExistingConfig(unittest.TestCase):
     """
     Test cases for the check_existing_config function
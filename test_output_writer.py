@@ -0,0 +1,111 @@
+"""Test the output_writer module."""
+
+import json
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from output_writer import DEFAULT_OUTPUT_FILE, JSONL_OUTPUT_FILE, OutputWriter
+
+
+class TestOutputWriter(unittest.TestCase):
+    """Test the OutputWriter class in output_writer.py"""
+
+    def test_write_one_file_per_repository(self):
+        """Test that every repository gets its own file in the output directory"""
+        with tempfile.TemporaryDirectory() as output_dir:
+            with OutputWriter(output_dir) as output_writer:
+                output_writer.write("org1/repo1", "version: 2\n")
+                output_writer.write("org2/repo2", "version: 2\nupdates: []\n")
+
+            with open(
+                os.path.join(output_dir, "org1", "repo1.yaml"), encoding="utf-8"
+            ) as output_file:
+                self.assertEqual(output_file.read(), "version: 2\n")
+            with open(
+                os.path.join(output_dir, "org2", "repo2.yaml"), encoding="utf-8"
+            ) as output_file:
+                self.assertEqual(output_file.read(), "version: 2\nupdates: []\n")
+
+    def test_write_without_output_directory(self):
+        """Test that the last generated file is kept when no output directory is set"""
+        with tempfile.TemporaryDirectory() as working_dir:
+            with patch(
+                "output_writer.DEFAULT_OUTPUT_FILE",
+                os.path.join(working_dir, DEFAULT_OUTPUT_FILE),
+            ):
+                with OutputWriter() as output_writer:
+                    output_writer.write("org1/repo1", "first\n")
+                    output_writer.write("org1/repo2", "last\n")
+
+            with open(
+                os.path.join(working_dir, DEFAULT_OUTPUT_FILE), encoding="utf-8"
+            ) as output_file:
+                self.assertEqual(output_file.read(), "last\n")
+
+    def test_close_raises_write_errors(self):
+        """Test that a write error is raised when the writer is closed"""
+        with tempfile.NamedTemporaryFile() as not_a_directory:
+            output_writer = OutputWriter(not_a_directory.name)
+            output_writer.write("org1/repo1", "version: 2\n")
+            output_writer.write("org1/repo2", "version: 2\n")
+
+            with self.assertRaises(OSError):
+                output_writer.close()
+
+    def test_write_keeps_draining_after_unexpected_errors(self):
+        """Test that an error other than OSError does not stop the writer thread"""
+        with tempfile.TemporaryDirectory() as output_dir:
+            output_writer = OutputWriter(output_dir, buffer_size=1)
+            # Writing None fails with a TypeError
+            output_writer.write("org1/repo1", None)
+            for index in range(5):
+                output_writer.write(f"org1/repo{index + 2}", "version: 2\n")
+
+            with self.assertRaises(TypeError):
+                output_writer.close()
+
+    def test_write_jsonl_stream(self):
+        """Test that every generated file is appended to a single JSON Lines stream"""
+        with tempfile.TemporaryDirectory() as output_dir:
+            with OutputWriter(output_dir, output_format="jsonl") as output_writer:
+                output_writer.write("org1/repo1", "version: 2\n")
+                output_writer.write("org2/repo2", "version: 2\nupdates: []\n")
+
+            with open(
+                os.path.join(output_dir, JSONL_OUTPUT_FILE), encoding="utf-8"
+            ) as output_file:
+                lines = [json.loads(line) for line in output_file]
+
+        self.assertEqual(
+            lines,
+            [
+                {"repository": "org1/repo1", "content": "version: 2\n"},
+                {"repository": "org2/repo2", "content": "version: 2\nupdates: []\n"},
+            ],
+        )
+
+    def test_exit_raises_write_errors(self):
+        """Test that a write error is raised when the block completes"""
+        with tempfile.NamedTemporaryFile() as not_a_directory:
+            with self.assertRaises(OSError):
+                with OutputWriter(not_a_directory.name) as output_writer:
+                    output_writer.write("org1/repo1", "version: 2\n")
+
+    def test_exit_keeps_the_exception_of_the_block(self):
+        """Test that a write error does not mask the exception of the block"""
+        with tempfile.NamedTemporaryFile() as not_a_directory:
+            with self.assertRaises(KeyError) as context_manager:
+                with OutputWriter(not_a_directory.name) as output_writer:
+                    output_writer.write("org1/repo1", "version: 2\n")
+                    raise KeyError("org1")
+
+        self.assertIn(
+            "Writing the dependabot files also failed",
+            context_manager.exception.__notes__[0],
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,831 @@
+"""Test the repositories.py module."""
+
+import io
+import os
+import tempfile
+import threading
+import unittest
+from datetime import date
+from unittest.mock import MagicMock, patch
+
+import github3
+from exceptions import GraphQLError
+from repositories import (
+    build_filtered_search_query,
+    chunked,
+    get_graphql_url,
+    get_last_page,
+    get_page,
+    get_rate_limit_delay,
+    get_search_page,
+    graphql_repository_to_rest,
+    iterate_concurrently,
+    list_enterprise_organizations,
+    list_installation_repositories,
+    list_organization_repositories,
+    list_teams_repositories,
+    partition_search_query,
+    read_repository_names,
+    resolve_repositories,
+    search_repositories,
+    split_created_lower_bound,
+)
+
+
+def mock_search_response(repos, total_count, status_code=200, headers=None):
+    """Build a mock response of the repository search API"""
+    response = MagicMock(status_code=status_code, headers=headers or {}, text="")
+    response.json.return_value = {
+        "total_count": total_count,
+        "items": [{"name": repo} for repo in repos],
+    }
+    return response
+
+
+def mock_search_connection(responses):
+    """Build a mock GitHub connection answering the search queries with the responses"""
+    github_connection = MagicMock()
+    github_connection.session.get.side_effect = lambda url, params: responses[
+        (params["q"], params["page"])
+    ]
+    return github_connection
+
+
+class TestIterateConcurrently(unittest.TestCase):
+    """Test the iterate_concurrently function in repositories.py"""
+
+    def test_iterate_concurrently(self):
+        """Test that the items of every producer are yielded"""
+        producers = [lambda: [1, 2], lambda: [], lambda: [3]]
+
+        result = iterate_concurrently(producers, 2)
+
+        self.assertEqual(sorted(result), [1, 2, 3])
+
+    def test_iterate_concurrently_streams_producers(self):
+        """Test that items are yielded before the producers are exhausted"""
+        first_item_received = threading.Event()
+
+        def producers():
+            yield lambda: [1]
+            if not first_item_received.wait(5):
+                raise TimeoutError("the first item was not yielded")
+            yield lambda: [2]
+
+        result = iterate_concurrently(producers(), 2)
+
+        self.assertEqual(next(result), 1)
+        first_item_received.set()
+        self.assertEqual(list(result), [2])
+
+    def test_iterate_concurrently_raises_iterable_errors(self):
+        """Test that an error raised while generating the producers is raised to the consumer"""
+
+        def producers():
+            yield lambda: [1]
+            raise ValueError("partitioning failed")
+
+        with self.assertRaises(ValueError):
+            list(iterate_concurrently(producers(), 2))
+
+    def test_iterate_concurrently_without_producers(self):
+        """Test that no items are yielded without producers"""
+        self.assertEqual(list(iterate_concurrently([], 2)), [])
+
+    def test_iterate_concurrently_raises_producer_errors(self):
+        """Test that an error raised by a producer is raised to the consumer"""
+
+        def failing_producer():
+            raise ValueError("listing failed")
+
+        with self.assertRaises(ValueError):
+            list(iterate_concurrently([failing_producer], 2))
+
+    def test_iterate_concurrently_stops_early(self):
+        """Test that the consumer can stop before the producers are exhausted"""
+        result = iterate_concurrently([lambda: iter(range(10000))], 1)
+
+        self.assertEqual(next(result), 0)
+        result.close()
+
+
+class TestSearchRepositories(unittest.TestCase):
+    """Test the search functions in repositories.py"""
+
+    @patch("github3.repos.ShortRepository")
+    def test_search_repositories_below_limit(self, mock_short_repository):
+        """Test that a query below the search limit is streamed without partitioning"""
+        mock_short_repository.side_effect = lambda repo, session: repo["name"]
+        github_connection = mock_search_connection(
+            {("org:my-org", 1): mock_search_response(["repo1", "repo2"], 2)}
+        )
+
+        result = list(search_repositories(github_connection, "org:my-org"))
+
+        self.assertEqual(result, ["repo1", "repo2"])
+        github_connection.session.build_url.assert_called_with("search", "repositories")
+        github_connection.session.get.assert_called_once_with(
+            github_connection.session.build_url.return_value,
+            params={"q": "org:my-org", "per_page": 100, "page": 1},
+        )
+
+    @patch("repositories.PER_PAGE", 2)
+    @patch("github3.repos.ShortRepository")
+    def test_search_repositories_pages(self, mock_short_repository):
+        """Test that every page of the search results is fetched"""
+        mock_short_repository.side_effect = lambda repo, session: repo["name"]
+        github_connection = mock_search_connection(
+            {
+                ("org:my-org", 1): mock_search_response(["repo1", "repo2"], 3),
+                ("org:my-org", 2): mock_search_response(["repo3"], 3),
+            }
+        )
+
+        result = list(search_repositories(github_connection, "org:my-org"))
+
+        self.assertEqual(result, ["repo1", "repo2", "repo3"])
+
+    def test_search_repositories_without_results(self):
+        """Test that a query without results yields nothing"""
+        github_connection = mock_search_connection(
+            {("org:my-org", 1): mock_search_response([], 0)}
+        )
+
+        self.assertEqual(list(search_repositories(github_connection, "org:my-org")), [])
+
+    @patch("github3.repos.ShortRepository")
+    @patch("repositories.partition_search_query")
+    def test_search_repositories_above_limit(
+        self, mock_partition_search_query, mock_short_repository
+    ):
+        """Test that a query above the search limit is partitioned and every partition is fetched"""
+        mock_short_repository.side_effect = lambda repo, session: repo["name"]
+        github_connection = mock_search_connection(
+            {
+                ("org:my-org", 1): mock_search_response(["repo1"], 1500),
+            }
+        )
+        # The first pages fetched to count the partitions are not fetched again
+        mock_partition_search_query.return_value = iter(
+            [
+                (
+                    "org:my-org created:2007-10-01..2015-01-01",
+                    mock_search_response(["repo1", "repo2"], 2).json(),
+                ),
+                (
+                    "org:my-org created:2015-01-02..2025-01-01",
+                    mock_search_response(["repo3"], 1).json(),
+                ),
+            ]
+        )
+
+        result = list(search_repositories(github_connection, "org:my-org", 8))
+
+        self.assertCountEqual(result, ["repo1", "repo2", "repo3"])
+        # The search concurrency is capped below the listing concurrency
+        mock_partition_search_query.assert_called_once_with(
+            github_connection, "org:my-org", date(2007, 10, 1), concurrency=2
+        )
+
+    @patch("repositories.partition_search_query")
+    def test_search_repositories_above_limit_with_created_lower_bound(
+        self, mock_partition_search_query
+    ):
+        """Test that a created: lower bound is used as the start of the partitions"""
+        github_connection = mock_search_connection(
+            {
+                ("org:my-org created:>=2020-01-01", 1): mock_search_response(
+                    ["repo1"], 1500
+                )
+            }
+        )
+        mock_partition_search_query.return_value = []
+
+        list(search_repositories(github_connection, "org:my-org created:>=2020-01-01"))
+
+        mock_partition_search_query.assert_called_once_with(
+            github_connection, "org:my-org", date(2020, 1, 1), concurrency=2
+        )
+
+    @patch("time.sleep")
+    def test_get_search_page_retries_rate_limits(self, mock_sleep):
+        """Test that a rate limited search request is retried after the advertised delay"""
+        github_connection = MagicMock()
+        github_connection.session.get.side_effect = [
+            mock_search_response([], 0, 403, {"Retry-After": "30"}),
+            mock_search_response([], 0, 429),
+            mock_search_response(["repo1"], 1),
+        ]
+
+        result = get_search_page(github_connection, "org:my-org", 1)
+
+        self.assertEqual(result["total_count"], 1)
+        self.assertEqual(
+            [call.args[0] for call in mock_sleep.call_args_list], [30.0, 60]
+        )
+
+    @patch("repositories.SEARCH_MAX_RETRIES", 1)
+    @patch("time.sleep")
+    def test_get_search_page_still_rate_limited(self, _mock_sleep):
+        """Test that the error is raised when the search is still rate limited"""
+        github_connection = MagicMock()
+        github_connection.session.get.return_value = mock_search_response([], 0, 429)
+
+        with self.assertRaises(github3.exceptions.GitHubError):
+            get_search_page(github_connection, "org:my-org", 1)
+        self.assertEqual(github_connection.session.get.call_count, 2)
+
+    @patch("time.time", return_value=1000)
+    def test_get_rate_limit_delay(self, _mock_time):
+        """Test the delay read from the rate limit headers"""
+        self.assertEqual(
+            get_rate_limit_delay(
+                mock_search_response(
+                    [],
+                    0,
+                    403,
+                    {"X-RateLimit-Remaining": "0", "X-RateLimit-Reset": "1010"},
+                )
+            ),
+            11,
+        )
+        # A 403 that is not a rate limit is a permission error and is not retried
+        self.assertIsNone(get_rate_limit_delay(mock_search_response([], 0, 403)))
+        self.assertIsNone(get_rate_limit_delay(mock_search_response([], 0, 404)))
+
+    def test_split_created_lower_bound(self):
+        """Test that created: lower bounds are removed from the query"""
+        self.assertEqual(
+            split_created_lower_bound("org:my-org created:>=2020-01-01 fork:false"),
+            ("org:my-org fork:false", date(2020, 1, 1)),
+        )
+        self.assertEqual(
+            split_created_lower_bound("org:my-org created:>2020-01-01"),
+            ("org:my-org", date(2020, 1, 2)),
+        )
+        self.assertEqual(
+            split_created_lower_bound("org:my-org created:2020-01-01..2020-02-01"),
+            ("org:my-org created:2020-01-01..2020-02-01", date(2007, 10, 1)),
+        )
+
+    def test_partition_search_query(self):
+        """Test that ranges above the search limit are bisected by creation date"""
+        counts = {
+            "q created:2020-01-01..2020-01-04": 1500,
+            "q created:2020-01-01..2020-01-02": 900,
+            "q created:2020-01-03..2020-01-04": 0,
+        }
+        github_connection = mock_search_connection(
+            {
+                (query, 1): mock_search_response([], count)
+                for query, count in counts.items()
+            }
+        )
+
+        result = list(
+            partition_search_query(
+                github_connection, "q", date(2020, 1, 1), date(2020, 1, 4), 2
+            )
+        )
+
+        self.assertEqual(
+            result,
+            [("q created:2020-01-01..2020-01-02", {"total_count": 900, "items": []})],
+        )
+        # The counts are fetched with full pages so they are reused as first pages
+        self.assertEqual(
+            github_connection.session.get.call_args.kwargs["params"]["per_page"], 100
+        )
+
+    def test_partition_search_query_single_day_above_limit(self):
+        """Test that a single day above the search limit is kept as a partition"""
+        github_connection = mock_search_connection(
+            {("q created:2020-01-01..2020-01-01", 1): mock_search_response([], 1500)}
+        )
+
+        result = partition_search_query(
+            github_connection, "q", date(2020, 1, 1), date(2020, 1, 1), 2
+        )
+
+        self.assertEqual(
+            [partition for partition, _ in result], ["q created:2020-01-01..2020-01-01"]
+        )
+
+
+class TestBuildFilteredSearchQuery(unittest.TestCase):
+    """Test the build_filtered_search_query function in repositories.py"""
+
+    def test_build_filtered_search_query_all_visibilities(self):
+        """Test the query when all visibilities are in scope"""
+        result = build_filtered_search_query(
+            "my-org", ["internal", "private", "public"], "", True
+        )
+
+        self.assertEqual(result, "org:my-org archived:false fork:false")
+
+    def test_build_filtered_search_query_single_visibility_and_date(self):
+        """Test the query with a single visibility, a creation date and forks included"""
+        result = build_filtered_search_query("my-org", ["private"], "2024-01-01", False)
+
+        self.assertEqual(
+            result,
+            "org:my-org archived:false is:private created:>=2024-01-01 fork:true",
+        )
+
+    def test_build_filtered_search_query_multiple_visibilities(self):
+        """Test that multiple visibilities fall back to client-side filtering"""
+        result = build_filtered_search_query(
+            "my-org", ["internal", "private"], "", True
+        )
+
+        self.assertIsNone(result)
+
+
+def mock_page(repos, last_page=None):
+    """Build a mock response of a REST API list endpoint page"""
+    response = MagicMock()
+    response.status_code = 200
+    response.json.return_value = repos
+    response.links = {}
+    if last_page:
+        response.links = {
+            "last": {
+                "url": f"https://api.github.com/organizations/1/repos?per_page=100&page={last_page}"
+            }
+        }
+    return response
+
+
+class TestListOrganizationRepositories(unittest.TestCase):
+    """Test the list_organization_repositories function in repositories.py"""
+
+    @patch("github3.repos.ShortRepository")
+    def test_list_organization_repositories(self, mock_short_repository):
+        """Test that every page of the organization repositories is fetched"""
+        mock_short_repository.side_effect = lambda repo, session: repo["name"]
+        github_connection = MagicMock()
+        github_connection.session.build_url.return_value = (
+            "https://api.github.com/orgs/my-org/repos"
+        )
+        pages = {
+            1: mock_page([{"name": "repo1"}, {"name": "repo2"}], last_page=3),
+            2: mock_page([{"name": "repo3"}]),
+            3: mock_page([{"name": "repo4"}]),
+        }
+        github_connection.session.get.side_effect = lambda url, params: pages[
+            params["page"]
+        ]
+
+        result = list(list_organization_repositories(github_connection, "my-org", 2))
+
+        self.assertEqual(result[:2], ["repo1", "repo2"])
+        self.assertCountEqual(result, ["repo1", "repo2", "repo3", "repo4"])
+        github_connection.session.build_url.assert_called_once_with(
+            "orgs", "my-org", "repos"
+        )
+        self.assertEqual(github_connection.session.get.call_count, 3)
+
+    @patch("github3.repos.ShortRepository")
+    def test_list_organization_repositories_single_page(self, mock_short_repository):
+        """Test that a single page is fetched when there is no last link"""
+        mock_short_repository.side_effect = lambda repo, session: repo["name"]
+        github_connection = MagicMock()
+        github_connection.session.get.return_value = mock_page([{"name": "repo1"}])
+
+        result = list(list_organization_repositories(github_connection, "my-org"))
+
+        self.assertEqual(result, ["repo1"])
+        github_connection.session.get.assert_called_once()
+
+    def test_get_page_failed(self):
+        """Test that a failed page request raises a github3 error"""
+        github_connection = MagicMock()
+        github_connection.session.get.return_value.status_code = 404
+
+        with self.assertRaises(github3.exceptions.NotFoundError):
+            get_page(github_connection, "https://api.github.com/orgs/x/repos", {})
+
+    def test_get_last_page(self):
+        """Test that the last page number is read from the Link header"""
+        self.assertEqual(get_last_page(mock_page([], last_page=42)), 42)
+        self.assertEqual(get_last_page(mock_page([])), 1)
+
+
+class TestListInstallationRepositories(unittest.TestCase):
+    """Test the list_installation_repositories function in repositories.py"""
+
+    @patch("github3.repos.ShortRepository")
+    def test_list_installation_repositories(self, mock_short_repository):
+        """Test that every page of the installation repositories is fetched"""
+        mock_short_repository.side_effect = lambda repo, session: repo["full_name"]
+        github_connection = MagicMock()
+        github_connection.session.build_url.return_value = (
+            "https://api.github.com/installation/repositories"
+        )
+        first_page = mock_page(
+            {
+                "total_count": 3,
+                "repositories": [
+                    {"full_name": "org1/repo1"},
+                    {"full_name": "org1/repo2"},
+                ],
+            },
+            last_page=2,
+        )
+        second_page = mock_page(
+            {"total_count": 3, "repositories": [{"full_name": "org2/repo3"}]}
+        )
+        pages = {1: first_page, 2: second_page}
+        github_connection.session.get.side_effect = lambda url, params: pages[
+            params["page"]
+        ]
+
+        result = list(list_installation_repositories(github_connection, 2))
+
+        self.assertEqual(result, ["org1/repo1", "org1/repo2", "org2/repo3"])
+        github_connection.session.build_url.assert_called_once_with(
+            "installation", "repositories"
+        )
+        self.assertEqual(github_connection.session.get.call_count, 2)
+
+
+class TestListTeamsRepositories(unittest.TestCase):
+    """Test the list_teams_repositories function in repositories.py"""
+
+    def setUp(self):
+        self.github_connection = MagicMock()
+        self.github_connection.session.build_url.side_effect = lambda *args: "/".join(
+            args
+        )
+        self.pages = {
+            "orgs/my-org/teams/team1/repos": mock_page(
+                [
+                    {"id": 1, "full_name": "my-org/repo1"},
+                    {"id": 2, "full_name": "my-org/repo2"},
+                ]
+            ),
+            "orgs/my-org/teams/team2/repos": mock_page(
+                [
+                    {"id": 2, "full_name": "my-org/repo2"},
+                    {"id": 3, "full_name": "my-org/repo3"},
+                ]
+            ),
+            "orgs/my-org/teams/child/repos": mock_page(
+                [{"id": 4, "full_name": "my-org/repo4"}]
+            ),
+            "orgs/my-org/teams/team1/teams": mock_page([{"slug": "child"}]),
+            "orgs/my-org/teams/team2/teams": mock_page([{"slug": "child"}]),
+            "orgs/my-org/teams/child/teams": mock_page([]),
+        }
+        self.github_connection.session.get.side_effect = lambda url, params: self.pages[
+            url
+        ]
+
+    @patch("github3.repos.ShortRepository")
+    def test_list_teams_repositories(self, mock_short_repository):
+        """Test that a repository of several teams is yielded once"""
+        mock_short_repository.side_effect = lambda repo, session: MagicMock(**repo)
+
+        result = list(
+            list_teams_repositories(
+                self.github_connection, "my-org", ["team1", "team2"], False, 2
+            )
+        )
+
+        self.assertCountEqual(
+            [repo.full_name for repo in result],
+            ["my-org/repo1", "my-org/repo2", "my-org/repo3"],
+        )
+        requested_urls = [
+            call.args[0] for call in self.github_connection.session.get.call_args_list
+        ]
+        self.assertNotIn("orgs/my-org/teams/team1/teams", requested_urls)
+
+    @patch("github3.repos.ShortRepository")
+    def test_list_teams_repositories_with_child_teams(self, mock_short_repository):
+        """Test that the repositories of the nested child teams are included once"""
+        mock_short_repository.side_effect = lambda repo, session: MagicMock(**repo)
+
+        result = list(
+            list_teams_repositories(
+                self.github_connection, "my-org", ["team1", "team2"], True, 2
+            )
+        )
+
+        self.assertCountEqual(
+            [repo.full_name for repo in result],
+            ["my-org/repo1", "my-org/repo2", "my-org/repo3", "my-org/repo4"],
+        )
+        requested_urls = [
+            call.args[0] for call in self.github_connection.session.get.call_args_list
+        ]
+        self.assertEqual(requested_urls.count("orgs/my-org/teams/child/repos"), 1)
+
+
+def enterprise_organizations_response(logins, end_cursor=None):
+    """Build a mock GraphQL response of a page of enterprise organizations"""
+    response = MagicMock()
+    response.status_code = 200
+    response.json.return_value = {
+        "data": {
+            "enterprise": {
+                "organizations": {
+                    "nodes": [{"login": login} for login in logins],
+                    "pageInfo": {
+                        "hasNextPage": end_cursor is not None,
+                        "endCursor": end_cursor,
+                    },
+                }
+            }
+        }
+    }
+    return response
+
+
+class TestListEnterpriseOrganizations(unittest.TestCase):
+    """Test the list_enterprise_organizations function in repositories.py"""
+
+    def setUp(self):
+        self.github_connection = MagicMock()
+        self.github_connection.session.base_url = "https://api.github.com"
+
+    def test_list_enterprise_organizations(self):
+        """Test that every page of the enterprise organizations is fetched"""
+        self.github_connection.session.post.side_effect = [
+            enterprise_organizations_response(["org1", "org2"], end_cursor="abc"),
+            enterprise_organizations_response(["org3"]),
+        ]
+
+        result = list(
+            list_enterprise_organizations(self.github_connection, "my-enterprise")
+        )
+
+        self.assertEqual(result, ["org1", "org2", "org3"])
+        requests = self.github_connection.session.post.call_args_list
+        self.assertEqual(
+            [request.kwargs["json"]["variables"] for request in requests],
+            [
+                {"slug": "my-enterprise", "cursor": None},
+                {"slug": "my-enterprise", "cursor": "abc"},
+            ],
+        )
+
+    def test_list_enterprise_organizations_not_found(self):
+        """Test that an error is raised when the enterprise does not exist"""
+        self.github_connection.session.post.return_value.status_code = 200
+        self.github_connection.session.post.return_value.json.return_value = {
+            "data": {"enterprise": None}
+        }
+
+        with self.assertRaises(ValueError):
+            list(list_enterprise_organizations(self.github_connection, "missing"))
+
+
+def graphql_repository(name_with_owner, **fields):
+    """Build a GraphQL repository node with the fields requested by resolve_repositories"""
+    owner, name = name_with_owner.split("/")
+    node = {
+        "databaseId": 42,
+        "name": name,
+        "nameWithOwner": name_with_owner,
+        "description": None,
+        "url": f"https://github.com/{name_with_owner}",
+        "createdAt": "2020-01-01T00:00:00Z",
+        "isArchived": False,
+        "isDisabled": False,
+        "isEmpty": False,
+        "isFork": False,
+        "isPrivate": True,
+        "isTemplate": False,
+        "visibility": "PRIVATE",
+        "diskUsage": 0,
+        "viewerPermission": "READ",
+        "defaultBranchRef": {"name": "main"},
+        "owner": {
+            "__typename": "Organization",
+            "login": owner,
+            "url": f"https://github.com/{owner}",
+            "avatarUrl": "https://avatars.githubusercontent.com/u/1",
+            "databaseId": 1,
+        },
+    }
+    node.update(fields)
+    return node
+
+
+class TestResolveRepositories(unittest.TestCase):
+    """Test the resolve_repositories function in repositories.py"""
+
+    def setUp(self):
+        self.github_connection = MagicMock()
+        self.github_connection.session.base_url = "https://api.github.com"
+
+    def test_resolve_repositories(self):
+        """Test that repositories are resolved with aliased GraphQL fields"""
+        self.github_connection.session.post.return_value.status_code = 200
+        self.github_connection.session.post.return_value.json.return_value = {
+            "data": {
+                "repo0": graphql_repository("org/repo1"),
+                "repo1": graphql_repository("org/repo2", isEmpty=True),
+            }
+        }
+
+        result = list(
+            resolve_repositories(self.github_connection, ["org/repo1", " org/repo2"])
+        )
+
+        self.github_connection.session.post.assert_called_once()
+        url = self.github_connection.session.post.call_args.args[0]
+        request = self.github_connection.session.post.call_args.kwargs["json"]
+        self.assertEqual(url, "https://api.github.com/graphql")
+        self.assertEqual(
+            request["variables"],
+            {"owner0": "org", "name0": "repo1", "owner1": "org", "name1": "repo2"},
+        )
+        self.assertIn(
+            "repo1: repository(owner: $owner1, name: $name1)", request["query"]
+        )
+
+        self.assertEqual(
+            [repo.full_name for repo in result], ["org/repo1", "org/repo2"]
+        )
+        repo = result[0]
+        self.assertEqual(repo.owner.login, "org")
+        self.assertEqual(repo.visibility, "private")
+        self.assertEqual(repo.created_at, "2020-01-01T00:00:00Z")
+        self.assertEqual(repo.default_branch, "main")
+        self.assertEqual(repo.size, 1)
+        self.assertEqual(result[1].size, 0)
+        self.assertFalse(repo.permissions["push"])
+        self.assertTrue(repo.permissions["pull"])
+
+        # The resolved repositories can be used with the REST API without fetching them again
+        self.github_connection.session.build_url.side_effect = (
+            lambda *args, **kwargs: "/".join([kwargs["base_url"], *args])
+        )
+        self.github_connection.session.get.return_value.status_code = 404
+        with self.assertRaises(github3.exceptions.NotFoundError):
+            repo.file_contents("Gemfile")
+        self.assertEqual(
+            self.github_connection.session.get.call_args.args[0],
+            "https://api.github.com/repos/org/repo1/contents/Gemfile",
+        )
+
+    def test_resolve_repositories_in_batches(self):
+        """Test that the repositories are resolved in batches"""
+        self.github_connection.session.post.return_value.status_code = 200
+        self.github_connection.session.post.return_value.json.return_value = {
+            "data": {"repo0": None}
+        }
+
+        with patch("builtins.print") as mock_print:
+            result = list(
+                resolve_repositories(
+                    self.github_connection, ["org/repo1", "org/repo2", "invalid"], 1
+                )
+            )
+
+        self.assertEqual(result, [])
+        self.assertEqual(self.github_connection.session.post.call_count, 2)
+        mock_print.assert_any_call("Skipping org/repo1 (not found)")
+        mock_print.assert_any_call("Skipping invalid (not in owner/name format)")
+
+    def test_resolve_repositories_request_failed(self):
+        """Test that a failed GraphQL request raises a github3 error"""
+        self.github_connection.session.post.return_value.status_code = 401
+
+        with self.assertRaises(github3.exceptions.AuthenticationFailed):
+            list(resolve_repositories(self.github_connection, ["org/repo1"]))
+
+    def test_resolve_repositories_without_data(self):
+        """Test that an error is raised when GraphQL returns errors without data"""
+        self.github_connection.session.post.return_value.status_code = 200
+        self.github_connection.session.post.return_value.json.return_value = {
+            "data": None,
+            "errors": [{"type": "RATE_LIMITED", "message": "API rate limit exceeded"}],
+        }
+
+        with self.assertRaises(GraphQLError) as context_manager:
+            list(resolve_repositories(self.github_connection, ["org/repo1"]))
+        self.assertIn("API rate limit exceeded", str(context_manager.exception))
+
+    def test_resolve_repositories_partial_errors(self):
+        """Test that the errors of the aliases that failed are reported"""
+        self.github_connection.session.post.return_value.status_code = 200
+        self.github_connection.session.post.return_value.json.return_value = {
+            "data": {
+                "repo0": graphql_repository("org/repo1"),
+                "repo1": None,
+                "repo2": None,
+            },
+            "errors": [
+                {
+                    "type": "FORBIDDEN",
+                    "path": ["repo1"],
+                    "message": "Resource not accessible by integration",
+                },
+                {
+                    "type": "NOT_FOUND",
+                    "path": ["repo2"],
+                    "message": "Could not resolve to a Repository",
+                },
+            ],
+        }
+
+        with patch("builtins.print") as mock_print:
+            result = list(
+                resolve_repositories(
+                    self.github_connection, ["org/repo1", "org/repo2", "org/repo3"]
+                )
+            )
+
+        self.assertEqual([repo.full_name for repo in result], ["org/repo1"])
+        mock_print.assert_any_call(
+            "Skipping org/repo2 (Resource not accessible by integration)"
+        )
+        mock_print.assert_any_call("Skipping org/repo3 (not found)")
+
+    def test_graphql_repository_to_rest_fields(self):
+        """Test that the REST representation has every field github3 reads"""
+
+        class RecordingDict(dict):
+            """Dictionary recording the keys that are read"""
+
+            read_keys = set()
+
+            def __getitem__(self, key):
+                self.read_keys.add(key)
+                return super().__getitem__(key)
+
+        base_url = "https://ghe.example.com/api/v3"
+        rest = graphql_repository_to_rest(graphql_repository("org/repo1"), base_url)
+        owner = RecordingDict(rest.pop("owner"))
+        recorded = RecordingDict(rest, owner=owner)
+
+        repo = github3.repos.ShortRepository(recorded, self.github_connection)
+
+        # Every field read by github3 is provided, no KeyError was raised
+        self.assertLessEqual(
+            RecordingDict.read_keys, set(rest) | set(owner) | {"owner"}
+        )
+        # The URLs point to the REST API of the GitHub Enterprise Server
+        self.assertEqual(repo.url, f"{base_url}/repos/org/repo1")
+        self.assertEqual(
+            repo.contents_urlt.expand(path="Gemfile"),
+            f"{base_url}/repos/org/repo1/contents/Gemfile",
+        )
+        self.assertEqual(repo.owner.url, f"{base_url}/users/org")
+        for key, value in rest.items():
+            if key.endswith("_url") and key != "html_url":
+                self.assertTrue(value.startswith(f"{base_url}/repos/org/repo1"), key)
+
+    def test_get_graphql_url_enterprise(self):
+        """Test the GraphQL endpoint of GitHub Enterprise Server"""
+        self.github_connection.session.base_url = "https://ghe.example.com/api/v3"
+
+        self.assertEqual(
+            get_graphql_url(self.github_connection),
+            "https://ghe.example.com/api/graphql",
+        )
+
+    def test_chunked(self):
+        """Test that the iterable is split in chunks"""
+        self.assertEqual(list(chunked(range(5), 2)), [[0, 1], [2, 3], [4]])
+
+
+class TestReadRepositoryNames(unittest.TestCase):
+    """Test the read_repository_names function in repositories.py"""
+
+    def test_read_repository_names_from_file(self):
+        """Test that plain and JSON lines are read from the file"""
+        with tempfile.NamedTemporaryFile(
+            "w", suffix=".txt", delete=False, encoding="utf-8"
+        ) as repository_file:
+            repository_file.write(
+                "org/repo1\n"
+                "\n"
+                "# comment\n"
+                '{"repository": "org/repo2"}\n'
+                '{"full_name": "org/repo3", "id": 3}\n'
+                '{"id": 4}\n'
+                "{invalid\n"
+            )
+        try:
+            with patch("builtins.print"):
+                result = list(read_repository_names(repository_file.name))
+        finally:
+            os.remove(repository_file.name)
+
+        self.assertEqual(result, ["org/repo1", "org/repo2", "org/repo3"])
+
+    def test_read_repository_names_from_stdin(self):
+        """Test that the repositories are read from stdin"""
+        with patch("sys.stdin", io.StringIO("org/repo1\norg/repo2\n")):
+            result = read_repository_names("-")
+
+            self.assertEqual(next(result), "org/repo1")
+            self.assertEqual(list(result), ["org/repo2"])
+
+
+if __name__ == "__main__":
+    unittest.main()